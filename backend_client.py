@@ -0,0 +1,337 @@
+# backend_client.py
+
+import io
+import os
+import json
+import time
+import random
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from single_flight import SingleFlight
+
+# pyarrow is optional: without it responses are always negotiated as JSON
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+ARROW_STREAM_TYPE = "application/vnd.apache.arrow.stream"
+PARQUET_TYPE = "application/vnd.apache.parquet"
+JSON_TYPE = "application/json"
+
+# Override with PROCESS_JSON_URL to run against local_backend.py
+PROCESS_JSON_URL = os.getenv("PROCESS_JSON_URL", "https://my-combined-app-44056503414.us-central1.run.app/process_json")
+
+# (connect, read) timeouts in seconds per logical endpoint
+ENDPOINT_TIMEOUTS = {
+    "process_json": (3.05, 10),
+    "rvm": (3.05, 30),
+    "rvm_discovery": (2, 5),
+    "default": (3.05, 15),
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_RETRIES = 2
+BACKOFF_SECONDS = 0.25
+
+PAGE_SIZE = 500
+MAX_PAGE_WORKERS = 4
+
+_session = None
+_session_lock = threading.Lock()
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+# Identical /process_json queries in flight at the same time share one request
+_process_json_flights = SingleFlight()
+
+
+def get_session():
+    """
+    Returns the process-wide requests.Session. Its connection pool keeps
+    TCP+TLS connections to Cloud Run alive across calls and sessions.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Content-Type": "application/json"})
+            _session = session
+        return _session
+
+
+def _record(endpoint, elapsed_ms, error=False, retried=False):
+    with _metrics_lock:
+        stats = _metrics.setdefault(endpoint, {
+            "calls": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0,
+            "recent_ms": deque(maxlen=256),
+        })
+        if retried:
+            stats["retries"] += 1
+            return
+        stats["calls"] += 1
+        stats["errors"] += int(error)
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["recent_ms"].append(elapsed_ms)
+
+
+def get_metrics():
+    """Latency and error summary per endpoint: calls, errors, retries, mean/p50/p95/max ms."""
+    summary = {}
+    with _metrics_lock:
+        for endpoint, stats in _metrics.items():
+            recent = sorted(stats["recent_ms"])
+            summary[endpoint] = {
+                "calls": stats["calls"],
+                "errors": stats["errors"],
+                "retries": stats["retries"],
+                "mean_ms": stats["total_ms"] / stats["calls"] if stats["calls"] else 0.0,
+                "p50_ms": recent[len(recent) // 2] if recent else 0.0,
+                "p95_ms": recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0,
+                "max_ms": stats["max_ms"],
+            }
+    summary["process_json_single_flight"] = {
+        "executed": _process_json_flights.executed,
+        "shared": _process_json_flights.shared,
+    }
+    return summary
+
+
+def request(method, url, endpoint="default", retries=DEFAULT_RETRIES, timeout=None, **kwargs):
+    """
+    Sends a request through the pooled session.
+
+    Connection errors, timeouts and 429/5xx responses are retried with
+    exponential backoff and full jitter. The final response is returned
+    as-is (callers decide whether to raise_for_status); the final
+    exception is re-raised.
+    """
+    if timeout is None:
+        timeout = ENDPOINT_TIMEOUTS.get(endpoint, ENDPOINT_TIMEOUTS["default"])
+    session = get_session()
+
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            _record(endpoint, (time.perf_counter() - start) * 1000, error=True)
+            if attempt == retries:
+                raise
+        else:
+            failed = response.status_code >= 400
+            _record(endpoint, (time.perf_counter() - start) * 1000, error=failed)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+
+        _record(endpoint, 0.0, retried=True)
+        time.sleep(random.uniform(0, BACKOFF_SECONDS * (2 ** attempt)))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a base URL whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker. After failure_threshold consecutive
+    failures the circuit opens and calls are refused for reset_timeout
+    seconds; then a single trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+
+
+def get_breaker(base_url):
+    """Returns the process-wide circuit breaker for a base URL."""
+    with _session_lock:
+        if base_url not in _breakers:
+            _breakers[base_url] = CircuitBreaker()
+        return _breakers[base_url]
+
+
+def get(url, endpoint="default", **kwargs):
+    return request("GET", url, endpoint=endpoint, **kwargs)
+
+
+def post(url, endpoint="default", **kwargs):
+    return request("POST", url, endpoint=endpoint, **kwargs)
+
+
+def process_json_payload(db_path, table, filters=None, fields="*", page=1, page_size=100):
+    """Builds the /process_json request body, which wraps the query in a JSON string."""
+    return {
+        "sample_key": json.dumps({
+            "db_path": db_path,
+            "table": table,
+            "filters": filters or {},
+            "fields": fields,
+            "page": page,
+            "page_size": page_size
+        })
+    }
+
+
+def process_json_query(db_path, table, filters=None, fields="*", page=1, page_size=100, url=PROCESS_JSON_URL):
+    """
+    Runs one /process_json query and returns the parsed JSON rows.
+    Raises requests.exceptions.HTTPError for non-2xx responses.
+
+    Concurrent callers with the same normalized query (from any session)
+    wait on a single request and share its parsed rows, which must not be
+    mutated.
+    """
+    payload = process_json_payload(db_path, table, filters, fields, page, page_size)
+    key = (url, json.dumps(json.loads(payload["sample_key"]), sort_keys=True))
+    return _process_json_flights.do(key, _post_process_json, url, payload)
+
+
+def _post_process_json(url, payload):
+    response = post(url, endpoint="process_json", json=payload)
+    response.raise_for_status()
+    return response.json()
+
+
+def columnar_accept_header():
+    """Accept header preferring Arrow IPC, then Parquet, then JSON (JSON only without pyarrow)."""
+    if pa is None:
+        return JSON_TYPE
+    return f"{ARROW_STREAM_TYPE}, {PARQUET_TYPE};q=0.9, {JSON_TYPE};q=0.5"
+
+
+def decode_frame(response):
+    """
+    Decodes a /process_json response into a DataFrame according to its
+    Content-Type. Arrow and Parquet bodies are converted with
+    split_blocks/self_destruct so null-free numeric columns are handed to
+    pandas without a copy; anything else is parsed as row-oriented JSON.
+    """
+    content_type = response.headers.get("Content-Type", JSON_TYPE).split(";")[0].strip()
+    if pa is not None and content_type == ARROW_STREAM_TYPE:
+        table = pa.ipc.open_stream(pa.py_buffer(response.content)).read_all()
+    elif pa is not None and content_type == PARQUET_TYPE:
+        table = pa.parquet.read_table(io.BytesIO(response.content))
+    else:
+        return pd.DataFrame(response.json())
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def process_json_frame(db_path, table, filters=None, fields="*", page=1, page_size=100, url=PROCESS_JSON_URL):
+    """
+    Like process_json_query but negotiates a binary columnar response
+    (Arrow IPC stream or Parquet) when the server offers one, falling back
+    to JSON, and returns a DataFrame.
+    """
+    payload = process_json_payload(db_path, table, filters, fields, page, page_size)
+    key = ("frame", url, json.dumps(json.loads(payload["sample_key"]), sort_keys=True))
+    return _process_json_flights.do(key, _post_process_json_frame, url, payload)
+
+
+def _post_process_json_frame(url, payload):
+    response = post(url, endpoint="process_json", json=payload, headers={"Accept": columnar_accept_header()})
+    response.raise_for_status()
+    return decode_frame(response)
+
+
+def iter_process_json_pages(db_path, table, filters=None, fields="*", page_size=PAGE_SIZE,
+                            max_workers=MAX_PAGE_WORKERS, url=PROCESS_JSON_URL, as_frames=False):
+    """
+    Fetches every page of a /process_json query and yields (page, rows) as
+    pages arrive, not necessarily in order. With as_frames=True each page is
+    fetched through process_json_frame and yielded as a DataFrame.
+
+    /process_json does not report a total, so the page count is discovered
+    as we go: page 1 is fetched first, then up to max_workers further pages
+    are kept in flight until a short or empty page marks the end.
+    """
+    fetch_page = process_json_frame if as_frames else process_json_query
+    first = fetch_page(db_path, table, filters, fields, 1, page_size, url)
+    yield 1, first
+    if len(first) < page_size:
+        return
+
+    # No page cap: a table of any size is read until its short page
+    last_page = float("inf")
+    next_page = 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        while pending or next_page <= last_page:
+            while next_page <= last_page and len(pending) < max_workers:
+                future = executor.submit(fetch_page, db_path, table, filters, fields, next_page, page_size, url)
+                pending[future] = next_page
+                next_page += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = pending.pop(future)
+                rows = future.result()
+                if _same_page(rows, first):
+                    # The server ignored the page number; page 1 already holds everything it returns
+                    last_page = min(last_page, page - 1)
+                elif len(rows) < page_size:
+                    last_page = min(last_page, page)
+                if len(rows) and page <= last_page:
+                    yield page, rows
+
+            # Pages past a short page are known to be empty
+            for future, page in list(pending.items()):
+                if page > last_page and future.cancel():
+                    del pending[future]
+
+
+def _same_page(rows, first):
+    if isinstance(rows, pd.DataFrame):
+        return rows.equals(first)
+    return rows == first
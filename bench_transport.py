@@ -0,0 +1,53 @@
+# bench_transport.py
+
+import time
+import tempfile
+import argparse
+import backend_client
+from backend_client import ARROW_STREAM_TYPE, PARQUET_TYPE, JSON_TYPE
+from local_backend import LocalBackend, synthetic_holdings, serve_in_thread
+
+
+def fetch(url, payload, accept):
+    start = time.perf_counter()
+    response = backend_client.post(url, endpoint="process_json", json=payload, headers={"Accept": accept})
+    response.raise_for_status()
+    fetched = time.perf_counter()
+    df = backend_client.decode_frame(response)
+    decoded = time.perf_counter()
+    return df, len(response.content), fetched - start, decoded - fetched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare JSON, Arrow IPC and Parquet transport for /process_json.")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    backend = LocalBackend(tempfile.mkdtemp(prefix="bench_transport_"))
+    backend.add_table("consolidated.db", "fund_holdings_latest", synthetic_holdings(args.rows))
+    server, base_url = serve_in_thread(backend)
+    url = f"{base_url}/process_json"
+    payload = backend_client.process_json_payload("consolidated.db", "fund_holdings_latest", page_size=args.rows)
+
+    formats = [("json", JSON_TYPE)]
+    if backend_client.pa is not None:
+        formats += [("arrow", ARROW_STREAM_TYPE), ("parquet", PARQUET_TYPE)]
+    else:
+        print("pyarrow not installed; only JSON is benchmarked.")
+
+    print(f"{args.rows} holdings rows, best of {args.repeat}")
+    print(f"{'format':<8} {'payload MB':>11} {'transfer s':>11} {'decode s':>9} {'frame MB':>9}")
+    for name, accept in formats:
+        runs = [fetch(url, payload, accept) for _ in range(args.repeat)]
+        df, size, _, _ = runs[-1]
+        transfer = min(run[2] for run in runs)
+        decode = min(run[3] for run in runs)
+        frame_mb = df.memory_usage(deep=True).sum() / 1e6
+        print(f"{name:<8} {size / 1e6:>11.1f} {transfer:>11.3f} {decode:>9.3f} {frame_mb:>9.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
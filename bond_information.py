@@ -2,8 +2,7 @@
 import streamlit as st
 import pandas as pd
 import requests
-import json
-import numpy as np
+from fetch_data import fetch_projected
 
 def load_bond_data():
     """
@@ -34,27 +33,14 @@ def _fetch_bond_data_cached():
     Internal function to fetch bond data from the API.
     This function is cached to improve performance.
     """
-    url = "https://my-combined-app-44056503414.us-central1.run.app/process_json"
     table_name = "fund_holdings_latest"
 
-    payload = {
-        "sample_key": json.dumps({
-            "db_path": "consolidated.db",
-            "table": table_name,
-            "filters": {},  # No filters for bonds
-            "fields": "*",
-            "page": 1,
-            "page_size": 100
-        })
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-    }
-
-    response = requests.post(url, json=payload, headers=headers, timeout=10)
-    response.raise_for_status()  # Raises HTTPError for bad responses
-    data = response.json()
+    data = fetch_projected(
+        db_path="consolidated.db",
+        table=table_name,
+        filters={},  # No filters for bonds
+        view="bond_information"
+    )
     return data
 
 
@@ -5,6 +5,9 @@ import os
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 import logging
+import uuid
+from embedding_store import open_embeddings
+from feedback_store import get_feedback_store
 
 # Try to import OpenAI with proper error handling
 try:
@@ -28,6 +31,8 @@ class ChatbotAndy:
         self.style = style
         self.client = openai_client
         self.conversation_history = []
+        self.feedback = get_feedback_store()
+        self.last_context_sentences = []
         self.greeting_keywords = ["hello", "hi", "hey", "good morning", "good afternoon", "good evening"]
         self.initial_greeting = self.get_greeting_response()
         self.embeddings, self.sentences = self.load_embeddings()
@@ -41,7 +46,7 @@ class ChatbotAndy:
             return None, []
 
         try:
-            embeddings = np.load(embeddings_file)
+            embeddings = open_embeddings(embeddings_file)
             with open(sentences_file, 'r', encoding='utf-8') as f:
                 sentences = [line.strip() for line in f]
             return embeddings, sentences
@@ -54,10 +59,16 @@ class ChatbotAndy:
             return []
         query_embedding = self.client.embeddings.create(input=[query], model="text-embedding-3-large").data[0].embedding
         similarities = cosine_similarity([query_embedding], self.embeddings)[0]
+        similarities += self.feedback.prior_vector(self.sentences)
         most_similar = np.argsort(similarities)[-num_sentences:]
-        context = " ".join([self.sentences[i] for i in most_similar])
+        self.last_context_sentences = [self.sentences[i] for i in most_similar]
+        context = " ".join(self.last_context_sentences)
         return context
 
+    def record_feedback(self, sentences, vote):
+        """Feeds a thumbs-up (+1) or thumbs-down (-1) back into retrieval ranking."""
+        self.feedback.record(sentences, vote)
+
     def generate_response(self, user_input):
         try:
             context = self.get_relevant_context(user_input)
@@ -194,6 +205,27 @@ def generate_response_with_retry(chatbot, prompt, max_retries=3, delay=2):
                 st.error(f"Failed to connect after {max_retries} attempts. Please try again later.")
                 raise e
 
+def render_feedback_buttons(chatbot):
+    """Thumbs up/down for the latest answer; each message can be voted on once."""
+    last_answer = st.session_state.get("last_answer")
+    if not last_answer or not last_answer["sentences"]:
+        return
+
+    thumbs_up_clicked = st.session_state.setdefault("thumbs_up_clicked", set())
+    thumbs_down_clicked = st.session_state.setdefault("thumbs_down_clicked", set())
+    message_id = last_answer["id"]
+    voted = message_id in thumbs_up_clicked or message_id in thumbs_down_clicked
+
+    col1, col2, _ = st.columns([1, 1, 10])
+    with col1:
+        if st.button("👍", key=f"thumbs_up_{message_id}", disabled=voted):
+            thumbs_up_clicked.add(message_id)
+            chatbot.record_feedback(last_answer["sentences"], 1)
+    with col2:
+        if st.button("👎", key=f"thumbs_down_{message_id}", disabled=voted):
+            thumbs_down_clicked.add(message_id)
+            chatbot.record_feedback(last_answer["sentences"], -1)
+
 def main():
     st.title("Xtrillion Chatbot")
 
@@ -226,10 +258,18 @@ def main():
                 if 'dot plot' in full_response.lower() or 'plots' in full_response.lower():
                     st.image("dot_plots.png", caption="Dot Plots", use_column_width=True)
 
+                # Remember which sentences answered this prompt so a vote can be fed back into ranking
+                st.session_state.last_answer = {
+                    "id": str(uuid.uuid4()),
+                    "sentences": list(st.session_state.chatbot.last_context_sentences),
+                }
+
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
                 full_response = "I'm sorry, but I encountered an error. Please try asking your question again."
 
+    render_feedback_buttons(st.session_state.chatbot)
+
     # Apply CSS to ensure chat input stays at the bottom
     st.markdown(
         """
@@ -0,0 +1,236 @@
+# compliance_rules.py
+
+import json
+import threading
+import numpy as np
+import pandas as pd
+from holdings_schema import holdings_version, rating_labels, rating_values, issuer_names
+from fund_aggregates import ESG_COLUMNS
+
+# Rule types: the weight share of the matching holdings, or the largest
+# weight of any single group (issuer, country, ...) among them
+SHARE = "share"
+MAX_GROUP = "max_group"
+RULE_TYPES = [SHARE, MAX_GROUP]
+
+# Example mandate limits for the demo funds. Each rule has an id, a
+# description, a type, a "min" and/or "max" weight share, optional "where"
+# predicates in the filter engine's shape ({column: [values]} or
+# {column: (low, high)}), and optional "funds" (all funds when omitted).
+DEFAULT_RULES = [
+    {"id": "esg_6_or_more_min_70", "description": "ESG >= 6 at least 70% of the fund",
+     "type": SHARE, "where": {"esg_score": (6, None)}, "min": 0.70,
+     "funds": ["Shin Kong Environmental Sustainability Bond Fund"]},
+    {"id": "em_min_70", "description": "Emerging markets at least 70% of the fund",
+     "type": SHARE, "where": {"emdm": ["EM"]}, "min": 0.70,
+     "funds": ["Shin Kong Emerging Wealthy Nations Bond Fund"]},
+    {"id": "issuer_max_10", "description": "Single issuer at most 10%",
+     "type": MAX_GROUP, "group_by": "issuer", "where": {"cash": [False]}, "max": 0.10},
+    {"id": "country_max_35", "description": "Single country at most 35%",
+     "type": MAX_GROUP, "group_by": "country", "where": {"cash": [False]}, "max": 0.35},
+    {"id": "cash_max_10", "description": "Cash at most 10%",
+     "type": SHARE, "where": {"cash": [True]}, "max": 0.10},
+]
+
+# Headroom down to this far below zero is float rounding in the weight shares, not a breach
+BREACH_TOLERANCE = 1e-9
+
+RESULT_COLUMNS = ["fund", "rule_id", "description", "value", "min", "max", "breach", "headroom", "worst_group"]
+
+
+def validate_rules(rules):
+    """Raises ValueError for a malformed rule set, so bad limits fail when loaded, not when shown."""
+    seen = set()
+    for rule in rules:
+        rule_id = rule.get("id")
+        if not rule_id or rule_id in seen:
+            raise ValueError(f"Rule ids must be present and unique: {rule_id!r}")
+        seen.add(rule_id)
+        if rule.get("type") not in RULE_TYPES:
+            raise ValueError(f"Rule {rule_id}: type must be one of {RULE_TYPES}")
+        if rule.get("min") is None and rule.get("max") is None:
+            raise ValueError(f"Rule {rule_id}: needs a min or a max")
+        if rule["type"] == MAX_GROUP and not rule.get("group_by"):
+            raise ValueError(f"Rule {rule_id}: max_group rules need group_by")
+    return rules
+
+
+class _Holdings:
+    """
+    Holdings of several funds stacked once, with per-column arrays, masks
+    and group codes built lazily and shared by every rule that uses them.
+    """
+
+    def __init__(self, holdings_by_fund):
+        self.funds = list(holdings_by_fund)
+        frames = [holdings_by_fund[fund] for fund in self.funds]
+        self.df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        self.fund_codes = np.repeat(np.arange(len(frames)), [len(frame) for frame in frames])
+        weighting = self.df['weighting'].to_numpy(dtype=np.float64, na_value=0.0) \
+            if 'weighting' in self.df.columns else np.zeros(len(self.df))
+        fund_weighting = np.bincount(self.fund_codes, weights=weighting, minlength=len(self.funds))
+        # Within-fund weight share of each holding
+        self.weight = np.divide(weighting, fund_weighting[self.fund_codes],
+                                out=np.zeros_like(weighting), where=fund_weighting[self.fund_codes] != 0)
+        self._columns = {}
+        self._masks = {}
+        self._groups = {}
+
+    def column(self, name):
+        # Besides the holdings' own columns rules can use issuer, esg_score (numeric) and cash
+        if name not in self._columns:
+            df = self.df
+            if name == "issuer":
+                values = issuer_names(df['name']) if 'name' in df.columns else None
+            elif name == "esg_score":
+                esg_column = next((col for col in ESG_COLUMNS if col in df.columns), None)
+                values = rating_values(rating_labels(df[esg_column])) if esg_column else None
+            elif name == "cash":
+                values = df['market_value'].isna() if 'market_value' in df.columns else None
+            else:
+                values = df[name] if name in df.columns else None
+            self._columns[name] = values
+        return self._columns[name]
+
+    def mask(self, where):
+        """AND of the rule's predicates, or None when a column is missing."""
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, predicate in (where or {}).items():
+            # Ranges are tuples and value sets lists, which serialize alike
+            key = (column, isinstance(predicate, tuple), json.dumps(predicate, default=str))
+            if key not in self._masks:
+                values = self.column(column)
+                if values is None:
+                    self._masks[key] = None
+                elif isinstance(predicate, tuple):
+                    numeric = values.to_numpy(dtype=np.float64, na_value=np.nan) \
+                        if pd.api.types.is_numeric_dtype(values) else rating_values(values).to_numpy(dtype=np.float64)
+                    low, high = predicate
+                    self._masks[key] = ((numeric >= low) if low is not None else ~np.isnan(numeric)) & \
+                        ((numeric <= high) if high is not None else True)
+                else:
+                    self._masks[key] = values.isin(predicate).to_numpy(dtype=bool, na_value=False)
+            if self._masks[key] is None:
+                return None
+            mask &= self._masks[key]
+        return mask
+
+    def group_weights(self, group_by, where):
+        """(funds x groups) weight matrix of the matching holdings, and the group labels."""
+        key = (group_by, repr(sorted((where or {}).items())))
+        if key not in self._groups:
+            values = self.column(group_by)
+            mask = self.mask(where)
+            if values is None or mask is None:
+                self._groups[key] = None
+            else:
+                codes, labels = pd.factorize(values)
+                keep = mask & (codes >= 0)
+                cells = self.fund_codes[keep] * len(labels) + codes[keep]
+                matrix = np.bincount(cells, weights=self.weight[keep], minlength=len(self.funds) * len(labels))
+                self._groups[key] = (matrix.reshape(len(self.funds), len(labels)), labels)
+        return self._groups[key]
+
+
+def evaluate_rules(rules, holdings_by_fund):
+    """
+    Evaluates every rule against every fund in {fund_name: holdings}.
+
+    All funds are stacked once; a share rule is one bincount of weight x
+    mask over the stack and a max_group rule one bincount over (fund,
+    group) cells, with masks and group matrices shared between rules.
+    Returns one row per (fund, applicable rule) with the measured share,
+    the limits, breach flag, headroom (negative when breached; within
+    BREACH_TOLERANCE of zero counts as met) and, for max_group rules, the
+    largest group. A rule whose columns are missing from the data gets a
+    NaN value and no breach.
+    """
+    stack = _Holdings(holdings_by_fund)
+    fund_index = {fund: position for position, fund in enumerate(stack.funds)}
+    rows = []
+    for rule in rules:
+        scope = [fund for fund in (rule.get("funds") or stack.funds) if fund in fund_index]
+        if not scope:
+            continue
+        positions = np.array([fund_index[fund] for fund in scope])
+        worst = [None] * len(scope)
+        if rule["type"] == SHARE:
+            mask = stack.mask(rule.get("where"))
+            values = np.full(len(scope), np.nan) if mask is None else np.bincount(
+                stack.fund_codes, weights=stack.weight * mask, minlength=len(stack.funds)
+            )[positions]
+        else:
+            groups = stack.group_weights(rule["group_by"], rule.get("where"))
+            if groups is None or groups[0].shape[1] == 0:
+                values = np.full(len(scope), np.nan if groups is None else 0.0)
+            else:
+                matrix, labels = groups
+                values = matrix[positions].max(axis=1)
+                worst = list(np.asarray(labels, dtype=object)[matrix[positions].argmax(axis=1)])
+
+        low, high = rule.get("min"), rule.get("max")
+        headroom = np.minimum(values - low if low is not None else np.inf,
+                              high - values if high is not None else np.inf)
+        for fund, value, room, group in zip(scope, values, headroom, worst):
+            rows.append({
+                "fund": fund, "rule_id": rule["id"], "description": rule.get("description", rule["id"]),
+                "value": value, "min": low, "max": high,
+                "breach": bool(room < -BREACH_TOLERANCE), "headroom": room, "worst_group": group,
+            })
+    return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+class ComplianceEngine:
+    """
+    Keeps the latest rule results per fund. evaluate() re-runs the rules
+    only for funds whose data version changed since they were last
+    checked (or for every fund after set_rules), so routine refreshes
+    cost one vectorized pass over the changed funds.
+    """
+
+    def __init__(self, rules=None):
+        self._lock = threading.Lock()
+        self.set_rules(DEFAULT_RULES if rules is None else rules)
+
+    def set_rules(self, rules):
+        rules = validate_rules(list(rules))
+        with self._lock:
+            self.rules = rules
+            self._results = {}
+
+    def evaluate(self, holdings_by_fund):
+        """Results for the given funds (see evaluate_rules); shared, must not be mutated."""
+        versions = {fund: (holdings_version(df), len(df)) for fund, df in holdings_by_fund.items()}
+        with self._lock:
+            rules = self.rules
+            changed = {fund: holdings_by_fund[fund] for fund, version in versions.items()
+                       if self._results.get(fund, (None,))[0] != version}
+        if changed:
+            results = evaluate_rules(rules, changed)
+            by_fund = dict(tuple(results.groupby("fund", sort=False))) if len(results) else {}
+            with self._lock:
+                if self.rules is rules:
+                    for fund in changed:
+                        self._results[fund] = (versions[fund], by_fund.get(fund, results.iloc[0:0]).reset_index(drop=True))
+        with self._lock:
+            frames = [self._results[fund][1] for fund in holdings_by_fund if fund in self._results]
+        if not frames:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def breaches(self, holdings_by_fund):
+        results = self.evaluate(holdings_by_fund)
+        return results[results["breach"].to_numpy(dtype=bool)]
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_compliance_engine(time_selection="Latest"):
+    """Process-wide engine per time selection."""
+    with _engines_lock:
+        engine = _engines.get(time_selection)
+        if engine is None:
+            engine = _engines[time_selection] = ComplianceEngine()
+        return engine
@@ -2,6 +2,8 @@ import streamlit as st
 import plotly.express as px
 import pandas as pd
 import requests
+from report_utils import load_country_data
+from figure_cache import cached_figure
 
 # Main function to encapsulate the app logic
 def main():
@@ -101,27 +103,25 @@ def main():
 # Function to fetch data from your API
 @st.cache_data(persist="disk")
 def fetch_data_for_country(country):
-    url = "https://my-combined-app-vpljqiia2a-uc.a.run.app/process_json"
-    payload = {
-        "sample_key": f'{{"db_path": "credit_research.db", "table": "FullReport", "filters": {{"Country": "{country}"}}, "fields": "*", "page": 1, "page_size": 10}}'
-    }
-
-    all_data = []
-    for page in range(1, 3):
-        response = requests.post(url, json=payload)
-        if response.status_code == 200:
-            all_data.extend(response.json())
-        else:
-            st.error(f"Failed to retrieve data for {country} (page {page})")
-            return None
+    try:
+        all_data = load_country_data(country)
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to retrieve data for {country}: {e}")
+        return None
     
     if all_data:
         return all_data[0]
     else:
         return None
 
-# Function to plot charts
+# Function to plot charts; unchanged series are served from the figure cache
 def plot_chart(df, y_column, title, color):
+    return cached_figure(
+        "credit_reports.plot_chart", df[['Year', y_column]],
+        lambda: _build_bar_chart(df, y_column, title, color), params=(y_column, title, color)
+    )
+
+def _build_bar_chart(df, y_column, title, color):
     y_min = df[y_column].min()
     y_max = df[y_column].max()
 
@@ -246,48 +246,17 @@ def create_country_report_tab(country, color_palette):
     """
 
     def fetch_data_for_country(country):
-        url = "https://my-combined-app-vpljqiia2a-uc.a.run.app/process_json"
-        payload = {
-            "sample_key": f'{{"db_path": "credit_research.db", "table": "FullReport", "filters": {{"Country": "{country}"}}, "fields": "*", "page": 1, "page_size": 10}}'
-        }
-
-        all_data = []
-        for page in range(1, 3):
-            response = requests.post(url, json=payload)
-            if response.status_code == 200:
-                all_data.extend(response.json())
-            else:
-                st.error(f"Failed to retrieve data for {country} (page {page})")
-                return None
+        try:
+            all_data = load_country_data(country)
+        except requests.exceptions.RequestException as e:
+            st.error(f"Failed to retrieve data for {country}: {e}")
+            return None
 
         if all_data:
             return all_data[0]
         else:
             return None
 
-    def plot_chart(df, y_column, title, color):
-        y_min = df[y_column].min()
-        y_max = df[y_column].max()
-
-        if y_min == y_max:
-            y_range = [y_min - 1, y_max + 1]
-        else:
-            y_range = [y_min - 0.05 * abs(y_min), y_max + 0.05 * abs(y_max)]
-
-        fig = px.bar(df, x='Year', y=y_column,
-                     title=title,
-                     color_discrete_sequence=[color],
-                     height=375)
-        fig.update_traces(marker_line_width=0)
-        fig.update_layout(
-            yaxis=dict(range=y_range),
-            plot_bgcolor='#1f1f1f',
-            paper_bgcolor='#1f1f1f',
-            font=dict(color='white'),
-            margin=dict(l=20, r=20, t=60, b=40),
-            autosize=True
-        )
-        return fig
     @st.cache_data(persist="disk")
     def create_data_table(df, y_column):
     # Define the desired width for the Year column
@@ -0,0 +1,62 @@
+# embedding_store.py
+
+import os
+import threading
+import numpy as np
+
+# Process-wide cache of opened embedding files: {abspath: (mtime, array)}
+_stores = {}
+_norms = {}
+_lock = threading.Lock()
+
+
+def open_embeddings(embeddings_path, mmap=True):
+    """
+    Opens an .npy embedding matrix read-only through np.load(mmap_mode='r').
+
+    The returned array is backed by the OS page cache, so several Streamlit
+    workers on one host share a single physical copy and opening is O(1)
+    regardless of file size. Handles are cached per process and reopened only
+    when the file's mtime changes.
+    """
+    if not mmap:
+        return np.load(embeddings_path)
+
+    path = os.path.abspath(embeddings_path)
+    mtime = os.path.getmtime(path)
+
+    with _lock:
+        cached = _stores.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        embeddings = np.load(path, mmap_mode='r')
+        _stores[path] = (mtime, embeddings)
+        _norms.pop(path, None)
+        return embeddings
+
+
+def embedding_norms(embeddings_path):
+    """
+    Returns the row L2 norms of an embedding file, computed once per file
+    version instead of on every query.
+    """
+    path = os.path.abspath(embeddings_path)
+    embeddings = open_embeddings(path)
+
+    with _lock:
+        cached = _norms.get(path)
+        if cached is not None and cached[0] is embeddings:
+            return cached[1]
+
+    norms = np.linalg.norm(embeddings, axis=1)
+    with _lock:
+        _norms[path] = (embeddings, norms)
+    return norms
+
+
+def clear_cache():
+    """Drops all cached handles, e.g. after rebuilding the embedding files."""
+    with _lock:
+        _stores.clear()
+        _norms.clear()
@@ -0,0 +1,82 @@
+# exact_search.py
+
+import os
+import heapq
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
+from embedding_store import open_embeddings
+
+DEFAULT_BLOCK_ROWS = 16384
+
+
+def _score_block(embeddings, start, stop, queries, query_norms, top_k, prior=None):
+    """
+    Scores one block of rows against every query and returns, per query,
+    the block's partial top-k as (scores, global_row_ids).
+    """
+    # Same arithmetic as QAEngine.query_embeddings: row norms in the stored
+    # dtype, dot products in float64 (the query is a list of Python floats)
+    block = np.asarray(embeddings[start:stop])
+    norms = np.linalg.norm(block, axis=1)
+    similarities = (block.astype(np.float64) @ queries.T) / np.outer(norms, query_norms)
+    if prior is not None:
+        similarities += prior[start:stop, None]
+
+    k = min(top_k, stop - start)
+    top = np.argpartition(similarities, -k, axis=0)[-k:]
+    scores = np.take_along_axis(similarities, top, axis=0)
+    return scores.T, (top + start).T
+
+
+def exact_top_k(embeddings_path, queries, top_k=10, block_rows=DEFAULT_BLOCK_ROWS, max_workers=None, prior=None):
+    """
+    Exact cosine top-k over an embedding file that may be larger than RAM.
+
+    The memory-mapped file is streamed in fixed-size blocks; each block is a
+    single matmul against all queries and runs on a thread pool (NumPy
+    releases the GIL). A running top-k heap per query is merged as blocks
+    complete, and at most 2 * max_workers blocks are in flight, so memory
+    stays bounded by the block size rather than the corpus size.
+
+    `prior` is an optional per-row score offset (e.g. the feedback prior)
+    added to every query's similarities before ranking.
+
+    Returns one [(row_id, score)] list per query, best first.
+    """
+    embeddings = open_embeddings(embeddings_path)
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float64))
+    query_norms = np.linalg.norm(queries, axis=1)
+    num_rows = len(embeddings)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    heaps = [[] for _ in range(len(queries))]
+
+    def merge(result):
+        scores, row_ids = result
+        for heap, query_scores, query_ids in zip(heaps, scores, row_ids):
+            for score, row_id in zip(query_scores.tolist(), query_ids.tolist()):
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (score, row_id))
+                elif score > heap[0][0]:
+                    heapq.heapreplace(heap, (score, row_id))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        for start in range(0, num_rows, block_rows):
+            pending.add(executor.submit(
+                _score_block, embeddings, start, min(start + block_rows, num_rows),
+                queries, query_norms, top_k, prior
+            ))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future.result())
+        for future in pending:
+            merge(future.result())
+
+    return [
+        [(row_id, score) for score, row_id in sorted(heap, reverse=True)]
+        for heap in heaps
+    ]
@@ -0,0 +1,169 @@
+# export_utils.py
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from backend_client import pa
+
+DEFAULT_CHUNK_ROWS = 50_000
+# Excel's sheet limit less the header row; longer exports continue on a new sheet
+XLSX_MAX_ROWS = 1_048_575
+MAX_CACHED_EXPORTS = 16
+
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+_exports = OrderedDict()
+_lock = threading.Lock()
+
+
+def iter_frame_chunks(df, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yields consecutive row slices of a DataFrame (views, not copies)."""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def write_csv(chunks, path):
+    """Appends each chunk to one CSV file, writing the header once. Returns the row count."""
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in chunks:
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+
+def write_parquet(chunks, path):
+    """
+    Writes each chunk as its own Parquet row group. The file schema is taken
+    from the first chunk and later chunks are cast to it, so a page where a
+    column happens to be all missing does not break the file.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for Parquet export; install it from requirements.txt")
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pa.parquet.ParquetWriter(path, table.schema)
+            elif table.schema != writer.schema:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        pd.DataFrame().to_parquet(path)
+    return rows
+
+
+def _xlsx_rows(chunk):
+    # openpyxl wants plain Python values: None for missing, datetime for dates
+    values = chunk.astype(object).where(chunk.notna(), None)
+    for column in chunk.columns[[pd.api.types.is_datetime64_any_dtype(dtype) for dtype in chunk.dtypes]]:
+        values[column] = [value.to_pydatetime() if value is not None else None for value in values[column]]
+    for row in values.itertuples(index=False, name=None):
+        yield [value.item() if isinstance(value, np.generic) else value for value in row]
+
+
+def write_xlsx(chunks, path, sheet_name="Holdings"):
+    """
+    Streams chunks into an XLSX file with openpyxl's write-only workbook,
+    which writes rows straight to disk instead of building every cell in
+    memory. Rows past Excel's sheet limit continue on "<sheet_name> 2", ...
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = None
+    sheets = 0
+    sheet_rows = 0
+    rows = 0
+    for chunk in chunks:
+        for row in _xlsx_rows(chunk):
+            if sheet is None or sheet_rows >= XLSX_MAX_ROWS:
+                sheets += 1
+                sheet = workbook.create_sheet(sheet_name if sheets == 1 else f"{sheet_name} {sheets}")
+                sheet.append([str(column) for column in chunk.columns])
+                sheet_rows = 0
+            sheet.append(row)
+            sheet_rows += 1
+            rows += 1
+    if sheet is None:
+        workbook.create_sheet(sheet_name)
+    workbook.save(path)
+    return rows
+
+
+WRITERS = {"CSV": write_csv, "Parquet": write_parquet, "Excel": write_xlsx}
+
+
+def export_chunks(chunks, fmt, directory=None):
+    """
+    Writes an iterable of DataFrame chunks to a new temp file in `fmt`
+    ("CSV", "Parquet" or "Excel") and returns its path. Only one chunk is
+    held at a time, so the size of an export is bounded by disk, not memory.
+    The caller owns the file.
+    """
+    extension, _ = EXPORT_FORMATS[fmt]
+    handle, path = tempfile.mkstemp(suffix=f".{extension}", prefix="export-", dir=directory)
+    os.close(handle)
+    try:
+        WRITERS[fmt](chunks, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def get_export(key, fmt, make_chunks):
+    """
+    Returns the path of the export for `key` in `fmt`, writing it with
+    `make_chunks()` on first use. Files are kept in a small LRU and deleted
+    when evicted, so Streamlit reruns serve the same file instead of
+    rewriting it. `key` must change whenever the exported data does.
+    """
+    cache_key = (key, fmt)
+    with _lock:
+        path = _exports.get(cache_key)
+        if path is not None and os.path.exists(path):
+            _exports.move_to_end(cache_key)
+            return path
+
+    path = export_chunks(make_chunks(), fmt)
+    evicted = []
+    with _lock:
+        _exports[cache_key] = path
+        while len(_exports) > MAX_CACHED_EXPORTS:
+            evicted.append(_exports.popitem(last=False)[1])
+    for old_path in evicted:
+        try:
+            os.remove(old_path)
+        except OSError as e:
+            print(f"Warning: could not remove export file {old_path}: {e}")
+    return path
+
+
+def export_file_name(stem, fmt):
+    slug = "_".join(str(stem).split()) or "export"
+    return f"{slug}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def clear_cache():
+    with _lock:
+        paths = list(_exports.values())
+        _exports.clear()
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
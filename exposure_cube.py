@@ -0,0 +1,229 @@
+# exposure_cube.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from holdings_schema import holdings_version, rating_labels, issuer_names
+from fund_aggregates import NFA_COLUMNS, ESG_COLUMNS
+
+# Cube dimensions, coarsest first; every query rolls up from the (fund, ..., isin) grain
+DIMENSIONS = ["fund", "region", "country", "emdm", "currency", "nfa_rating", "esg_rating", "issuer", "isin"]
+
+# Additive measures kept per cell; averages are derived from them at query time
+MEASURES = ["value", "face_amount", "duration_value", "spread_value", "dts_value", "holdings"]
+
+DRILL_PATHS = {
+    "Country → Issuer → ISIN": ["country", "issuer", "isin"],
+    "Region → Country → Issuer": ["region", "country", "issuer"],
+    "Fund → Country → Issuer": ["fund", "country", "issuer"],
+    "EM/DM → Currency → Country": ["emdm", "currency", "country"],
+    "NFA Rating → Country → Issuer": ["nfa_rating", "country", "issuer"],
+    "ESG Rating → Country → Issuer": ["esg_rating", "country", "issuer"],
+}
+
+UNKNOWN = "Unknown"
+MAX_CACHED_QUERIES = 128
+
+
+def fund_partial(holdings):
+    """
+    One fund's cells: holdings summed at the finest (region, ..., isin)
+    grain. 'value' is market value; cash lines, which carry a weighting but
+    no market value, are valued at the fund's implied value per weighting
+    point. Duration, spread and DTS are stored value-weighted so cells add.
+    """
+    index = holdings.index
+    weighting = holdings['weighting'].to_numpy(dtype=np.float64, na_value=0.0) \
+        if 'weighting' in holdings.columns else np.zeros(len(holdings))
+    market_value = holdings['market_value'].to_numpy(dtype=np.float64, na_value=np.nan) \
+        if 'market_value' in holdings.columns else np.full(len(holdings), np.nan)
+    invested = ~np.isnan(market_value)
+    invested_weighting = weighting[invested].sum()
+    value_per_point = market_value[invested].sum() / invested_weighting if invested_weighting else 0.0
+    value = np.where(invested, market_value, weighting * value_per_point)
+
+    def measure(column):
+        if column not in holdings.columns:
+            return np.zeros(len(holdings))
+        return np.nan_to_num(holdings[column].to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def dimension(column):
+        if column not in holdings.columns:
+            return pd.Series(UNKNOWN, index=index)
+        return holdings[column].astype(object).where(holdings[column].notna(), UNKNOWN)
+
+    nfa_column = next((col for col in NFA_COLUMNS if col in holdings.columns), None)
+    esg_column = next((col for col in ESG_COLUMNS if col in holdings.columns), None)
+    duration = measure('duration')
+    spread = measure('spread')
+    cells = pd.DataFrame({
+        "region": dimension('region'),
+        "country": dimension('country'),
+        "emdm": dimension('emdm'),
+        "currency": dimension('currency'),
+        "nfa_rating": rating_labels(holdings[nfa_column]).astype(object) if nfa_column else UNKNOWN,
+        "esg_rating": rating_labels(holdings[esg_column]).astype(object) if esg_column else UNKNOWN,
+        "issuer": issuer_names(holdings['name']).astype(object).fillna(UNKNOWN)
+        if 'name' in holdings.columns else UNKNOWN,
+        "isin": dimension('isin'),
+        "value": value,
+        "face_amount": measure('face_amount'),
+        "duration_value": value * duration,
+        "spread_value": value * spread,
+        "dts_value": value * duration * spread,
+        "holdings": 1,
+    }, index=index)
+    partial = cells.groupby(DIMENSIONS[1:], sort=False).sum().reset_index()
+    for column in DIMENSIONS[1:]:
+        partial[column] = partial[column].astype(str).astype("category")
+    return partial
+
+
+class ExposureCube:
+    """
+    Cross-fund exposure cube over the holdings schema.
+
+    Each fund contributes a partial aggregate (its cells at the finest
+    grain), rebuilt only when that fund's data version changes. Queries
+    group the cells by any subset of DIMENSIONS, optionally filtered, and
+    are cached until the next fund update, so rollups and drill-downs
+    never touch the raw holdings.
+    """
+
+    def __init__(self):
+        self._partials = {}
+        self._generation = 0
+        self._cells = None
+        self._queries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update_fund(self, fund_name, holdings):
+        """Replaces one fund's cells. Returns False when its data is unchanged."""
+        version = (holdings_version(holdings), len(holdings))
+        with self._lock:
+            current = self._partials.get(fund_name)
+            if current is not None and current[0] == version:
+                return False
+        partial = fund_partial(holdings)
+        with self._lock:
+            self._partials[fund_name] = (version, partial)
+            self._generation += 1
+            self._cells = None
+            self._queries.clear()
+        return True
+
+    def remove_fund(self, fund_name):
+        with self._lock:
+            if self._partials.pop(fund_name, None) is not None:
+                self._generation += 1
+                self._cells = None
+                self._queries.clear()
+
+    def funds(self):
+        with self._lock:
+            return list(self._partials)
+
+    def cells(self):
+        """Every fund's cells stacked, with categorical dimensions for fast grouping."""
+        return self._snapshot()[1]
+
+    def _snapshot(self):
+        # (generation, cells) read together, so query results are cached against the cells they came from
+        with self._lock:
+            if self._cells is not None:
+                return self._generation, self._cells
+            generation = self._generation
+            funds = list(self._partials)
+            partials = [partial for _, partial in self._partials.values()]
+        if partials:
+            # Stack per column: categoricals are unioned, so no labels are re-parsed
+            cells = pd.DataFrame({
+                "fund": pd.Categorical.from_codes(
+                    np.repeat(np.arange(len(funds)), [len(partial) for partial in partials]), funds
+                ),
+                **{column: union_categoricals([partial[column] for partial in partials])
+                   for column in DIMENSIONS[1:]},
+                **{measure: np.concatenate([partial[measure].to_numpy() for partial in partials])
+                   for measure in MEASURES},
+            })
+        else:
+            cells = pd.DataFrame({column: pd.Categorical([]) for column in DIMENSIONS}
+                                 | {measure: np.zeros(0) for measure in MEASURES})
+        with self._lock:
+            if generation == self._generation:
+                self._cells = cells
+        return generation, cells
+
+    def query(self, group_by, filters=None):
+        """
+        Exposures grouped by `group_by` (a list of DIMENSIONS), over the cells
+        matching `filters` ({dimension: [values]}). Weights and contributions
+        are fractions of the filtered total; duration, spread and DTS are
+        value-weighted averages within each group (cash counts as zero).
+        The result is shared and must not be mutated.
+        """
+        group_by = list(group_by)
+        filters = {dimension: values for dimension, values in (filters or {}).items() if values}
+        generation, cells = self._snapshot()
+        key = (generation, tuple(group_by), tuple(sorted((dimension, tuple(sorted(map(str, values))))
+                                                          for dimension, values in filters.items())))
+        with self._lock:
+            result = self._queries.get(key)
+            if result is not None:
+                self._queries.move_to_end(key)
+                return result
+
+        mask = np.ones(len(cells), dtype=bool)
+        for dimension, values in filters.items():
+            mask &= cells[dimension].isin([str(value) for value in values]).to_numpy()
+        cells = cells[mask]
+
+        table = cells.groupby(group_by, observed=True, sort=False)[MEASURES].sum() if group_by \
+            else cells[MEASURES].sum().to_frame().T
+        total = table["value"].sum()
+        value = table["value"].where(table["value"] != 0)
+        result = pd.DataFrame({
+            "value": table["value"],
+            "weight": table["value"] / total if total else 0.0,
+            "face_amount": table["face_amount"],
+            "holdings": table["holdings"].astype(int),
+            "duration": table["duration_value"] / value,
+            "spread": table["spread_value"] / value,
+            "dts": table["dts_value"] / value,
+            "duration_contribution": table["duration_value"] / total if total else 0.0,
+            "dts_contribution": table["dts_value"] / total if total else 0.0,
+        }).sort_values("value", ascending=False)
+        result = result.reset_index() if group_by else result.reset_index(drop=True)
+
+        with self._lock:
+            if generation == self._generation:
+                self._queries[key] = result
+            while len(self._queries) > MAX_CACHED_QUERIES:
+                self._queries.popitem(last=False)
+        return result
+
+    def drill_down(self, path, selection=(), filters=None):
+        """
+        The next level of a drill path: with path ["country", "issuer",
+        "isin"] and selection ("Mexico",), the issuers within Mexico.
+        """
+        level = min(len(selection), len(path) - 1)
+        filters = dict(filters or {})
+        for dimension, value in zip(path[:level], selection):
+            filters[dimension] = [value]
+        return self.query([path[level]], filters)
+
+
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+
+def get_exposure_cube(time_selection="Latest"):
+    """Process-wide cube per time selection, shared by every Streamlit session."""
+    with _cubes_lock:
+        cube = _cubes.get(time_selection)
+        if cube is None:
+            cube = _cubes[time_selection] = ExposureCube()
+        return cube
@@ -0,0 +1,169 @@
+# feedback_store.py
+
+import os
+import json
+import threading
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: votes from concurrent processes may be lost
+    fcntl = None
+
+DEFAULT_FEEDBACK_FILE = './openai_large_embeddings/feedback_votes.json'
+
+# Corpus lines captured from a thumbs-up in the original app start with this prefix
+LIKED_PREFIX = "Liked message:"
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def sentence_keys(sentence):
+    """
+    Returns (doc_id, sentence_id) for a corpus line formatted as
+    "title #doc_name|doc_id|#tags|sentence_number|content".
+    """
+    parts = sentence.split('|')
+    if len(parts) < 4:
+        return sentence, sentence
+    doc_id = parts[1]
+    return doc_id, f"{doc_id}#{parts[3]}"
+
+
+class FeedbackStore:
+    """
+    Persists thumbs-up/down votes per sentence and per document, and keeps a
+    prior-score vector aligned with the embedding rows so retrieval can blend
+    feedback in with a single vectorized add.
+
+    The vote file is shared by every worker process. A vote re-reads the file
+    under an exclusive lock (<path>.lock), adds itself, and replaces the
+    file atomically, so concurrent votes are merged rather than overwritten;
+    readers reload the file whenever its modification stamp changes.
+    """
+
+    def __init__(self, path=DEFAULT_FEEDBACK_FILE, weight=0.05, liked_bonus=1.0):
+        self.path = path
+        # Largest shift a prior can apply to a cosine similarity
+        self.weight = weight
+        self.liked_bonus = liked_bonus
+        self.votes = {"sentences": {}, "docs": {}}
+        self.version = 0
+        self._stamp = None
+        self._loaded = False
+        self._priors = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read_votes(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return {"sentences": data.get("sentences", {}), "docs": data.get("docs", {})}
+        except FileNotFoundError:
+            return {"sentences": {}, "docs": {}}
+        except Exception as e:
+            print(f"Warning: could not read feedback votes from {self.path}: {e}")
+            return None
+
+    def load(self):
+        """Reads the vote file if another process changed it since the last read."""
+        with self._lock:
+            stamp = self._file_stamp()
+            if self._loaded and stamp == self._stamp:
+                return
+            votes = self._read_votes()
+            if votes is not None:
+                self.votes = votes
+                self._stamp = stamp
+                self._loaded = True
+                self.version += 1
+                self._priors.clear()
+
+    @contextmanager
+    def _file_lock(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def save(self):
+        """Writes the votes to a temp file and swaps it in, so readers never see a partial file."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.votes, f, indent=2)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._file_stamp()
+
+    def record(self, sentences, vote):
+        """
+        Records a vote (+1 thumbs up, -1 thumbs down) for the corpus lines that
+        were used to answer a question, and for their documents.
+        """
+        if not sentences or vote == 0:
+            return
+        with self._lock, self._file_lock():
+            # Start from the file as other processes left it, then add this vote
+            votes = self._read_votes()
+            if votes is not None:
+                self.votes = votes
+            for sentence in sentences:
+                doc_id, sentence_id = sentence_keys(sentence)
+                self.votes["sentences"][sentence_id] = self.votes["sentences"].get(sentence_id, 0) + vote
+            for doc_id in {sentence_keys(sentence)[0] for sentence in sentences}:
+                self.votes["docs"][doc_id] = self.votes["docs"].get(doc_id, 0) + vote
+            self.version += 1
+            self._priors.clear()
+            self.save()
+
+    def prior_vector(self, sentences):
+        """
+        Returns a float32 vector of per-row score offsets aligned with
+        `sentences` (and therefore with the embedding rows). Recomputed only
+        after a vote (in any process), not per query.
+        """
+        self.load()
+        key = id(sentences)
+        with self._lock:
+            cached = self._priors.get(key)
+            if cached is not None and cached[0] is sentences and len(cached[1]) == len(sentences):
+                return cached[1]
+
+            sentence_votes = self.votes["sentences"]
+            doc_votes = self.votes["docs"]
+            net = np.zeros(len(sentences), dtype=np.float32)
+            for i, sentence in enumerate(sentences):
+                doc_id, sentence_id = sentence_keys(sentence)
+                net[i] = sentence_votes.get(sentence_id, 0) + 0.5 * doc_votes.get(doc_id, 0)
+                if sentence.startswith(LIKED_PREFIX):
+                    net[i] += self.liked_bonus
+
+            prior = (self.weight * np.tanh(net / 3.0)).astype(np.float32)
+            self._priors[key] = (sentences, prior)
+            return prior
+
+
+def get_feedback_store():
+    """Process-wide store shared by every Streamlit session."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = FeedbackStore()
+        return _default_store
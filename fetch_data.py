@@ -1,32 +1,88 @@
 # fetch_data.py
 
+import threading
 import requests
-import json
-import pandas as pd
-
-def fetch_fund_data(fund_name, time_selection):
-    """
-    Fetches fund data from the API.
-    """
-    url = "https://my-combined-app-44056503414.us-central1.run.app/process_json"
-    table_name = "fund_holdings_latest" if time_selection == "Latest" else "fund_holdings_me"
-
-    payload = {
-        "sample_key": json.dumps({
-            "db_path": "consolidated.db",
-            "table": table_name,
-            "filters": {"fund_name": fund_name},
-            "fields": "*",
-            "page": 1,
-            "page_size": 100
-        })
-    }
-
-    headers = {
-        "Content-Type": "application/json",
-    }
-
-    response = requests.post(url, json=payload, headers=headers, timeout=10)
-    response.raise_for_status()  # Raises HTTPError for bad responses
-    data = response.json()
-    return pd.DataFrame(data)
+from backend_client import iter_process_json_pages
+from local_replica import get_replica
+from view_fields import view_columns, view_fields
+from holdings_schema import normalize_holdings
+from snapshot_store import get_snapshot_store
+from exposure_cube import get_exposure_cube
+
+def iter_table_chunks(db_path, table, filters=None, fields="*"):
+    """
+    Yields (page, DataFrame) chunks of a backend table as pages arrive.
+    """
+    for page, frame in iter_process_json_pages(db_path, table, filters, fields, as_frames=True):
+        yield page, frame
+
+# (db_path, table, view) projections the backend rejected; those are read with "*"
+_unsupported_projections = set()
+_projections_lock = threading.Lock()
+
+def fetch_projected(db_path, table, filters, view):
+    """
+    Reads a table through the local replica, requesting only the columns
+    `view` renders. If the backend rejects the projection (e.g. a column
+    missing from that table), falls back to "*" and projects locally; the
+    rejection is remembered so later calls go straight to "*".
+    """
+    replica = get_replica()
+    fields = view_fields(view)
+    with _projections_lock:
+        unsupported = (db_path, table, view) in _unsupported_projections
+    if fields != "*" and not unsupported:
+        try:
+            return replica.get(db_path, table, filters, fields)
+        except requests.exceptions.HTTPError as e:
+            # Only a client error says the projection itself is unsupported; server errors may pass
+            if e.response is not None and 400 <= e.response.status_code < 500:
+                with _projections_lock:
+                    _unsupported_projections.add((db_path, table, view))
+    df = replica.get(db_path, table, filters, "*")
+    if fields == "*":
+        return df
+    return df[[col for col in view_columns(view) if col in df.columns]]
+
+def fund_table(time_selection):
+    return "fund_holdings_latest" if time_selection == "Latest" else "fund_holdings_me"
+
+def iter_fund_holdings_chunks(time_selection, fund_name=None, fields="*"):
+    """
+    Yields typed holdings one backend page at a time, for one fund or (with
+    fund_name=None) every fund, so exports never hold the whole table.
+    """
+    filters = {"fund_name": fund_name} if fund_name else None
+    for _, frame in iter_table_chunks("consolidated.db", fund_table(time_selection), filters, fields):
+        if len(frame):
+            yield normalize_holdings(frame)
+
+def fetch_fund_data(fund_name, time_selection, view="fund_report"):
+    """
+    Fetches fund data from the API, typed to the holdings schema.
+    """
+    table_name = fund_table(time_selection)
+
+    # Served from the local replica; the backend is only asked when the copy is missing or stale
+    fund_data = normalize_holdings(fetch_projected(
+        db_path="consolidated.db",
+        table=table_name,
+        filters={"fund_name": fund_name},
+        view=view
+    ))
+    return fund_data
+
+def record_fund_refresh(fund_name, time_selection, fund_data):
+    """
+    Writes what a refreshed fund report feeds: the local snapshot history
+    (unchanged data is not stored again) and the fund's exposure-cube cells
+    (rebuilt only if its data changed). Called from the scheduled refresh,
+    so reads never write.
+    """
+    if fund_data is None or fund_data.empty:
+        return
+    try:
+        get_snapshot_store().capture(fund_name, fund_data, source=fund_table(time_selection))
+    except OSError as e:
+        print(f"Warning: could not capture snapshot for {fund_name}: {e}")
+    get_exposure_cube(time_selection).update_fund(fund_name, fund_data)
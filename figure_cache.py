@@ -0,0 +1,90 @@
+# figure_cache.py
+
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+DEFAULT_THEME = "dark"
+MAX_FIGURES = 256
+
+
+def data_fingerprint(data):
+    """Content hash of a chart's input data (DataFrame, Series, array or JSON-able value)."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        row_hash = int(pd.util.hash_pandas_object(data, index=True).to_numpy().sum())
+        columns = list(data.columns) if isinstance(data, pd.DataFrame) else [data.name]
+        dtypes = [str(dtype) for dtype in (data.dtypes if isinstance(data, pd.DataFrame) else [data.dtype])]
+        return f"{len(data)}:{row_hash & 0xFFFFFFFFFFFFFFFF:016x}:{hash((tuple(map(str, columns)), tuple(dtypes)))}"
+    if isinstance(data, np.ndarray):
+        return f"{data.shape}:{data.dtype}:{hash(data.tobytes())}"
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+def theme_key(theme):
+    return theme if isinstance(theme, str) else json.dumps(theme, sort_keys=True, default=str)
+
+
+class FigureCache:
+    """
+    LRU cache of finished Plotly figures, keyed by (builder, data
+    fingerprint, theme, params) and stored as figure JSON.
+
+    A hit rebuilds the figure from its JSON without Plotly's property
+    validation, which costs about a millisecond against tens of
+    milliseconds for building a px/go figure. Each hit returns a new Figure,
+    so callers may update it freely.
+    """
+
+    def __init__(self, max_entries=MAX_FIGURES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, builder, data, build, theme=DEFAULT_THEME, params=()):
+        key = (builder, data_fingerprint(data), theme_key(theme), json.dumps(params, default=str))
+        with self._lock:
+            figure_json = self._figures.get(key)
+            if figure_json is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+        if figure_json is not None:
+            return go.Figure(json.loads(figure_json), _validate=False)
+
+        figure = build()
+        with self._lock:
+            self.misses += 1
+            self._figures[key] = figure.to_json()
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_figure_cache():
+    """Process-wide figure cache shared by every Streamlit session."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FigureCache()
+        return _default_cache
+
+
+def cached_figure(builder, data, build, theme=DEFAULT_THEME, params=()):
+    """
+    Returns the figure `build()` would produce for `data`, from the cache
+    when an identical chart was built before. `builder` names the chart
+    type and `params` holds every non-data argument that changes the output.
+    """
+    return get_figure_cache().get(builder, data, build, theme, params)
@@ -0,0 +1,124 @@
+# filter_engine.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from holdings_schema import holdings_version
+
+MAX_CACHED_ENGINES = 32
+
+_engines = OrderedDict()
+_lock = threading.Lock()
+
+
+class ColumnMeta:
+    """
+    Per-column filter metadata, built once per data version.
+
+    Numeric columns keep min/max and the row order that sorts the column,
+    so a range predicate is two searchsorted calls. Other columns keep the
+    sorted distinct values (as strings) and an integer code per row, so a
+    value-set predicate is one lookup-table gather.
+    """
+
+    def __init__(self, series):
+        self.numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+        if self.numeric:
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            self.order = np.argsort(values, kind='stable')
+            self.sorted_values = values[self.order]
+            finite = self.sorted_values[~np.isnan(self.sorted_values)]
+            self.min = float(finite[0]) if len(finite) else None
+            self.max = float(finite[-1]) if len(finite) else None
+            self.options = None
+        else:
+            # Stringify distinct values only; values sharing a label ("7" and 7) share a code
+            codes, uniques = pd.factorize(series)
+            labels = np.array([str(value) for value in uniques], dtype=object)
+            options, inverse = np.unique(labels, return_inverse=True)
+            self.codes = np.append(inverse, -1)[codes]
+            self.options = list(options)
+
+    def range_mask(self, low, high, size):
+        mask = np.zeros(size, dtype=bool)
+        start = np.searchsorted(self.sorted_values, low, side='left')
+        stop = np.searchsorted(self.sorted_values, high, side='right')
+        mask[self.order[start:stop]] = True
+        return mask
+
+    def values_mask(self, selected):
+        # One extra slot so missing values (code -1) always map to False
+        allowed = np.zeros(len(self.options) + 1, dtype=bool)
+        positions = np.searchsorted(self.options, [str(value) for value in selected])
+        for position, value in zip(positions, selected):
+            if position < len(self.options) and self.options[position] == str(value):
+                allowed[position] = True
+        return allowed[self.codes]
+
+
+class FilterEngine:
+    """
+    Filters one DataFrame by any number of column predicates with a single
+    boolean mask and a single materialization. Column metadata is built
+    lazily and kept for the life of the engine.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self._meta = {}
+        self._lock = threading.Lock()
+
+    def meta(self, column):
+        with self._lock:
+            meta = self._meta.get(column)
+        if meta is None:
+            meta = ColumnMeta(self.df[column])
+            with self._lock:
+                self._meta[column] = meta
+        return meta
+
+    def mask(self, predicates):
+        """
+        ANDs predicates into one mask. Each predicate is {column: (low, high)}
+        for numeric columns or {column: [values]} for the rest. Returns None
+        when there is nothing to filter.
+        """
+        mask = None
+        for column, predicate in predicates.items():
+            meta = self.meta(column)
+            if meta.numeric:
+                column_mask = meta.range_mask(predicate[0], predicate[1], len(self.df))
+            else:
+                column_mask = meta.values_mask(predicate)
+            mask = column_mask if mask is None else mask & column_mask
+        return mask
+
+    def apply(self, predicates):
+        mask = self.mask(predicates)
+        if mask is None:
+            return self.df.copy(deep=False)
+        return self.df[mask]
+
+
+def get_filter_engine(df):
+    """
+    Returns the cached engine for this data version, so Streamlit reruns
+    reuse the column metadata instead of rebuilding it.
+    """
+    key = (holdings_version(df), len(df), tuple(df.columns))
+    with _lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            _engines.move_to_end(key)
+            return engine
+        engine = FilterEngine(df)
+        _engines[key] = engine
+        while len(_engines) > MAX_CACHED_ENGINES:
+            _engines.popitem(last=False)
+        return engine
+
+
+def clear_cache():
+    with _lock:
+        _engines.clear()
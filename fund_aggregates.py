@@ -0,0 +1,95 @@
+# fund_aggregates.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from holdings_schema import holdings_version, rating_labels, rating_values
+
+# Candidate source columns for each rating bucket, in order of preference
+NFA_COLUMNS = ['nfa_star_rating', 'nfa']
+ESG_COLUMNS = ['esg', 'esg_country_star_rating']
+
+ESG_6_OR_MORE = 'ESG >= 6'
+ESG_BELOW_6 = 'ESG < 6 or Cash'
+
+MAX_CACHED_FUNDS = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _first_column(df, candidates):
+    return next((col for col in candidates if col in df.columns), None)
+
+
+def compute_fund_aggregates(fund_data):
+    """
+    Bucket weightings for the fund report pie charts.
+
+    Returns {"region", "nfa", "esg", "esg_6_or_more"} -> DataFrame with the
+    source column name and 'weighting' (one row per bucket); a key is
+    missing when the fund data has no such column. All buckets come from
+    one groupby over the holdings at the finest (region, NFA, ESG) grain;
+    the individual tables are re-sums of that small result.
+    """
+    fund_data = fund_data.dropna(subset=['weighting'])
+    nfa_column = _first_column(fund_data, NFA_COLUMNS)
+    esg_column = _first_column(fund_data, ESG_COLUMNS)
+
+    keys = {}
+    if 'region' in fund_data.columns:
+        keys['region'] = fund_data['region']
+    if nfa_column:
+        keys[nfa_column] = rating_labels(fund_data[nfa_column])
+    if esg_column:
+        keys[esg_column] = rating_labels(fund_data[esg_column])
+    if not keys:
+        return {}
+
+    grain = pd.DataFrame(keys, index=fund_data.index)
+    grain['weighting'] = fund_data['weighting'].astype(np.float64)
+    finest = grain.groupby(list(keys), observed=True, sort=False, dropna=False)['weighting'].sum().reset_index()
+
+    def bucket(column, labels=None):
+        labels = finest[column] if labels is None else labels
+        table = finest['weighting'].groupby(labels, observed=True, sort=False).sum()
+        return table.rename_axis(column).reset_index()
+
+    aggregates = {}
+    if 'region' in keys:
+        aggregates['region'] = bucket('region')
+    if nfa_column:
+        aggregates['nfa'] = bucket(nfa_column)
+    if esg_column:
+        aggregates['esg'] = bucket(esg_column)
+        esg_6 = pd.Series(
+            np.where(rating_values(finest[esg_column]) >= 6, ESG_6_OR_MORE, ESG_BELOW_6), index=finest.index
+        )
+        aggregates['esg_6_or_more'] = bucket('esg_6_or_more', esg_6)
+    return aggregates
+
+
+def get_fund_aggregates(fund_data, fund_name=None, time_selection=None):
+    """
+    compute_fund_aggregates cached per (fund, time_selection, data version),
+    so Streamlit reruns on unchanged data reuse the bucket tables. The
+    returned tables are shared and must not be mutated.
+    """
+    key = (fund_name, time_selection, holdings_version(fund_data))
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    aggregates = compute_fund_aggregates(fund_data)
+    with _lock:
+        _cache[key] = aggregates
+        while len(_cache) > MAX_CACHED_FUNDS:
+            _cache.popitem(last=False)
+    return aggregates
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,128 @@
+# holdings_delta.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from holdings_schema import holdings_version
+from portfolio_analytics import portfolio_weights
+
+ADDED = "Added"
+REMOVED = "Removed"
+RESIZED = "Resized"
+UNCHANGED = "Unchanged"
+CHANGE_TYPES = [ADDED, REMOVED, RESIZED, UNCHANGED]
+
+# Face amounts closer than this are treated as unchanged (rounding in the feeds)
+FACE_TOLERANCE = 0.5
+
+MAX_CACHED_DELTAS = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _positions(holdings):
+    """
+    One row per ISIN with its face amount, portfolio weight and weight x
+    duration / spread contributions. Lines sharing an ISIN (e.g. several
+    cash lines) are summed.
+    """
+    weight = portfolio_weights(holdings)
+    duration = holdings['duration'].to_numpy(dtype=np.float64, na_value=np.nan) \
+        if 'duration' in holdings.columns else np.full(len(holdings), np.nan)
+    spread = holdings['spread'].to_numpy(dtype=np.float64, na_value=np.nan) \
+        if 'spread' in holdings.columns else np.full(len(holdings), np.nan)
+
+    rows = pd.DataFrame({
+        "isin": holdings['isin'].astype(str).to_numpy(),
+        "name": holdings['name'].astype(str).to_numpy() if 'name' in holdings.columns else "",
+        "face_amount": holdings['face_amount'].to_numpy(dtype=np.float64, na_value=0.0)
+        if 'face_amount' in holdings.columns else 0.0,
+        "weight": weight,
+        "duration_contribution": weight * np.nan_to_num(duration),
+        "spread_contribution": weight * np.nan_to_num(spread),
+    })
+    return rows.groupby("isin", sort=False).agg({
+        "name": "first", "face_amount": "sum", "weight": "sum",
+        "duration_contribution": "sum", "spread_contribution": "sum",
+    })
+
+
+def compute_holdings_delta(before, after, face_tolerance=FACE_TOLERANCE):
+    """
+    Position changes between two holdings snapshots of one fund, e.g. Month
+    End (before) and Latest (after).
+
+    The snapshots are outer-joined on ISIN in one merge. ISINs only in
+    `after` are Added, only in `before` Removed, and in both with a
+    different face amount Resized. Weights are portfolio fractions, so the
+    contribution columns are each position's weight x duration (years) and
+    weight x spread (bp); their deltas sum to the change in the fund's
+    weighted duration and spread.
+
+    Returns {"changes": DataFrame (one row per ISIN, largest weight moves
+    first), "summary": dict of counts and total changes}.
+    """
+    merged = _positions(before).join(_positions(after), how="outer", lsuffix="_before", rsuffix="_after")
+    in_before = merged["name_before"].notna().to_numpy()
+    in_after = merged["name_after"].notna().to_numpy()
+
+    values = {}
+    for column in ["face_amount", "weight", "duration_contribution", "spread_contribution"]:
+        values[column] = (merged[f"{column}_before"].fillna(0.0).to_numpy(),
+                          merged[f"{column}_after"].fillna(0.0).to_numpy())
+
+    face_before, face_after = values["face_amount"]
+    resized = in_before & in_after & (np.abs(face_after - face_before) > face_tolerance)
+    change = np.select([~in_before, ~in_after, resized], [ADDED, REMOVED, RESIZED], default=UNCHANGED)
+
+    changes = pd.DataFrame({
+        "isin": merged.index,
+        "name": merged["name_after"].fillna(merged["name_before"]).to_numpy(),
+        "change": pd.Categorical(change, categories=CHANGE_TYPES),
+        "face_before": face_before,
+        "face_after": face_after,
+        "face_change": face_after - face_before,
+        "weight_before": values["weight"][0],
+        "weight_after": values["weight"][1],
+        "weight_change": values["weight"][1] - values["weight"][0],
+        "duration_contribution_change": values["duration_contribution"][1] - values["duration_contribution"][0],
+        "spread_contribution_change": values["spread_contribution"][1] - values["spread_contribution"][0],
+    })
+    changes = changes.iloc[np.argsort(-np.abs(changes["weight_change"].to_numpy()), kind='stable')] \
+        .reset_index(drop=True)
+
+    counts = changes["change"].value_counts()
+    summary = {
+        **{change_type.lower(): int(counts.get(change_type, 0)) for change_type in CHANGE_TYPES},
+        "duration_change": float(changes["duration_contribution_change"].sum()),
+        "spread_change": float(changes["spread_contribution_change"].sum()),
+        "turnover": float(np.abs(changes["weight_change"]).sum() / 2),
+    }
+    return {"changes": changes, "summary": summary}
+
+
+def get_holdings_delta(before, after):
+    """
+    compute_holdings_delta cached per snapshot pair (the data versions of
+    both frames), so the diff view is a lookup on reruns. The result is
+    shared and must not be mutated.
+    """
+    key = (holdings_version(before), len(before), holdings_version(after), len(after))
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    result = compute_holdings_delta(before, after)
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > MAX_CACHED_DELTAS:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
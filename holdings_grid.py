@@ -0,0 +1,136 @@
+# holdings_grid.py
+
+import math
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_PAGE_SIZE = 50
+PAGE_SIZES = [25, 50, 100, 200]
+
+# Dark theme used by the fund report tables
+HOLDINGS_TABLE_STYLES = [
+    {'selector': 'th', 'props': [
+        ('background-color', '#2f2f2f'),  # Header color
+        ('color', 'white'),
+        ('font-weight', 'bold'),
+        ('padding', '10px'),
+        ('text-align', 'left')
+    ]},
+    {'selector': 'td', 'props': [
+        ('padding', '10px'),
+        ('color', 'white'),
+        ('white-space', 'nowrap'),  # Ensure text doesn't wrap
+        ('overflow', 'hidden'),
+        ('text-overflow', 'ellipsis'),  # Handle overflow with ellipsis if needed
+        ('text-align', 'left'),
+        ('background-color', '#1e1e1e'),
+        ('max-width', '300px')
+    ]},
+    {'selector': '.row_heading, .col_heading', 'props': [
+        ('background-color', '#1e1e1e'),  # Row header color
+        ('color', 'white')
+    ]},
+    {'selector': 'tbody tr:nth-child(even)', 'props': [
+        ('background-color', '#252525')  # Even row background color
+    ]}
+]
+
+# Display formats by column; anything else is shown as is
+COLUMN_FORMATS = {
+    'face_amount': '{:,.0f}',
+    'market_value': '{:,.0f}',
+    'total_cost': '{:,.0f}',
+    'weighting': '{:.2f}',
+    'yield': '{:.2f}',
+    'duration': '{:.2f}',
+    'spread': '{:.1f}',
+    'closing_price': '{:.3f}',
+    'price': '{:.3f}',
+    'accrued_interest': '{:.3f}',
+    'bpdate': '{:%Y-%m-%d}',
+    'trade_date': '{:%Y-%m-%d}',
+}
+
+
+def sort_order(series, ascending=True):
+    """
+    Row positions that sort `series`, missing values last. Categorical and
+    text columns sort by their labels via integer codes, so no per-row
+    Python comparison is needed.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        rank = np.argsort(np.argsort(series.cat.categories.astype(str)))
+        keys = np.where(series.cat.codes >= 0, rank[series.cat.codes], -1).astype(np.float64)
+        keys[keys < 0] = np.nan
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        keys = series.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+        keys[series.isna().to_numpy()] = np.nan
+    elif pd.api.types.is_numeric_dtype(series):
+        keys = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        codes, _ = pd.factorize(series, sort=True)
+        keys = np.where(codes >= 0, codes, np.nan).astype(np.float64)
+
+    if not ascending:
+        keys = -keys
+    # argsort puts NaN last in either direction
+    return np.argsort(keys, kind='stable')
+
+
+def page_slice(df, page, page_size, sort_by=None, ascending=True):
+    """Returns the rows of one page, sorted server-side; only those rows are materialized."""
+    if sort_by is not None and sort_by in df.columns:
+        positions = sort_order(df[sort_by], ascending)[(page - 1) * page_size: page * page_size]
+        return df.iloc[positions]
+    return df.iloc[(page - 1) * page_size: page * page_size]
+
+
+def format_page(page_df):
+    """Styles one page: number/date formats and the dark table theme."""
+    formats = {col: fmt for col, fmt in COLUMN_FORMATS.items() if col in page_df.columns}
+    return page_df.style.format(formats, na_rep='') \
+        .hide(axis='index') \
+        .set_table_styles(HOLDINGS_TABLE_STYLES)
+
+
+def render_holdings_grid(df, key, columns=None, default_sort='weighting', page_size=DEFAULT_PAGE_SIZE):
+    """
+    Paged, sortable holdings table. Sorting and paging run over the typed
+    frame on the server and only the visible page is formatted and sent to
+    the browser, so render time and payload do not grow with fund size.
+    """
+    if columns is not None:
+        df = df[[col for col in columns if col in df.columns]]
+    if df.empty:
+        st.info("No holdings match the current filters.")
+        return
+
+    sort_columns = list(df.columns)
+    col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+    with col1:
+        sort_by = st.selectbox(
+            "Sort by", sort_columns,
+            index=sort_columns.index(default_sort) if default_sort in sort_columns else 0,
+            key=f"{key}_sort_by"
+        )
+    with col2:
+        descending = st.toggle("Descending", value=True, key=f"{key}_descending")
+    with col3:
+        page_size = st.selectbox(
+            "Rows per page", PAGE_SIZES,
+            index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1,
+            key=f"{key}_page_size"
+        )
+    page_count = max(1, math.ceil(len(df) / page_size))
+    # A filter may have shrunk the table below the page the user was on
+    if st.session_state.get(f"{key}_page", 1) > page_count:
+        st.session_state[f"{key}_page"] = page_count
+    with col4:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key=f"{key}_page")
+    page = min(int(page), page_count)
+
+    page_df = page_slice(df, page, page_size, sort_by, ascending=not descending)
+    first_row = (page - 1) * page_size + 1
+    st.caption(f"Rows {first_row:,}–{first_row + len(page_df) - 1:,} of {len(df):,}")
+    st.table(format_page(page_df))
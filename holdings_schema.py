@@ -0,0 +1,153 @@
+# holdings_schema.py
+
+import numpy as np
+import pandas as pd
+
+HOLDINGS_CSV = 'data.csv'
+
+NUMERIC_COLUMNS = {
+    "face_amount", "closing_price", "total_cost", "weighting", "market_value", "withdividendp",
+    "spread", "yield", "duration", "accrued_interest", "price", "weightings",
+}
+# MSCI ratings are letter grades ("AA", "BBB"); missing stays missing rather than "Cash"
+CATEGORY_COLUMNS = {"country", "region", "currency", "fund_name", "emdm", "msci_esg_rating", "msci"}
+DATETIME_COLUMNS = {"bpdate", "trade_date"}
+STRING_COLUMNS = {"isin", "name", "error"}
+INTEGER_COLUMNS = {"record_number"}
+# Rating columns arrive as a mix of numbers and "Cash"; they are kept as labels
+RATING_COLUMNS = {"nfa", "nfa_star_rating", "esg", "esg_country_star_rating"}
+
+COLUMN_KINDS = (
+    ("float32", NUMERIC_COLUMNS),
+    ("category", CATEGORY_COLUMNS),
+    ("datetime", DATETIME_COLUMNS),
+    ("string", STRING_COLUMNS),
+    ("integer", INTEGER_COLUMNS),
+    ("rating", RATING_COLUMNS),
+)
+
+CASH_LABEL = "Cash"
+
+
+def _column_kind(column):
+    """The declared kind of a column, or None for columns the schema does not know."""
+    for kind, columns in COLUMN_KINDS:
+        if column in columns:
+            return kind
+    return None
+
+
+def load_holdings_schema(csv_path=HOLDINGS_CSV):
+    """
+    Returns {column: kind} for the declared columns in the data.csv header.
+    Columns not declared above are left out, so normalize_holdings passes
+    them through untouched instead of guessing a type.
+    """
+    columns = pd.read_csv(csv_path, nrows=0).columns
+    return {column: _column_kind(column) for column in columns if _column_kind(column) is not None}
+
+
+try:
+    HOLDINGS_SCHEMA = load_holdings_schema()
+except FileNotFoundError:
+    HOLDINGS_SCHEMA = {column: kind for kind, columns in COLUMN_KINDS for column in columns}
+
+
+def rating_labels(series):
+    """
+    Turns a rating column into categorical labels: numbers become "7" rather
+    than "7.0" and missing ratings become "Cash".
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype) and not series.isna().any():
+        return series
+    # Label each distinct value once, then broadcast through the factorized codes
+    codes, uniques = pd.factorize(series.astype(object).where(series.notna(), CASH_LABEL))
+    labels = np.array([_rating_label(value) for value in uniques], dtype=object)
+    return pd.Series(pd.Categorical(labels[codes]), index=series.index, name=series.name)
+
+
+def _rating_label(value):
+    text = str(value).strip()
+    if text in ("", "nan", "None"):
+        return CASH_LABEL
+    try:
+        return f"{float(text):g}"
+    except ValueError:
+        return text
+
+
+def rating_values(series):
+    """Numeric value of each rating label (NaN for "Cash"), computed once per category."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        numeric_categories = pd.to_numeric(pd.Series(series.cat.categories.astype(str)), errors='coerce')
+        values = numeric_categories.to_numpy(dtype=np.float32)
+        return pd.Series(
+            np.where(series.cat.codes >= 0, values[series.cat.codes], np.nan).astype(np.float32),
+            index=series.index, name=series.name
+        )
+    return pd.to_numeric(series, errors='coerce').astype(np.float32)
+
+
+def normalize_holdings(df, schema=None):
+    """
+    Converts a holdings DataFrame to the declared schema in place of the
+    object dtypes JSON parsing produces: float32 numerics, categoricals,
+    datetime64 dates, nullable integer record numbers and rating labels.
+    Columns outside the schema are left alone. Returns a new DataFrame.
+    """
+    if df is None or df.empty:
+        return df
+    schema = schema or HOLDINGS_SCHEMA
+
+    converted = {}
+    for column in df.columns:
+        kind = schema.get(column)
+        if kind is None:
+            continue
+        series = df[column]
+        if kind == "float32":
+            converted[column] = pd.to_numeric(series, errors='coerce').astype(np.float32)
+        elif kind == "integer":
+            converted[column] = pd.to_numeric(series, errors='coerce').astype("Int64")
+        elif kind == "category":
+            converted[column] = series.astype("category")
+        elif kind == "datetime":
+            converted[column] = pd.to_datetime(series, errors='coerce')
+        elif kind == "string":
+            converted[column] = series.astype("string")
+        elif kind == "rating":
+            converted[column] = rating_labels(series)
+
+    typed = df.assign(**converted)
+    typed.attrs.pop("data_version", None)
+    typed.attrs["data_version"] = holdings_version(typed)
+    return typed
+
+
+def holdings_version(df):
+    """
+    Content fingerprint of a holdings frame, used to key derived caches.
+    normalize_holdings stores it in df.attrs so it is computed once per
+    fetch. pandas carries attrs over to copies and row subsets too, so only
+    key caches on frames that are a deterministic function of the fetch.
+    """
+    version = df.attrs.get("data_version")
+    if version is None:
+        version = f"{len(df)}:{int(pd.util.hash_pandas_object(df, index=False).sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+    return version
+
+
+# Bond names end in "<coupon> <dd/mm/yyyy>", e.g. "QNB FINANCE LTD 1.625 22/09/2025"
+COUPON_MATURITY_SUFFIX = r'\s+[\d.]+\s+\d{2}/\d{2}/\d{4}\s*$'
+
+
+def issuer_names(names):
+    """Issuer per holding: the bond name without its coupon and maturity, as a categorical."""
+    names = names.astype("category") if not isinstance(names.dtype, pd.CategoricalDtype) else names
+    issuers = pd.Series(names.cat.categories.astype(str), dtype=object).str.replace(
+        COUPON_MATURITY_SUFFIX, '', regex=True
+    ).str.strip()
+    return pd.Series(
+        pd.Categorical(np.where(names.cat.codes >= 0, issuers.to_numpy()[names.cat.codes], None)),
+        index=names.index, name="issuer"
+    )
@@ -0,0 +1,108 @@
+# index_registry.py
+
+import os
+import json
+import threading
+from embedding_store import open_embeddings
+
+# Native output size and on-disk prefix of each supported embedding model
+EMBEDDING_MODELS = {
+    "text-embedding-3-large": {"dimensions": 3072, "prefix": "openai_large"},
+    "text-embedding-3-small": {"dimensions": 1536, "prefix": "openai_small"},
+    "text-embedding-ada-002": {"dimensions": 1536, "prefix": "openai_ada"},
+}
+
+INDEX_ROOT = '.'
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+class IndexMismatchError(ValueError):
+    """Raised when an index on disk does not match the requested model/dimensions."""
+
+
+def native_dimensions(model):
+    if model not in EMBEDDING_MODELS:
+        raise KeyError(f"Unknown embedding model: {model}")
+    return EMBEDDING_MODELS[model]["dimensions"]
+
+
+def index_paths(model, dimensions=None):
+    """
+    Returns (embeddings_path, sentences_path, metadata_path) for a model.
+    Shortened v3 embeddings (dimensions below the native size) live next to
+    the full ones with a _<dimensions> suffix.
+    """
+    prefix = EMBEDDING_MODELS[model]["prefix"]
+    directory = os.path.join(INDEX_ROOT, f"{prefix}_embeddings")
+    suffix = "" if dimensions in (None, native_dimensions(model)) else f"_{dimensions}"
+    return (
+        os.path.join(directory, f"{prefix}_combined_embeddings{suffix}.npy"),
+        os.path.join(directory, f"{prefix}_combined_sentences.txt"),
+        os.path.join(directory, "embedding_metadata.json"),
+    )
+
+
+class EmbeddingIndex:
+    """A validated (model, dimensions) embedding matrix with its sentences."""
+
+    def __init__(self, model, dimensions=None):
+        self.model = model
+        self.dimensions = dimensions or native_dimensions(model)
+        self.embeddings_path, self.sentences_path, self.metadata_path = index_paths(model, self.dimensions)
+
+        if not os.path.exists(self.embeddings_path):
+            raise FileNotFoundError(f"No index for {model} ({self.dimensions}d) at {self.embeddings_path}")
+
+        self.embeddings = open_embeddings(self.embeddings_path)
+        with open(self.sentences_path, 'r', encoding='utf-8') as f:
+            self.sentences = [line.strip() for line in f]
+        self.validate()
+
+    def validate(self):
+        if self.embeddings.ndim != 2 or self.embeddings.shape[1] != self.dimensions:
+            raise IndexMismatchError(
+                f"{self.embeddings_path} has shape {self.embeddings.shape}, "
+                f"expected {self.dimensions} dimensions for {self.model}"
+            )
+        if len(self.embeddings) != len(self.sentences):
+            raise IndexMismatchError("Number of embeddings and sentences do not match.")
+
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            if metadata.get("model", self.model) != self.model:
+                raise IndexMismatchError(
+                    f"{self.metadata_path} was built with {metadata['model']}, not {self.model}"
+                )
+
+    def validate_query(self, query_embedding):
+        if len(query_embedding) != self.dimensions:
+            raise IndexMismatchError(
+                f"Query embedding has {len(query_embedding)} dimensions, "
+                f"index {self.model} expects {self.dimensions}"
+            )
+
+
+def get_index(model, dimensions=None):
+    """Lazily loads and caches the index for (model, dimensions)."""
+    key = (model, dimensions or native_dimensions(model))
+    with _lock:
+        if key not in _indexes:
+            _indexes[key] = EmbeddingIndex(*key)
+        return _indexes[key]
+
+
+def available_indexes():
+    """Lists the (model, dimensions) pairs that have an index on disk."""
+    return [
+        (model, info["dimensions"])
+        for model, info in EMBEDDING_MODELS.items()
+        if os.path.exists(index_paths(model)[0])
+    ]
+
+
+def clear_cache():
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,399 @@
+# local_backend.py
+
+import io
+import os
+import json
+import time
+import random
+import sqlite3
+import argparse
+import threading
+from contextlib import closing
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+import pandas as pd
+from backend_client import pa, ARROW_STREAM_TYPE, PARQUET_TYPE, JSON_TYPE
+
+HOLDINGS_CSV = 'data.csv'
+DEFAULT_DATA_DIR = './.local_backend'
+
+HOLDINGS_TABLES = ["fund_holdings_latest", "fund_holdings_me"]
+RVM_RATINGS = ['Aaa', 'Aa1', 'Aa2', 'Aa3', 'A1', 'A2', 'A3', 'Baa1', 'Baa2', 'Baa3',
+               'Ba1', 'Ba2', 'Ba3', 'B1', 'B2', 'B3', 'Caa1']
+RVM_TENORS = ['1Y', '2Y', '3Y', '5Y', '7Y', '10Y', '15Y', '20Y', '30Y']
+REPORT_TEXT_FIELDS = ["Ownership", "Overview", "PoliticalNews", "Strengths", "Weaknesses", "Opportunities",
+                      "Threats", "RecentNews", "MoodysRating", "SPGlobalRating", "FitchRating", "Conclusion"]
+REPORT_SERIES_FIELDS = ["GDPGrowthRate", "Inflation", "UnemploymentRate", "Population",
+                        "GovernmentFinances", "CurrentAccountBalance"]
+
+
+def synthetic_holdings(rows=None, csv_path=HOLDINGS_CSV, funds=None, seed=0):
+    """
+    Holdings shaped like data.csv. With `rows`, the sample is tiled up to
+    that many rows: every copy gets its own ISINs, jittered numeric columns
+    and unique record numbers. With `funds`, copies are spread over that
+    many funds (the real ones plus "Synthetic Bond Fund N").
+    """
+    sample = pd.read_csv(csv_path)
+    if rows is None or rows <= len(sample):
+        return sample if rows is None else sample.head(rows).copy()
+
+    rng = np.random.default_rng(seed)
+    copy = np.arange(rows) // len(sample)
+    df = sample.iloc[np.arange(rows) % len(sample)].reset_index(drop=True)
+    for col in ["face_amount", "market_value", "weighting", "spread", "yield", "duration", "price"]:
+        df[col] = df[col] * rng.uniform(0.9, 1.1, rows)
+    df["record_number"] = np.arange(1, rows + 1, dtype=np.int64)
+
+    is_copy = copy > 0
+    df.loc[is_copy, "isin"] = (
+        df.loc[is_copy, "isin"].str[:2] + pd.Series(copy[is_copy], index=df.index[is_copy]).astype(str).str.zfill(4)
+        + df.loc[is_copy, "isin"].str[6:]
+    )
+
+    real_funds = sample["fund_name"].nunique()
+    if funds is not None and funds > real_funds:
+        synthetic = copy % (funds - real_funds + 1)
+        df.loc[synthetic > 0, "fund_name"] = [f"Synthetic Bond Fund {i}" for i in synthetic[synthetic > 0]]
+    return df
+
+
+def synthetic_rvm_grid(seed=0):
+    """Spread grid (bp) by rating and tenor, widening down the ratings and out the curve."""
+    rng = np.random.default_rng(seed)
+    base = np.geomspace(30, 950, len(RVM_RATINGS))[:, None]
+    curve = np.linspace(0.9, 1.15, len(RVM_TENORS))[None, :]
+    grid = np.rint(base * curve * rng.uniform(0.95, 1.05, (len(RVM_RATINGS), len(RVM_TENORS))))
+    df = pd.DataFrame(grid.astype(int), columns=RVM_TENORS)
+    df.insert(0, "Rating", RVM_RATINGS)
+    return df
+
+
+def synthetic_country_reports(countries, seed=0):
+    """One FullReport row per country with placeholder text and six years of economic series."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for country in countries:
+        row = {
+            "Country": country,
+            "Title": f"{country} Sovereign Credit Research Report",
+            "NFARating": int(rng.integers(1, 8)),
+            "ESGRating": int(rng.integers(1, 11)),
+        }
+        row.update({field: f"{field} for {country} (local stand-in data)." for field in REPORT_TEXT_FIELDS})
+        for field in REPORT_SERIES_FIELDS:
+            for year in range(1, 7):
+                row[f"{field}Year{year}"] = round(float(rng.normal(3, 2)), 2)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+class FaultInjector:
+    """
+    Adds latency and random failures to requests. failure_status 0 drops
+    the connection without a response instead of returning an error code.
+    `paths` limits injection to those endpoint paths (all when None).
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, failure_rate=0.0, failure_status=503, paths=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self.paths = set(paths) if paths else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def update(self, **settings):
+        with self._lock:
+            for name in ("latency", "jitter", "failure_rate", "failure_status"):
+                if name in settings:
+                    setattr(self, name, type(getattr(self, name))(settings[name]))
+            if "paths" in settings:
+                self.paths = set(settings["paths"]) if settings["paths"] else None
+
+    def settings(self):
+        return {
+            "latency": self.latency, "jitter": self.jitter, "failure_rate": self.failure_rate,
+            "failure_status": self.failure_status, "paths": sorted(self.paths) if self.paths else None,
+        }
+
+    def draw(self, path):
+        """Returns (delay_seconds, fail) for one request."""
+        if self.paths is not None and path not in self.paths:
+            return 0.0, False
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            fail = self._random.random() < self.failure_rate
+        return delay, fail
+
+
+class LocalBackend:
+    """
+    Local stand-in for the my-combined-app (/process_json) and
+    json-receiver-gcs (/health, /gcs_databases, /find_table, /tables,
+    /query) APIs, backed by the SQLite files in data_dir.
+    """
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR):
+        self.data_dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+
+    def _db_file(self, db_path):
+        name = os.path.basename(db_path or "")
+        if not name.endswith(".db"):
+            raise KeyError(f"Unknown database {db_path}")
+        return os.path.join(self.data_dir, name)
+
+    def _connect(self, db_path):
+        path = self._db_file(db_path)
+        if not os.path.exists(path):
+            raise KeyError(f"Unknown database {db_path}")
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+
+    def add_table(self, db_path, table, df):
+        with closing(sqlite3.connect(self._db_file(db_path))) as conn:
+            df.to_sql(table, conn, if_exists="replace", index=False)
+
+    def seed(self, rows=None, funds=None, csv_path=HOLDINGS_CSV):
+        """Writes holdings, country reports and an RVM grid derived from data.csv."""
+        holdings = synthetic_holdings(rows, csv_path, funds)
+        for table in HOLDINGS_TABLES:
+            self.add_table("consolidated.db", table, holdings)
+        self.add_table("credit_research.db", "FullReport",
+                       synthetic_country_reports(sorted(holdings["country"].dropna().unique())))
+        self.add_table("rvm_data.db", "rvm_grid_wide", synthetic_rvm_grid())
+        return len(holdings)
+
+    def databases(self):
+        return sorted(name for name in os.listdir(self.data_dir) if name.endswith(".db"))
+
+    def tables(self, db_path):
+        with closing(self._connect(db_path)) as conn:
+            return [name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+
+    def columns(self, conn, table):
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+        if not columns:
+            raise KeyError(f"Unknown table {table}")
+        return columns
+
+    def select(self, db_path, table, filters=None, fields="*", limit=None, offset=0):
+        with closing(self._connect(db_path)) as conn:
+            columns = self.columns(conn, table)
+            selected = columns if fields in (None, "", "*") else [col.strip() for col in fields.split(",")]
+            missing = [col for col in selected + list(filters or {}) if col not in columns]
+            if missing:
+                raise KeyError(f"Unknown columns: {', '.join(missing)}")
+
+            quoted = ", ".join(f'"{col}"' for col in selected)
+            sql = f'SELECT {quoted} FROM "{table}"'
+            params = []
+            if filters:
+                sql += " WHERE " + " AND ".join(f'"{col}" = ?' for col in filters)
+                params = list(filters.values())
+            if limit is not None:
+                sql += " LIMIT ? OFFSET ?"
+                params += [int(limit), int(offset)]
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def find_table(self, table):
+        return [db for db in self.databases() if table in self.tables(db)]
+
+    def process_json(self, query):
+        page = int(query.get("page", 1))
+        page_size = int(query.get("page_size", 100))
+        return self.select(
+            query.get("db_path"), query.get("table"), query.get("filters"), query.get("fields", "*"),
+            limit=page_size, offset=(page - 1) * page_size
+        )
+
+
+def negotiate(accept):
+    """Picks the response format from an Accept header, honouring q-values."""
+    offers = []
+    for part in (accept or JSON_TYPE).split(","):
+        media_type, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            q = float(params.strip()[2:])
+        offers.append((q, media_type.strip()))
+    for _, media_type in sorted(offers, reverse=True):
+        if pa is not None and media_type in (ARROW_STREAM_TYPE, PARQUET_TYPE):
+            return media_type
+        if media_type in (JSON_TYPE, "*/*"):
+            return JSON_TYPE
+    return JSON_TYPE
+
+
+def encode_frame(df, media_type):
+    if media_type == ARROW_STREAM_TYPE:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if media_type == PARQUET_TYPE:
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, index=False)
+        return buffer.getvalue()
+    return df.to_json(orient="records").encode("utf-8")
+
+
+def make_handler(backend, faults=None):
+    faults = faults or FaultInjector()
+
+    class LocalBackendHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def send_body(self, status, body, content_type=JSON_TYPE):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, status, data):
+            self.send_body(status, json.dumps(data, default=str).encode("utf-8"))
+
+        def read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"{}")
+
+        def inject_faults(self, path):
+            """Applies latency and failure injection; returns True when the request was failed."""
+            delay, fail = faults.draw(path)
+            if delay:
+                time.sleep(delay)
+            if not fail:
+                return False
+            if faults.failure_status:
+                self.send_json(faults.failure_status, {"error": "Injected failure"})
+            else:
+                self.close_connection = True
+                self.connection.shutdown(2)
+            return True
+
+        def dispatch(self, method):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == "/_faults":
+                if method == "POST":
+                    faults.update(**self.read_json())
+                return self.send_json(200, faults.settings())
+
+            route = ROUTES.get((method, url.path))
+            if route is None:
+                return self.send_json(404, {"error": f"Unknown endpoint {method} {url.path}"})
+            body = self.read_json() if method == "POST" else {}
+            if self.inject_faults(url.path):
+                return
+            try:
+                route(self, params, body)
+            except KeyError as e:
+                self.send_json(404, {"error": str(e).strip("'\"")})
+            except (ValueError, TypeError, sqlite3.Error) as e:
+                self.send_json(400, {"error": str(e)})
+
+        def do_GET(self):
+            self.dispatch("GET")
+
+        def do_POST(self):
+            self.dispatch("POST")
+
+        def log_message(self, format, *args):
+            pass
+
+    def health(handler, params, body):
+        handler.send_json(200, {
+            "status": "healthy",
+            "environment": "local",
+            "gcs_integration_active": False,
+            "databases": backend.databases(),
+        })
+
+    def gcs_databases(handler, params, body):
+        handler.send_json(200, {"databases": [
+            {"name": name, "db_path": name, "size_bytes": os.path.getsize(os.path.join(backend.data_dir, name))}
+            for name in backend.databases()
+        ]})
+
+    def find_table(handler, params, body):
+        table = params.get("table", "")
+        db_paths = backend.find_table(table)
+        if not db_paths:
+            raise KeyError(f"Table {table} not found")
+        handler.send_json(200, {"table": table, "db_path": db_paths[0], "all_db_paths": db_paths})
+
+    def tables(handler, params, body):
+        db_path = params.get("db_path", "")
+        handler.send_json(200, {"db_path": db_path, "tables": backend.tables(db_path)})
+
+    def query(handler, params, body):
+        columns = body.get("columns")
+        df = backend.select(
+            body.get("db_path"), body.get("table"), body.get("filters"),
+            ",".join(columns) if columns else "*", limit=body.get("limit", 100), offset=body.get("offset", 0)
+        )
+        handler.send_json(200, {"results": df.to_dict(orient="records"), "count": len(df)})
+
+    def process_json(handler, params, body):
+        df = backend.process_json(json.loads(body["sample_key"]))
+        media_type = negotiate(handler.headers.get("Accept"))
+        handler.send_body(200, encode_frame(df, media_type), media_type)
+
+    ROUTES = {
+        ("GET", "/health"): health,
+        ("GET", "/gcs_databases"): gcs_databases,
+        ("GET", "/find_table"): find_table,
+        ("GET", "/tables"): tables,
+        ("POST", "/query"): query,
+        ("POST", "/process_json"): process_json,
+    }
+
+    return LocalBackendHandler
+
+
+def serve_in_thread(backend, host="127.0.0.1", port=0, faults=None):
+    """Starts the stand-in server on a daemon thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(backend, faults))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the my-combined-app and json-receiver-gcs backends.",
+        epilog="Point the app at it with PROCESS_JSON_URL=http://127.0.0.1:8080/process_json; "
+               "RVM discovery already probes http://localhost:8080."
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of SQLite files to serve")
+    parser.add_argument("--rows", type=int, default=None, help="Scale holdings up to this many rows")
+    parser.add_argument("--funds", type=int, default=None, help="Spread scaled holdings over this many funds")
+    parser.add_argument("--no-seed", action="store_true", help="Serve data-dir as is instead of regenerating it")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--failure-status", type=int, default=503, help="Status for failed requests; 0 drops the connection")
+    parser.add_argument("--fault-path", action="append", help="Only inject faults on this path (repeatable)")
+    args = parser.parse_args()
+
+    backend = LocalBackend(args.data_dir)
+    if not args.no_seed:
+        rows = backend.seed(args.rows, args.funds)
+        print(f"Seeded {rows} holdings rows into {args.data_dir}")
+    faults = FaultInjector(args.latency, args.jitter, args.failure_rate, args.failure_status, args.fault_path)
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(backend, faults))
+    print(f"Serving {', '.join(backend.databases())} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+# local_replica.py
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import pandas as pd
+import requests
+import backend_client
+from backend_client import pa
+
+DEFAULT_REPLICA_PATH = './.replica/replica.db'
+
+# Backend tables change at most daily; revalidate a replicated query after this many seconds
+DEFAULT_MAX_AGE = 6 * 3600
+
+# Columns fetched to fingerprint a whole query result without pulling every column
+FINGERPRINT_FIELDS = "bpdate,record_number"
+# Two narrow columns per row, so the fingerprint scan asks for much larger pages. A server
+# that caps page_size makes the scan look short; that only costs a full pull, never a stale copy
+FINGERPRINT_PAGE_SIZE = 20 * backend_client.PAGE_SIZE
+
+
+def query_key(db_path, table, filters=None, fields="*"):
+    """Stable identifier for a replicated query."""
+    return json.dumps({"db_path": db_path, "table": table, "filters": filters or {}, "fields": fields}, sort_keys=True)
+
+
+def encode_pages(frame, page_rows=backend_client.PAGE_SIZE):
+    """
+    A query result as Arrow IPC streams of page_rows rows each, the replica's
+    storage format. The frame is converted once and sliced without copying.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for the local replica; install it from requirements.txt")
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # JSON pages can mix types within a column; keep those columns as strings
+        mixed = {col: "string" for col in frame.columns if frame[col].dtype == object}
+        table = pa.Table.from_pandas(frame.astype(mixed), preserve_index=False)
+    bodies = []
+    for start in range(0, table.num_rows, page_rows):
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table.slice(start, page_rows))
+        bodies.append(sink.getvalue().to_pybytes())
+    return bodies
+
+
+def decode_pages(bodies):
+    """Stored pages as one typed DataFrame."""
+    tables = [pa.ipc.open_stream(pa.py_buffer(body)).read_all() for body in bodies]
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables).to_pandas(split_blocks=True, self_destruct=True)
+
+
+def frame_fingerprint(frame):
+    """(latest bpdate, highest record_number, row count) of a whole result."""
+    max_bpdate = None
+    if 'bpdate' in frame.columns:
+        bpdates = frame['bpdate'].dropna()
+        bpdates = bpdates[bpdates.astype(str) != ""]
+        max_bpdate = str(bpdates.max()) if len(bpdates) else None
+    max_record_number = None
+    if 'record_number' in frame.columns:
+        record_numbers = pd.to_numeric(frame['record_number'], errors='coerce').dropna()
+        max_record_number = int(record_numbers.max()) if len(record_numbers) else None
+    return max_bpdate, max_record_number, len(frame)
+
+
+class LocalReplica:
+    """
+    Read-through SQLite replica of backend query results.
+
+    Each (db_path, table, filters, fields) query is populated from the
+    backend on first use and then served from local disk. Results are
+    fetched as columnar (Arrow IPC/Parquet) pages where the backend offers
+    them and stored as one Arrow IPC blob per page, so get() returns typed
+    frames without any row JSON on the way. Once an entry is older than
+    max_age it is revalidated against the backend. The whole result is
+    fingerprinted by its row count, latest bpdate and highest
+    record_number, read with a bpdate/record_number-only query. Only when
+    that differs from the stored fingerprint is the full result pulled;
+    pages whose content is unchanged are not rewritten. Tables without
+    those columns are pulled in full and compared by content hash. If the
+    backend is slow or down, the last replicated result is served.
+    """
+
+    def __init__(self, path=DEFAULT_REPLICA_PATH, max_age=DEFAULT_MAX_AGE, url=None):
+        self.path = path
+        self.max_age = max_age
+        self.url = url or backend_client.PROCESS_JSON_URL
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS replica_pages (
+                    query_key TEXT NOT NULL,
+                    page INTEGER NOT NULL,
+                    page_hash TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    PRIMARY KEY (query_key, page)
+                );
+                CREATE TABLE IF NOT EXISTS replica_sync (
+                    query_key TEXT PRIMARY KEY,
+                    refreshed_at REAL NOT NULL,
+                    content_hash TEXT,
+                    max_bpdate TEXT,
+                    max_record_number INTEGER,
+                    row_count INTEGER
+                );
+            """)
+            tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(replica_sync)")]
+            if "first_page_hash" in columns:
+                conn.execute("ALTER TABLE replica_sync RENAME COLUMN first_page_hash TO content_hash")
+            if "first_page_hash" in columns or "replica_rows" in tables:
+                # Replicas written as row JSON: refetch everything once in the columnar format
+                conn.execute("DROP TABLE IF EXISTS replica_rows")
+                conn.execute("DELETE FROM replica_sync")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _fetch(self, db_path, table, filters, fields, page_size=backend_client.PAGE_SIZE):
+        """A whole query result as one DataFrame, fetched as columnar pages."""
+        pages = dict(backend_client.iter_process_json_pages(
+            db_path, table, filters, fields, page_size=page_size, url=self.url, as_frames=True
+        ))
+        if not pages:
+            return pd.DataFrame()
+        return pd.concat([pages[page] for page in sorted(pages)], ignore_index=True)
+
+    def _remote_fingerprint(self, db_path, table, filters):
+        return frame_fingerprint(self._fetch(db_path, table, filters, FINGERPRINT_FIELDS, FINGERPRINT_PAGE_SIZE))
+
+    def _sync_state(self, key):
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT refreshed_at, content_hash, max_bpdate, max_record_number, row_count "
+                "FROM replica_sync WHERE query_key = ?",
+                (key,)
+            ).fetchone()
+
+    def _read(self, key):
+        with self._connect() as conn:
+            bodies = conn.execute(
+                "SELECT body FROM replica_pages WHERE query_key = ? ORDER BY page", (key,)
+            ).fetchall()
+        return decode_pages([body for (body,) in bodies])
+
+    def _write(self, key, frame, bodies, content_hash):
+        max_bpdate, max_record_number, row_count = frame_fingerprint(frame)
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO replica_pages (query_key, page, page_hash, body) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (query_key, page) DO UPDATE SET page_hash = excluded.page_hash, body = excluded.body "
+                "WHERE page_hash != excluded.page_hash",
+                [(key, page, hashlib.sha256(body).hexdigest(), body) for page, body in enumerate(bodies, 1)]
+            )
+            conn.execute("DELETE FROM replica_pages WHERE query_key = ? AND page > ?", (key, len(bodies)))
+            conn.execute(
+                "INSERT OR REPLACE INTO replica_sync VALUES (?, ?, ?, ?, ?, ?)",
+                (key, time.time(), content_hash, max_bpdate, max_record_number, row_count)
+            )
+
+    def _touch(self, key):
+        with self._lock, self._connect() as conn:
+            conn.execute("UPDATE replica_sync SET refreshed_at = ? WHERE query_key = ?", (time.time(), key))
+
+    def refresh(self, db_path, table, filters=None, fields="*", force=False):
+        """
+        Brings one query up to date with the backend. Returns True when new
+        rows were written, False when the stored copy was already current.
+        """
+        key = query_key(db_path, table, filters, fields)
+        state = self._sync_state(key)
+
+        # Keyed tables: compare the whole-result fingerprint before pulling every column
+        if state is not None and not force and (state[2] is not None or state[3] is not None):
+            try:
+                remote = self._remote_fingerprint(db_path, table, filters)
+            except requests.exceptions.HTTPError:
+                remote = None
+            if remote == tuple(state[2:]):
+                self._touch(key)
+                return False
+
+        frame = self._fetch(db_path, table, filters, fields)
+        bodies = encode_pages(frame)
+        content_hash = hashlib.sha256(b"".join(hashlib.sha256(body).digest() for body in bodies)).hexdigest()
+        if state is not None and not force and content_hash == state[1]:
+            self._touch(key)
+            return False
+        self._write(key, frame, bodies, content_hash)
+        return True
+
+    def get(self, db_path, table, filters=None, fields="*"):
+        """
+        Returns the query result as a typed DataFrame, reading from local
+        disk whenever possible. The frame is the caller's own.
+        """
+        key = query_key(db_path, table, filters, fields)
+        state = self._sync_state(key)
+
+        if state is None or time.time() - state[0] > self.max_age:
+            try:
+                self.refresh(db_path, table, filters, fields)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                if state is None:
+                    raise
+                print(f"Warning: backend refresh failed for {table}, serving replicated rows: {e}")
+
+        return self._read(key)
+
+    def get_rows(self, db_path, table, filters=None, fields="*"):
+        """Same as get() but returns the rows as a list of dicts, as /process_json does."""
+        return json.loads(self.get(db_path, table, filters, fields).to_json(orient="records", date_format="iso"))
+
+
+_default_replica = None
+_default_lock = threading.Lock()
+
+
+def get_replica():
+    """Process-wide replica shared by every Streamlit session."""
+    global _default_replica
+    with _default_lock:
+        if _default_replica is None:
+            _default_replica = LocalReplica()
+        return _default_replica
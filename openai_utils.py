@@ -1,6 +1,10 @@
 import os
+import time
 import numpy as np
 from openai import OpenAI
+from embedding_store import open_embeddings
+from index_registry import get_index, native_dimensions
+from feedback_store import get_feedback_store
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
@@ -30,7 +34,7 @@ def load_embeddings(embeddings_path, sentences_path):
     if not os.path.exists(sentences_path):
         raise FileNotFoundError(f"Sentences file not found at {sentences_path}")
     
-    embeddings = np.load(embeddings_path)
+    embeddings = open_embeddings(embeddings_path)
     with open(sentences_path, 'r', encoding='utf-8') as f:
         sentences = f.readlines()
     sentences = [s.strip() for s in sentences]
@@ -41,20 +45,29 @@ def load_embeddings(embeddings_path, sentences_path):
     print(f"Loaded {len(embeddings)} embeddings and {len(sentences)} sentences.")
     return embeddings, sentences
 
-def get_query_embedding(query, model=None):
+def get_query_embedding(query, model=None, dimensions=None):
     if model is None:
         model = current_embedding_model
     try:
-        response = client.embeddings.create(input=query, model=model)
+        if dimensions and dimensions != native_dimensions(model):
+            response = client.embeddings.create(input=query, model=model, dimensions=dimensions)
+        else:
+            response = client.embeddings.create(input=query, model=model)
         embedding = response.data[0].embedding
         return embedding
     except Exception as e:
         print(f"Error obtaining query embedding: {e}")
         raise e
 
-def find_top_n_similar(query_embedding, embeddings, sentences, top_n=5, min_similarity=0.5):
+def feedback_prior(sentences):
+    """Per-row thumbs-up/down offsets for `sentences`, from the shared feedback store."""
+    return get_feedback_store().prior_vector(sentences)
+
+def find_top_n_similar(query_embedding, embeddings, sentences, top_n=5, min_similarity=0.5, prior=None):
     query_vec = np.array(query_embedding).reshape(1, -1)
     similarities = np.dot(embeddings, query_vec.T).flatten()
+    if prior is not None:
+        similarities = similarities + prior
     top_indices = similarities.argsort()[::-1]
     top_similar = [(sentences[i], similarities[i]) for i in top_indices if similarities[i] >= min_similarity]
     return top_similar[:top_n]
@@ -81,7 +94,7 @@ def get_answer_with_embeddings(query, embeddings, sentences, max_tokens=150, mod
         model = current_chat_model
     try:
         query_embedding = get_query_embedding(query)
-        top_similar = find_top_n_similar(query_embedding, embeddings, sentences)
+        top_similar = find_top_n_similar(query_embedding, embeddings, sentences, prior=feedback_prior(sentences))
         context = "\n".join([sentence for sentence, _ in top_similar])
         
         response = client.chat.completions.create(
@@ -107,13 +120,13 @@ def process_query(query, num_sentences=5, use_embeddings=True, max_tokens=150, r
     }
     
     if use_embeddings:
-        embeddings_path = './openai_large_embeddings/openai_large_combined_embeddings.npy'
-        sentences_path = './openai_large_embeddings/openai_large_combined_sentences.txt'
-        
         try:
-            embeddings, sentences = load_embeddings(embeddings_path, sentences_path)
-            query_embedding = get_query_embedding(query)
-            top_similar = find_top_n_similar(query_embedding, embeddings, sentences, num_sentences)
+            index = get_index(current_embedding_model)
+            embeddings, sentences = index.embeddings, index.sentences
+            query_embedding = get_query_embedding(query, index.model, index.dimensions)
+            index.validate_query(query_embedding)
+            top_similar = find_top_n_similar(query_embedding, embeddings, sentences, num_sentences,
+                                             prior=feedback_prior(sentences))
             
             context = "\n".join([sentence for sentence, _ in top_similar])
             result["context_sentences"] = [sentence for sentence, _ in top_similar] if return_context else None
@@ -156,13 +169,13 @@ def process_query_with_similarity(query, num_sentences=7, min_similarity=0.5, ma
         "final_answer": None
     }
     
-    embeddings_path = './openai_large_embeddings/openai_large_combined_embeddings.npy'
-    sentences_path = './openai_large_embeddings/openai_large_combined_sentences.txt'
-    
     try:
-        embeddings, sentences = load_embeddings(embeddings_path, sentences_path)
-        query_embedding = get_query_embedding(query)
-        top_similar = find_top_n_similar(query_embedding, embeddings, sentences, num_sentences, min_similarity)
+        index = get_index(current_embedding_model)
+        embeddings, sentences = index.embeddings, index.sentences
+        query_embedding = get_query_embedding(query, index.model, index.dimensions)
+        index.validate_query(query_embedding)
+        top_similar = find_top_n_similar(query_embedding, embeddings, sentences, num_sentences, min_similarity,
+                                         prior=feedback_prior(sentences))
         
         result["similar_sentences"] = [{"sentence": sentence, "similarity": score} for sentence, score in top_similar]
         
@@ -181,4 +194,42 @@ def process_query_with_similarity(query, num_sentences=7, min_similarity=0.5, ma
         print(f"Error processing query: {e}")
         result["error"] = str(e)
     
-    return result
\ No newline at end of file
+    return result
+
+def compare_embedding_models(query, models=("text-embedding-3-small", "text-embedding-3-large"), top_n=5):
+    """
+    Runs the same query against several embedding indexes side by side for
+    A/B comparison. Returns per-model latency (embedding call and search) and
+    results, plus each model's overlap with the first model's top_n.
+    Feedback priors are left out so the models are compared on raw similarity.
+    """
+    comparison = {"query": query, "models": {}}
+    baseline = None
+
+    for model in models:
+        entry = {}
+        try:
+            index = get_index(model)
+
+            start = time.perf_counter()
+            query_embedding = get_query_embedding(query, index.model, index.dimensions)
+            entry["embed_ms"] = (time.perf_counter() - start) * 1000
+            index.validate_query(query_embedding)
+
+            start = time.perf_counter()
+            top_similar = find_top_n_similar(query_embedding, index.embeddings, index.sentences, top_n, min_similarity=-1.0)
+            entry["search_ms"] = (time.perf_counter() - start) * 1000
+
+            entry["dimensions"] = index.dimensions
+            entry["results"] = [{"sentence": sentence, "similarity": float(score)} for sentence, score in top_similar]
+
+            result_set = {sentence for sentence, _ in top_similar}
+            if baseline is None:
+                baseline = result_set
+            entry["overlap"] = len(result_set & baseline) / max(len(baseline), 1)
+        except Exception as e:
+            print(f"Error comparing embedding model {model}: {e}")
+            entry["error"] = str(e)
+        comparison["models"][model] = entry
+
+    return comparison
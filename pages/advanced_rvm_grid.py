@@ -10,6 +10,7 @@ import warnings
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional, Any
+from figure_cache import cached_figure
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
@@ -179,7 +180,19 @@ class GridVisualizer:
         self.theme = theme_config
     
     def create_scatter_matrix(self, df: pd.DataFrame, color_by: str = 'Sector') -> go.Figure:
-        """Create RVM scatter plot matrix"""
+        """Create RVM scatter plot matrix (cached by data fingerprint and theme)"""
+        return cached_figure("GridVisualizer.scatter_matrix", df,
+                             lambda: self._build_scatter_matrix(df, color_by), theme=self.theme, params=(color_by,))
+    
+    def create_heatmap(self, df: pd.DataFrame) -> go.Figure:
+        """Create risk-value heatmap (cached by data fingerprint and theme)"""
+        return cached_figure("GridVisualizer.heatmap", df, lambda: self._build_heatmap(df), theme=self.theme)
+    
+    def create_3d_scatter(self, df: pd.DataFrame) -> go.Figure:
+        """Create 3D scatter plot (cached by data fingerprint and theme)"""
+        return cached_figure("GridVisualizer.3d_scatter", df, lambda: self._build_3d_scatter(df), theme=self.theme)
+    
+    def _build_scatter_matrix(self, df: pd.DataFrame, color_by: str = 'Sector') -> go.Figure:
         try:
             fig = px.scatter(
                 df, 
@@ -219,8 +232,7 @@ class GridVisualizer:
             logger.error(f"Scatter matrix creation error: {e}")
             return go.Figure()
     
-    def create_heatmap(self, df: pd.DataFrame) -> go.Figure:
-        """Create risk-value heatmap"""
+    def _build_heatmap(self, df: pd.DataFrame) -> go.Figure:
         try:
             # Create bins for heatmap
             risk_bins = pd.cut(df['Risk_Score'], bins=10, labels=False)
@@ -252,8 +264,7 @@ class GridVisualizer:
             logger.error(f"Heatmap creation error: {e}")
             return go.Figure()
     
-    def create_3d_scatter(self, df: pd.DataFrame) -> go.Figure:
-        """Create 3D scatter plot"""
+    def _build_3d_scatter(self, df: pd.DataFrame) -> go.Figure:
         try:
             fig = go.Figure(data=go.Scatter3d(
                 x=df['Risk_Score'],
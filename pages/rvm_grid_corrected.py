@@ -1,10 +1,9 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import requests
-import json
+from rvm_discovery import get_rvm_discovery, CLOUD_API_BASE, LOCAL_API_BASE
+from figure_cache import cached_figure
 from datetime import datetime
-import numpy as np
 
 def create_rvm_grid_tab():
     """
@@ -32,49 +31,17 @@ def create_rvm_grid_tab():
     """, unsafe_allow_html=True)
     
     # Cloud Database API Configuration
-    # These are the actual endpoints from json_receiver_project_v2
-    CLOUD_API_BASE = "https://json-receiver-gcs-831987145675.us-central1.run.app"  # Cloud Run endpoint
-    LOCAL_API_BASE = "http://localhost:8080"  # Local development endpoint
-    
-    def call_cloud_api(endpoint: str, method: str = "GET", data: dict = None) -> dict:
-        """Call the cloud database API"""
-        # Try cloud endpoint first, then fallback to local
-        for base_url in [CLOUD_API_BASE, LOCAL_API_BASE]:
-            try:
-                url = f"{base_url}{endpoint}"
-                
-                if method == "GET":
-                    response = requests.get(url, timeout=30)
-                elif method == "POST":
-                    response = requests.post(url, json=data, timeout=30)
-                else:
-                    continue
-                    
-                if response.status_code == 200:
-                    return {"success": True, "data": response.json(), "source": base_url}
-                else:
-                    continue
-                    
-            except Exception as e:
-                continue
-                
-        return {"success": False, "error": "Could not connect to cloud database API"}
+    # Endpoints from json_receiver_project_v2; health, catalogs and table
+    # locations are cached and both base URLs are probed in parallel
+    discovery = get_rvm_discovery()
     
     def get_available_databases() -> dict:
         """Get list of available databases from cloud storage"""
-        return call_cloud_api("/gcs_databases")
+        return discovery.databases()
     
     def find_rvm_table() -> dict:
         """Find databases containing RVM-related tables"""
-        # Try to find RVM grid tables
-        rvm_tables = ["rvm_grid", "rvm_grid_wide", "credit_spreads", "rvm_data"]
-        
-        for table in rvm_tables:
-            result = call_cloud_api(f"/find_table?table={table}")
-            if result["success"]:
-                return result
-                
-        return {"success": False, "error": "No RVM tables found"}
+        return discovery.find_rvm_table()
     
     def get_rvm_data() -> tuple[pd.DataFrame, dict]:
         """Get real RVM data from cloud database"""
@@ -89,7 +56,7 @@ def create_rvm_grid_tab():
         st.info("🌐 Connecting to cloud database API...")
         
         # Step 1: Check API health
-        health_check = call_cloud_api("/health")
+        health_check = discovery.health()
         if not health_check["success"]:
             status_info["connection_status"] = "🔴 API Offline"
             return generate_sample_rvm_data(), status_info
@@ -115,7 +82,7 @@ def create_rvm_grid_tab():
         status_info["database_name"] = db_path
         
         # Step 3: Get table schema to find the right table
-        schema_result = call_cloud_api(f"/tables?db_path={db_path}")
+        schema_result = discovery.tables(db_path)
         if not schema_result["success"]:
             status_info["connection_status"] = "🔴 Cannot access tables"
             return generate_sample_rvm_data(), status_info
@@ -140,7 +107,7 @@ def create_rvm_grid_tab():
             "limit": 100  # Reasonable limit
         }
         
-        query_result = call_cloud_api("/query", method="POST", data=query_data)
+        query_result = discovery.query(query_data)
         if not query_result["success"]:
             status_info["connection_status"] = "🔴 Query failed"
             return generate_sample_rvm_data(), status_info
@@ -194,7 +161,7 @@ def create_rvm_grid_tab():
         status = {}
         
         # API Health Check
-        health_result = call_cloud_api("/health")
+        health_result = discovery.health()
         if health_result["success"]:
             health_data = health_result["data"]
             status["api_health"] = "🟢 Online"
@@ -331,40 +298,45 @@ def create_rvm_grid_tab():
             # Charts section (secondary focus) with dark theme
             st.subheader("📈 Spread Analysis")
             
-            # Create visualization with dark theme
-            chart_data = df.melt(id_vars=['Rating'], var_name='Duration', value_name='Spread')
+            # Create visualization with dark theme; rebuilt only when the grid data changes
+            def build_spread_chart():
+                chart_data = df.melt(id_vars=['Rating'], var_name='Duration', value_name='Spread')
             
-            fig = px.line(
-                chart_data, 
-                x='Duration', 
-                y='Spread',
-                color='Rating',
-                title='Credit Spreads by Duration',
-                labels={'Spread': 'Spread (bps)', 'Duration': 'Duration (Years)'}
-            )
+                fig = px.line(
+                    chart_data, 
+                    x='Duration', 
+                    y='Spread',
+                    color='Rating',
+                    title='Credit Spreads by Duration',
+                    labels={'Spread': 'Spread (bps)', 'Duration': 'Duration (Years)'}
+                )
             
-            # Apply dark theme styling
-            fig.update_layout(
-                height=500,
-                showlegend=True,
-                plot_bgcolor='#1f1f1f',
-                paper_bgcolor='#1f1f1f',
-                font_color='white',
-                title_font_color='white',
-                legend=dict(
-                    bgcolor='#1f1f1f',
-                    bordercolor='white',
-                    font=dict(color='white')
-                ),
-                xaxis=dict(
-                    gridcolor='#404040',
-                    color='white'
-                ),
-                yaxis=dict(
-                    gridcolor='#404040',
-                    color='white'
+                # Apply dark theme styling
+                fig.update_layout(
+                    height=500,
+                    showlegend=True,
+                    plot_bgcolor='#1f1f1f',
+                    paper_bgcolor='#1f1f1f',
+                    font_color='white',
+                    title_font_color='white',
+                    legend=dict(
+                        bgcolor='#1f1f1f',
+                        bordercolor='white',
+                        font=dict(color='white')
+                    ),
+                    xaxis=dict(
+                        gridcolor='#404040',
+                        color='white'
+                    ),
+                    yaxis=dict(
+                        gridcolor='#404040',
+                        color='white'
+                    )
                 )
-            )
+            
+                return fig
+
+            fig = cached_figure("rvm_spread_lines", df, build_spread_chart)
             
             st.plotly_chart(fig, use_container_width=True)
         else:
@@ -0,0 +1,151 @@
+# portfolio_analytics.py
+
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from holdings_schema import holdings_version, issuer_names
+
+CONTRIBUTION_DIMENSIONS = ["issuer", "country", "region"]
+
+MAX_CACHED_RESULTS = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def portfolio_weights(holdings):
+    """
+    Portfolio weight of each holding (fractions summing to 1 over the
+    selection). Within a fund this is its 'weighting' share; across funds
+    each fund is scaled by its size, estimated from the market value of its
+    non-cash holdings and the weighting they represent.
+    """
+    weighting = holdings['weighting'].to_numpy(dtype=np.float64, na_value=0.0)
+    fund = holdings['fund_name'] if 'fund_name' in holdings.columns else pd.Series(0, index=holdings.index)
+    fund_codes, _ = pd.factorize(fund)
+
+    fund_weighting = np.bincount(fund_codes, weights=weighting)
+    if 'market_value' in holdings.columns:
+        market_value = holdings['market_value'].to_numpy(dtype=np.float64, na_value=np.nan)
+        invested = ~np.isnan(market_value)
+        fund_value = np.bincount(fund_codes, weights=np.where(invested, market_value, 0.0))
+        invested_weighting = np.bincount(fund_codes, weights=np.where(invested, weighting, 0.0))
+        fund_size = np.divide(fund_value * fund_weighting, invested_weighting,
+                              out=np.zeros_like(fund_value), where=invested_weighting > 0)
+    else:
+        fund_size = np.zeros_like(fund_weighting)
+    if not fund_size.any():
+        fund_size = np.ones_like(fund_weighting)
+
+    fund_share = fund_size / fund_size.sum()
+    within_fund = np.divide(weighting, fund_weighting[fund_codes],
+                            out=np.zeros_like(weighting), where=fund_weighting[fund_codes] != 0)
+    return within_fund * fund_share[fund_codes]
+
+
+def compute_portfolio_analytics(holdings):
+    """
+    Risk analytics for one fund or a set of funds.
+
+    The backend's 'duration' is already a modified duration (it sits just
+    below the Macaulay duration implied by each bond's yield), so it is used
+    as is. Spread duration is the modified duration of holdings that carry a
+    spread; for these fixed-rate bonds the two coincide. DTS is spread
+    duration x spread (bp). Cash holdings count towards weight only.
+
+    Returns {"summary": one-row DataFrame, "by_fund": DataFrame (each
+    fund's own figures and its weight in the selection), "contributions":
+    {"issuer" | "country" | "region": DataFrame}}. Every
+    table comes from one groupby at the (fund, issuer, country, region)
+    grain; contribution tables carry weight, duration and DTS contributions
+    and each bucket's share of total DTS.
+    """
+    weight = portfolio_weights(holdings)
+    yield_ = holdings['yield'].to_numpy(dtype=np.float64, na_value=np.nan)
+    duration = holdings['duration'].to_numpy(dtype=np.float64, na_value=np.nan)
+    spread = holdings['spread'].to_numpy(dtype=np.float64, na_value=np.nan)
+    has_spread = ~np.isnan(spread) & ~np.isnan(duration)
+
+    rows = pd.DataFrame({
+        "fund_name": holdings['fund_name'] if 'fund_name' in holdings.columns else "Portfolio",
+        "issuer": issuer_names(holdings['name']) if 'name' in holdings.columns else None,
+        "country": holdings['country'] if 'country' in holdings.columns else None,
+        "region": holdings['region'] if 'region' in holdings.columns else None,
+        "weight": weight,
+        "yield_contribution": weight * np.nan_to_num(yield_),
+        "duration_contribution": weight * np.nan_to_num(duration),
+        "spread_duration_contribution": np.where(has_spread, weight * duration, 0.0),
+        "dts_contribution": np.where(has_spread, weight * duration * spread, 0.0),
+        "market_value": holdings['market_value'].to_numpy(dtype=np.float64, na_value=0.0)
+        if 'market_value' in holdings.columns else 0.0,
+        "holdings": 1,
+    }, index=holdings.index)
+
+    grain = ["fund_name"] + CONTRIBUTION_DIMENSIONS
+    finest = rows.groupby(grain, observed=True, sort=False, dropna=False).sum(numeric_only=True)
+    total = finest.sum()
+
+    def summarize(table):
+        # Contributions are to the whole selection; divide by weight for each fund's own figures
+        weight = table["weight"].where(table["weight"] != 0)
+        return pd.DataFrame({
+            "market_value": table["market_value"],
+            "holdings": table["holdings"].astype(int),
+            "weight": table["weight"],
+            "yield": table["yield_contribution"] / weight,
+            "modified_duration": table["duration_contribution"] / weight,
+            "spread_duration": table["spread_duration_contribution"] / weight,
+            "dts": table["dts_contribution"] / weight,
+        })
+
+    summary = summarize(total.to_frame().T).reset_index(drop=True)
+    by_fund = summarize(finest.groupby(level="fund_name", observed=True, sort=False).sum()).reset_index()
+
+    contributions = {}
+    total_dts = total["dts_contribution"]
+    for dimension in CONTRIBUTION_DIMENSIONS:
+        table = finest.groupby(level=dimension, observed=True, sort=False, dropna=False)[
+            ["weight", "duration_contribution", "spread_duration_contribution", "dts_contribution"]
+        ].sum()
+        table["dts_share"] = table["dts_contribution"] / total_dts if total_dts else 0.0
+        contributions[dimension] = table.sort_values("dts_contribution", ascending=False).reset_index()
+
+    return {"summary": summary, "by_fund": by_fund, "contributions": contributions}
+
+
+def risk_summary(holdings):
+    """The headline figures as a plain dict, e.g. for SnapshotStore.series."""
+    summary = compute_portfolio_analytics(holdings)["summary"].iloc[0]
+    return {
+        "yield": float(summary["yield"]),
+        "modified_duration": float(summary["modified_duration"]),
+        "spread_duration": float(summary["spread_duration"]),
+        "dts": float(summary["dts"]),
+    }
+
+
+def get_portfolio_analytics(holdings):
+    """
+    compute_portfolio_analytics cached per data version and row selection,
+    so reruns and repeated filter states reuse the result. The returned
+    tables are shared and must not be mutated.
+    """
+    row_selection = int(pd.util.hash_pandas_object(holdings.index, index=False).to_numpy().sum())
+    key = (holdings_version(holdings), len(holdings), row_selection, tuple(holdings.columns))
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    result = compute_portfolio_analytics(holdings)
+    with _lock:
+        _cache[key] = result
+        while len(_cache) > MAX_CACHED_RESULTS:
+            _cache.popitem(last=False)
+    return result
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
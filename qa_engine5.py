@@ -2,6 +2,11 @@
 
 import os
 import numpy as np
+from embedding_store import open_embeddings, embedding_norms
+from exact_search import exact_top_k
+from index_registry import EMBEDDING_MODELS, IndexMismatchError, get_index
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-large"
 
 # Try to import OpenAI, but handle missing API key gracefully
 try:
@@ -16,27 +21,57 @@ except Exception as e:
     print(f"Warning: OpenAI import failed: {e}")
     client = None
 
+def current_embedding_model():
+    """The model chosen with openai_utils.set_embedding_model (the default when openai_utils cannot load)."""
+    try:
+        from openai_utils import get_current_embedding_model
+    except Exception:
+        return DEFAULT_EMBEDDING_MODEL
+    return get_current_embedding_model()
+
 class QAEngine:
-    def __init__(self, sentences_file, embeddings_file):
+    def __init__(self, sentences_file=None, embeddings_file=None, index=None, feedback=None, model=None):
+        # Without explicit files the index comes from index_registry for the model
         self.sentences_file = sentences_file
         self.embeddings_file = embeddings_file
         self.sentences = []
         self.embeddings = None
         self.client = client
+        self.model = model or current_embedding_model()
+        # Optional sharded_index.ShardedIndex; when set, retrieval fans out to its shard workers
+        self.index = index
+        # Optional feedback_store.FeedbackStore whose prior scores are added to similarities
+        self.feedback = feedback
         self.load_data()
 
     def load_data(self):
+        if self.sentences_file is None or self.embeddings_file is None:
+            try:
+                registered = get_index(self.model)
+            except (FileNotFoundError, KeyError, IndexMismatchError) as e:
+                print(f"Warning: no usable index for {self.model}: {e}. Embedding search disabled.")
+                return
+            self.sentences_file = registered.sentences_path
+            self.embeddings_file = registered.embeddings_path
+            self.sentences = registered.sentences
+            self.embeddings = registered.embeddings
+            return
         try:
             with open(self.sentences_file, 'r', encoding='utf-8') as f:
                 self.sentences = [line.strip() for line in f]
-            self.embeddings = np.load(self.embeddings_file)
+            self.embeddings = open_embeddings(self.embeddings_file)
+            expected = EMBEDDING_MODELS.get(self.model, {}).get("dimensions")
+            if expected and self.embeddings.shape[1] != expected:
+                print(f"Warning: {self.embeddings_file} has {self.embeddings.shape[1]} dimensions, "
+                      f"{self.model} produces {expected}. Embedding search disabled.")
+                self.embeddings = None
         except FileNotFoundError as e:
             pass
         except Exception as e:
             pass
         
     def find_relevant_sentences(self, query, top_k=3):
-        if self.embeddings is None or not self.sentences:
+        if (self.embeddings is None and self.index is None) or not self.sentences:
             return []
 
         try:
@@ -54,12 +89,18 @@ class QAEngine:
             
             query_embedding = self.client.embeddings.create(
                 input=[query],
-                model="text-embedding-3-large"
+                model=self.model
             ).data[0].embedding
 
+            if self.index is not None:
+                prior = self.feedback.prior_vector(self.index.sentences) if self.feedback is not None else None
+                return self.index.query(query_embedding, top_k, prior=prior)
+
             similarities = np.dot(self.embeddings, query_embedding) / (
-                np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
+                embedding_norms(self.embeddings_file) * np.linalg.norm(query_embedding)
             )
+            if self.feedback is not None:
+                similarities = similarities + self.feedback.prior_vector(self.sentences)
             top_indices = similarities.argsort()[-top_k:][::-1]
             results = [(self.sentences[idx], similarities[idx]) for idx in top_indices]
 
@@ -67,7 +108,39 @@ class QAEngine:
         except Exception as e:
             print(f"Error in query_embeddings: {e}")
             return []
+
+    def exact_query_embeddings(self, queries, top_k=10):
+        """
+        Exact (audit) search for several queries at once. Streams the embedding
+        file in blocks instead of scoring the whole matrix in memory, and
+        returns one [(sentence, similarity)] list per query, matching
+        query_embeddings() (feedback prior included) for the same question.
+        """
+        try:
+            if not self.client or not self.sentences:
+                return [[] for _ in queries]
+
+            response = self.client.embeddings.create(
+                input=list(queries),
+                model=self.model
+            )
+            query_embeddings = [item.embedding for item in response.data]
+
+            prior = self.feedback.prior_vector(self.sentences) if self.feedback is not None else None
+            results = exact_top_k(self.embeddings_file, query_embeddings, top_k, prior=prior)
+            return [
+                [(self.sentences[row_id], score) for row_id, score in query_results]
+                for query_results in results
+            ]
+        except Exception as e:
+            print(f"Error in exact_query_embeddings: {e}")
+            return [[] for _ in queries]
         
+    def record_feedback(self, results, vote):
+        """Records a thumbs-up (+1) or thumbs-down (-1) for the sentences behind an answer."""
+        if self.feedback is not None:
+            self.feedback.record([sentence for sentence, _ in results], vote)
+
     def extract_answer(self, results, num_sentences=1):
         """
         Extract a coherent answer from the most relevant results.
@@ -101,10 +174,10 @@ class QAEngine:
         else:
             return "Invalid response mode. Please choose 'general' or 'andy'."
 
-def get_embedding(text):
+def get_embedding(text, model="text-embedding-3-large"):
     response = client.embeddings.create(
         input=[text],
-        model="text-embedding-3-large"
+        model=model
     )
     # Extract the embedding from the response
     return response.data[0].embedding
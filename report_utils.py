@@ -6,7 +6,34 @@ import plotly.graph_objects as go
 import colorsys
 from io import StringIO
 import json
-from fetch_data import fetch_fund_data  # Import the function from fetch_data.py
+import os
+import time
+from fetch_data import fetch_fund_data, fund_table, iter_fund_holdings_chunks, record_fund_refresh  # Import the function from fetch_data.py
+from holdings_schema import normalize_holdings, rating_labels, holdings_version
+from fund_aggregates import get_fund_aggregates, NFA_COLUMNS, ESG_COLUMNS
+from filter_engine import get_filter_engine
+from holdings_grid import render_holdings_grid
+from view_fields import view_columns
+from figure_cache import cached_figure
+from portfolio_analytics import get_portfolio_analytics
+from compliance_rules import get_compliance_engine
+from exposure_cube import get_exposure_cube, DRILL_PATHS
+from holdings_delta import get_holdings_delta, ADDED, REMOVED, RESIZED, CHANGE_TYPES
+from snapshot_store import get_snapshot_store
+from export_utils import EXPORT_FORMATS, export_file_name, get_export, iter_frame_chunks
+import backend_client
+from local_replica import get_replica
+from swr_cache import SWRCache
+
+# Report data is served stale-while-revalidate; these keys are kept warm in the background
+report_cache = SWRCache(ttl=3600)
+
+WARM_FUNDS = [
+    "Shin Kong Emerging Wealthy Nations Bond Fund",
+    "Shin Kong Environmental Sustainability Bond Fund",
+]
+WARM_TIME_SELECTIONS = ["Latest", "Month End"]
+WARM_COUNTRIES = ["Israel", "Qatar", "Mexico", "Saudi Arabia"]
 
 # Custom color palette
 color_palette = [
@@ -46,21 +73,26 @@ def apply_custom_css():
         unsafe_allow_html=True
     )
 
+def load_country_data(entity_name, db_name="credit_research.db", table_name="FullReport"):
+    """
+    Returns the report rows for a country, served from the stale-while-revalidate cache.
+    """
+    return report_cache.get(
+        ("country", entity_name, db_name, table_name),
+        lambda: get_replica().get_rows(db_name, table_name, {"Country": entity_name})
+    )
+
 def fetch_country_data(entity_name, db_name="credit_research.db", table_name="FullReport"):
-    url = "https://my-combined-app-44056503414.us-central1.run.app/process_json"
-    payload = {
-        "sample_key": f'{{"db_path": "{db_name}", "table": "{table_name}", "filters": {{"Country": "{entity_name}"}}, "fields": "*", "page": 1, "page_size": 100}}'
-    }
+    payload = backend_client.process_json_payload(db_name, table_name, {"Country": entity_name})
     st.session_state.state["payload"] = json.dumps(payload, indent=2)
     
-    response = requests.post(url, json=payload)
-    if response.status_code == 200:
-        data = response.json()
-        st.session_state.state["api_response"] = json.dumps(data, indent=2)
-        return data
-    else:
-        st.session_state.state["api_response"] = f"Error: {response.status_code}"
+    try:
+        data = load_country_data(entity_name, db_name, table_name)
+    except requests.exceptions.RequestException as e:
+        st.session_state.state["api_response"] = f"Error: {e}"
         return None
+    st.session_state.state["api_response"] = json.dumps(data, indent=2)
+    return data
     
 # Function to fetch country data from the API and create a country report tab
 
@@ -140,17 +172,21 @@ def filter_dataframe(df: pd.DataFrame, identifier: str = "", filter_columns: lis
     if filter_columns is None:
         filter_columns = []
 
-    filtered_df = df.copy()
+    # Column metadata (min/max, sorted options) is cached per data version; every
+    # widget's predicate is ANDed into one mask and the result materialized once
+    engine = get_filter_engine(df)
+    predicates = {}
 
     for idx, col in enumerate(filter_columns):
         if col not in df.columns:
             continue
 
-        unique_values = sorted(df[col].dropna().astype(str).unique())
+        meta = engine.meta(col)
 
-        if pd.api.types.is_numeric_dtype(df[col]):
-            numeric_values = df[col].dropna()
-            default_value = [float(numeric_values.min()), float(numeric_values.max())]
+        if meta.numeric:
+            if meta.min is None:
+                continue
+            default_value = [meta.min, meta.max]
             selected_values = st.slider(
                 f"Filter {col} ({identifier})",
                 min_value=default_value[0],
@@ -159,20 +195,17 @@ def filter_dataframe(df: pd.DataFrame, identifier: str = "", filter_columns: lis
                 step=(default_value[1] - default_value[0]) / 100,
                 key=f"filter_{col}_{identifier}_{idx}"
             )
-            filtered_df = filtered_df[
-                (filtered_df[col] >= selected_values[0]) &
-                (filtered_df[col] <= selected_values[1])
-            ]
+            predicates[col] = selected_values
         else:
             selected_values = st.multiselect(
                 f"Filter {col} ({identifier})",
-                options=unique_values,
-                default=unique_values,
+                options=meta.options,
+                default=meta.options,
                 key=f"filter_{col}_{identifier}_{idx}"
             )
-            filtered_df = filtered_df[filtered_df[col].astype(str).isin(selected_values)]
+            predicates[col] = selected_values
 
-    return filtered_df
+    return engine.apply(predicates)
 
 def create_pie_chart(data, names, values, title, legend_position='right'):
     colors = color_palette[:len(data[names].unique())]
@@ -220,54 +253,59 @@ def create_pie_chart(data, names, values, title, legend_position='right'):
     )
     return fig
 
-def create_pie_charts_and_table(fund_data):
+def create_report_pie_chart(buckets, names, title, legend_position='right', rotation=None):
+    """
+    A fund report pie chart (bucket table from fund_aggregates) with the
+    report's trace settings, served from the figure cache when the buckets
+    are unchanged.
+    """
+    def build():
+        fig = create_pie_chart(buckets, names, 'weighting', title, legend_position=legend_position)
+        fig.update_traces(hoverinfo="label+percent", textinfo='percent', textfont=dict(size=12))
+        if rotation is not None:
+            fig.update_traces(rotation=rotation)
+        return fig
+    return cached_figure("report_pie_chart", buckets, build, params=(names, title, legend_position, rotation))
+
+def create_pie_charts_and_table(fund_data, fund_name=None, time_selection=None):
     if fund_data is not None:
-        # Convert 'weighting' to numeric, replacing any non-numeric values with NaN
-        fund_data['weighting'] = pd.to_numeric(fund_data['weighting'], errors='coerce')
-        
+        # Holdings are typed once at ingest (holdings_schema); only frames built elsewhere need it here
+        if not pd.api.types.is_float_dtype(fund_data['weighting']):
+            fund_data = normalize_holdings(fund_data)
+
+        # Bucket weightings for every chart, computed in one pass and cached per fund and data version
+        aggregates = get_fund_aggregates(fund_data, fund_name, time_selection)
+
         # Remove any rows where 'weighting' is NaN
         fund_data = fund_data.dropna(subset=['weighting'])
         
         # Check if 'nfa_star_rating' column exists
-        nfa_column = next((col for col in ['nfa_star_rating', 'nfa'] if col in fund_data.columns), None)
+        nfa_column = next((col for col in NFA_COLUMNS if col in fund_data.columns), None)
         if nfa_column:
-            # Add "Cash" for missing NFA ratings
-            fund_data[nfa_column] = fund_data[nfa_column].fillna('Cash')
-            fig_nfa = create_pie_chart(fund_data, nfa_column, 'weighting', "NFA Star Rating Distribution", legend_position='right')
-            fig_nfa.update_traces(hoverinfo="label+percent", textinfo='percent', textfont=dict(size=12))
+            # Label ratings, with "Cash" for missing NFA ratings
+            fund_data[nfa_column] = rating_labels(fund_data[nfa_column])
+            fig_nfa = create_report_pie_chart(aggregates['nfa'], nfa_column, "NFA Star Rating Distribution", legend_position='right')
         else:
             st.warning("NFA Star Rating data not available.")
 
         # Check if 'esg' column exists
-        esg_column = next((col for col in ['esg', 'esg_country_star_rating'] if col in fund_data.columns), None)
+        esg_column = next((col for col in ESG_COLUMNS if col in fund_data.columns), None)
         if esg_column:
-            # Add "Cash" for missing ESG ratings
-            fund_data[esg_column] = fund_data[esg_column].fillna('Cash')
-
-            # Convert 'esg' ratings to numeric where possible, and keep non-numeric as is
-            fund_data['esg_numeric'] = pd.to_numeric(fund_data[esg_column], errors='coerce')
+            # Label ratings, with "Cash" for missing ESG ratings
+            fund_data[esg_column] = rating_labels(fund_data[esg_column])
 
             # Create the ESG pie chart using the esg column and set hover and label settings
-            fig_esg = create_pie_chart(fund_data, esg_column, 'weighting', "ESG Rating Distribution", legend_position='left')
-            fig_esg.update_traces(hoverinfo="label+percent", textinfo='percent', textfont=dict(size=12), rotation=90)
-        else:
-            st.warning("ESG Rating data not available.")
-
-        # Create a new column to categorize ESG ratings into 'ESG >= 6' or 'ESG < 6 or Cash'
-        if esg_column:
-            fund_data['esg_6_or_more'] = fund_data['esg_numeric'].apply(
-                lambda x: 'ESG >= 6' if pd.notna(x) and x >= 6 else 'ESG < 6 or Cash'
-            )
+            fig_esg = create_report_pie_chart(aggregates['esg'], esg_column, "ESG Rating Distribution", legend_position='left', rotation=90)
 
             # Create the pie chart for ESG ratings with a rating of 6 or more and set hover and label settings
-            fig_esg_6 = create_pie_chart(fund_data, 'esg_6_or_more', 'weighting', "ESG Ratings 6 or More", legend_position='right')
-            fig_esg_6.update_traces(hoverinfo="label+percent", textinfo='percent', textfont=dict(size=12), rotation=90)
+            fig_esg_6 = create_report_pie_chart(aggregates['esg_6_or_more'], 'esg_6_or_more', "ESG Ratings 6 or More", legend_position='right', rotation=90)
+        else:
+            st.warning("ESG Rating data not available.")
         
         # Check if 'region' column exists
         if 'region' in fund_data.columns:
             # Create a Region pie chart and set hover and label settings
-            fig_region = create_pie_chart(fund_data, 'region', 'weighting', "Region Distribution", legend_position='left')
-            fig_region.update_traces(hoverinfo="label+percent", textinfo='percent', textfont=dict(size=12), rotation=90)
+            fig_region = create_report_pie_chart(aggregates['region'], 'region', "Region Distribution", legend_position='left', rotation=90)
         else:
             st.warning("Region data not available.")
 
@@ -287,71 +325,305 @@ def create_pie_charts_and_table(fund_data):
         # Apply the filters to the table data
         filtered_data = filter_dataframe(fund_data)
 
-        # Style the DataFrame using Styler
-        styled_df = filtered_data.style.map(lambda _: 'color: white') \
-            .set_table_styles([
-                {'selector': 'th', 'props': [
-                    ('background-color', '#2f2f2f'),  # Header color
-                    ('color', 'white'),
-                    ('font-weight', 'bold'),
-                    ('padding', '10px'),
-                    ('text-align', 'left')
-                ]},
-                {'selector': 'td', 'props': [
-                    ('padding', '10px'), 
-                    ('color', 'white'), 
-                    ('white-space', 'nowrap'),  # Ensure text doesn't wrap
-                    ('overflow', 'hidden'), 
-                    ('text-overflow', 'ellipsis'),  # Handle overflow with ellipsis if needed
-                    ('text-align', 'left'),
-                    ('background-color', '#1e1e1e'),
-                    ('max-width', '300px')
-                ]},
-                {'selector': '.row_heading, .col_heading', 'props': [
-                    ('background-color', '#1e1e1e'),  # Row header color
-                    ('color', 'white')
-                ]},
-                {'selector': 'tbody tr:nth-child(even)', 'props': [
-                    ('background-color', '#252525')  # Even row background color
-                ]}
-            ])
-
-        # Add an expander for full-screen view #ADD BACK IN NEEDED
-        #with st.expander("View Data Table in Full Screen", expanded=False):
-         #   st.table(styled_df)
+        # Risk figures follow the table filters
+        render_portfolio_risk(filtered_data, key=f"risk_{fund_name}_{time_selection}")
+        if fund_name:
+            render_risk_history(fund_name, time_selection)
+
+        # Paged, server-side sorted table; only the visible page is formatted and sent
+        with st.expander("View Data Table in Full Screen", expanded=False):
+            render_holdings_grid(filtered_data, key=f"holdings_{fund_name}_{time_selection}", columns=view_columns("fund_holdings_table"))
+            render_export_controls(filtered_data, fund_name, time_selection, key=f"export_{fund_name}_{time_selection}")
 
     else:
         st.error("No fund data available to display.")
 
+def render_portfolio_risk(holdings, key="risk"):
+    """Weighted yield, duration, spread duration and DTS, plus the largest DTS contributors."""
+    if holdings.empty or not {'weighting', 'yield', 'duration', 'spread'}.issubset(holdings.columns):
+        return
+    analytics = get_portfolio_analytics(holdings)
+    summary = analytics["summary"].iloc[0]
+
+    st.subheader("Portfolio Risk")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Weighted Yield", f"{summary['yield']:.2f}%")
+    col2.metric("Modified Duration", f"{summary['modified_duration']:.2f}")
+    col3.metric("Spread Duration", f"{summary['spread_duration']:.2f}")
+    col4.metric("DTS", f"{summary['dts']:,.0f}")
+
+    dimension = st.radio("Contribution to risk by", ["issuer", "country", "region"], horizontal=True,
+                         key=f"{key}_dimension")
+    contributions = analytics["contributions"][dimension].head(10)
+    st.dataframe(
+        contributions.style.format({
+            "weight": "{:.2%}",
+            "duration_contribution": "{:.2f}",
+            "spread_duration_contribution": "{:.2f}",
+            "dts_contribution": "{:,.1f}",
+            "dts_share": "{:.1%}",
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+def render_risk_history(fund_name, time_selection="Latest", days=365):
+    """Yield, duration and DTS over the last `days` from the local snapshot history."""
+    start = (pd.Timestamp.today() - pd.Timedelta(days=days)).strftime('%Y-%m-%d')
+    history = get_snapshot_store().series(fund_name, "risk", start=start, source=fund_table(time_selection))
+    if len(history) < 2:
+        return
+    st.subheader("Risk History")
+    history = history.set_index("date")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.line_chart(history[["yield", "modified_duration", "spread_duration"]])
+    with col2:
+        st.line_chart(history[["dts"]])
+
+def render_compliance(fund_name, fund_data, time_selection):
+    """
+    The fund's mandate limits and any breaches. Rules are re-checked only
+    when the fund's data has changed since the last check.
+    """
+    results = get_compliance_engine(time_selection).evaluate({fund_name: fund_data})
+    if results.empty:
+        return
+    breaches = results[results["breach"].to_numpy(dtype=bool)]
+    if len(breaches):
+        st.error(f"{len(breaches)} limit breach{'es' if len(breaches) != 1 else ''}: "
+                 + "; ".join(breaches["description"]))
+    else:
+        st.success(f"All {len(results)} limits met")
+
+    with st.expander("Compliance Limits", expanded=bool(len(breaches))):
+        st.dataframe(
+            results.drop(columns=["fund", "rule_id"]).style.format({
+                "value": "{:.2%}",
+                "min": "{:.0%}",
+                "max": "{:.0%}",
+                "headroom": "{:+.2%}",
+            }, na_rep="").apply(
+                lambda row: ["color: #ff6b6b" if row["breach"] else ""] * len(row), axis=1
+            ),
+            hide_index=True,
+            use_container_width=True
+        )
+
+def render_holdings_delta(fund_name, key="delta"):
+    """
+    Adds, exits and resizes between Latest and a baseline: Month End, or
+    any earlier day in the local snapshot history.
+    """
+    latest = fetch_fund_data_with_cache(fund_name, "Latest")
+    if latest is None or latest.empty or 'isin' not in latest.columns:
+        return
+
+    # Earlier days come from the history of Latest captures
+    latest_source = fund_table("Latest")
+    snapshot_dates = [entry["date"] for entry in reversed(get_snapshot_store().entries(fund_name, source=latest_source))]
+    st.subheader("Holdings Changes")
+    baseline = st.selectbox("Compare Latest against", ["Month End"] + snapshot_dates, key=f"{key}_baseline")
+    if baseline == "Month End":
+        before = fetch_fund_data_with_cache(fund_name, "Month End")
+    else:
+        before = get_snapshot_store().as_of(fund_name, baseline, source=latest_source)
+    if before is None or before.empty:
+        st.info(f"No {baseline} holdings available to compare against.")
+        return
+
+    delta = get_holdings_delta(before, latest)
+    summary = delta["summary"]
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("New Positions", summary["added"])
+    col2.metric("Exits", summary["removed"])
+    col3.metric("Resized", summary["resized"])
+    col4.metric("Duration Change", f"{summary['duration_change']:+.2f}")
+    col5.metric("Spread Change (bp)", f"{summary['spread_change']:+.1f}")
+
+    shown = st.multiselect("Show", CHANGE_TYPES, default=[ADDED, REMOVED, RESIZED], key=f"{key}_types")
+    changes = delta["changes"]
+    changes = changes[changes["change"].isin(shown).to_numpy()]
+    if changes.empty:
+        st.info("No position changes.")
+        return
+    st.dataframe(
+        changes.style.format({
+            "face_before": "{:,.0f}",
+            "face_after": "{:,.0f}",
+            "face_change": "{:+,.0f}",
+            "weight_before": "{:.2%}",
+            "weight_after": "{:.2%}",
+            "weight_change": "{:+.2%}",
+            "duration_contribution_change": "{:+.3f}",
+            "spread_contribution_change": "{:+.2f}",
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+def render_exposure_cube(time_selection, key="cube"):
+    """
+    Exposure across every fund, drilled down one level at a time (e.g.
+    country, then issuer, then ISIN). Answered from the exposure cube's
+    cached per-fund cells, which the scheduled report refresh keeps current;
+    nothing is fetched here.
+    """
+    cube = get_exposure_cube(time_selection)
+    funds = cube.funds()
+    if not funds:
+        st.info("Fund exposures are still loading in the background.")
+        return
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        path_name = st.selectbox("Drill path", list(DRILL_PATHS), key=f"{key}_path")
+    with col2:
+        selected_funds = st.multiselect("Funds", funds, default=funds, key=f"{key}_funds")
+    if not selected_funds:
+        return
+    path = DRILL_PATHS[path_name]
+    filters = {"fund": selected_funds}
+
+    # One selector per level; the widget key carries the parent selection so a stale choice never lingers
+    selection = []
+    level_columns = st.columns(len(path) - 1)
+    for level, dimension in enumerate(path[:-1]):
+        options = cube.drill_down(path, selection, filters)[dimension].astype(str).tolist()
+        with level_columns[level]:
+            choice = st.selectbox(
+                dimension.replace("_", " ").title(), ["All"] + options,
+                key=f"{key}_{path_name}_{level}_{'/'.join(selection)}"
+            )
+        if choice == "All":
+            break
+        selection.append(choice)
+
+    table = cube.drill_down(path, selection, filters)
+    st.caption(" → ".join(["All funds" if len(selected_funds) == len(funds) else ", ".join(selected_funds)] + selection))
+    st.dataframe(
+        table.style.format({
+            "value": "{:,.0f}",
+            "weight": "{:.2%}",
+            "face_amount": "{:,.0f}",
+            "duration": "{:.2f}",
+            "spread": "{:.1f}",
+            "dts": "{:,.0f}",
+            "duration_contribution": "{:.3f}",
+            "dts_contribution": "{:,.1f}",
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+
+def render_export_controls(holdings, fund_name, time_selection, key="export"):
+    """
+    Download of the filtered holdings or of every fund as CSV, Parquet or
+    Excel. Files are written chunk by chunk to a temp file on request and
+    served from there; "All funds" streams backend pages straight to disk.
+    """
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        scope = st.radio("Export", ["Filtered holdings", "All funds"], horizontal=True, key=f"{key}_scope")
+    with col2:
+        fmt = st.selectbox("Format", list(EXPORT_FORMATS), key=f"{key}_format")
+
+    if scope == "All funds":
+        # Backend data is refreshed hourly, so one export per time selection and hour
+        export_key = ("all_funds", time_selection, int(time.time() // report_cache.ttl))
+        make_chunks = lambda: iter_fund_holdings_chunks(time_selection)
+        file_stem = f"all_funds_{time_selection}"
+    else:
+        row_selection = int(pd.util.hash_pandas_object(holdings.index, index=False).to_numpy().sum())
+        export_key = ("holdings", holdings_version(holdings), len(holdings), row_selection, tuple(holdings.columns))
+        make_chunks = lambda: iter_frame_chunks(holdings)
+        file_stem = f"{fund_name or 'holdings'}_{time_selection}"
+
+    with col3:
+        if st.button("Prepare export", key=f"{key}_prepare"):
+            try:
+                with st.spinner("Writing export..."):
+                    st.session_state[f"{key}_file"] = (export_key, fmt, get_export(export_key, fmt, make_chunks))
+            except Exception as e:
+                st.error(f"Export failed: {e}")
+
+    prepared = st.session_state.get(f"{key}_file")
+    if prepared and prepared[:2] == (export_key, fmt) and os.path.exists(prepared[2]):
+        size = os.path.getsize(prepared[2])
+        size_label = f"{size / 1e6:,.1f} MB" if size >= 1e6 else f"{size / 1e3:,.0f} KB"
+        with open(prepared[2], 'rb') as f:
+            st.download_button(
+                f"Download {fmt} ({size_label})", f,
+                file_name=export_file_name(file_stem, fmt), mime=EXPORT_FORMATS[fmt][1], key=f"{key}_download"
+            )
+
 def convert_df_to_csv(df):
     # Convert dataframe to CSV
     return df.to_csv(index=False).encode('utf-8')
 
-@st.cache_data(show_spinner=True, ttl=3600)
-def _fetch_fund_data_cached(fund_name, time_selection):
+def fetch_fund_data_with_cache(fund_name, time_selection, view="fund_report"):
+    """
+    Fetches the columns `view` needs through the stale-while-revalidate
+    cache. Returns a shallow copy so report code can add columns without
+    touching the cache.
+    """
+    fund_data = report_cache.get(
+        ("fund", fund_name, time_selection, view),
+        lambda: fetch_fund_data(fund_name, time_selection, view)
+    )
+    return fund_data.copy(deep=False) if fund_data is not None else None
+
+def refresh_fund_report(fund_name, time_selection):
     """
-    Cached wrapper for fetch_fund_data() to cache data in Streamlit.
+    Scheduled reload of one fund's report data. Unlike a session's cache
+    miss, it also records the refresh in the snapshot history and the
+    exposure cube.
     """
-    return fetch_fund_data(fund_name, time_selection)
+    fund_data = fetch_fund_data(fund_name, time_selection, "fund_report")
+    record_fund_refresh(fund_name, time_selection, fund_data)
+    return fund_data
 
-def fetch_fund_data_with_cache(fund_name, time_selection):
+def start_report_refresher(interval=60):
     """
-    Fetches fund data with Streamlit caching.
+    Registers every fund x time selection and country report with the cache
+    and starts the background scheduler that refreshes them before they
+    expire. Safe to call on every rerun.
     """
-    return _fetch_fund_data_cached(fund_name, time_selection)
+    for fund_name in WARM_FUNDS:
+        for time_selection in WARM_TIME_SELECTIONS:
+            report_cache.register(
+                ("fund", fund_name, time_selection, "fund_report"),
+                lambda fund_name=fund_name, time_selection=time_selection: refresh_fund_report(fund_name, time_selection)
+            )
+    for country in WARM_COUNTRIES:
+        report_cache.register(
+            ("country", country, "credit_research.db", "FullReport"),
+            lambda country=country: get_replica().get_rows("credit_research.db", "FullReport", {"Country": country})
+        )
+    report_cache.start_scheduler(interval)
     
 def create_fund_report_tab(fund_name, color_palette, time_selection="Latest"):
     apply_custom_css()
     st.write(f"### {fund_name} Fund Report ({time_selection})")
-    fund_data = fetch_fund_data(fund_name, time_selection)
+    fund_data = fetch_fund_data_with_cache(fund_name, time_selection)
     
     if fund_data is not None and not fund_data.empty:
-        create_pie_charts_and_table(fund_data)
+        render_compliance(fund_name, fund_data, time_selection)
+        create_pie_charts_and_table(fund_data, fund_name, time_selection)
+        render_holdings_delta(fund_name, key=f"delta_{fund_name}")
+        with st.expander("Cross-Fund Exposure", expanded=False):
+            render_exposure_cube(time_selection, key=f"cube_{fund_name}_{time_selection}")
     else:
         st.error(f"No data found for {fund_name}.")
 
 # Function to plot charts (for both country and fund reports)
 def plot_chart(df, y_column, title, color):
+    return cached_figure(
+        "report_utils.plot_chart", df[['Year', y_column]],
+        lambda: _build_bar_chart(df, y_column, title, color), params=(y_column, title, color)
+    )
+
+def _build_bar_chart(df, y_column, title, color):
     fig = px.bar(df, x='Year', y=y_column,
                  title=title,
                  color_discrete_sequence=[color],
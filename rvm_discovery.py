@@ -0,0 +1,139 @@
+# rvm_discovery.py
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
+import backend_client
+
+CLOUD_API_BASE = "https://json-receiver-gcs-831987145675.us-central1.run.app"  # Cloud Run endpoint
+LOCAL_API_BASE = "http://localhost:8080"  # Local development endpoint
+
+RVM_TABLES = ["rvm_grid", "rvm_grid_wide", "credit_spreads", "rvm_data"]
+
+# Seconds to cache discovery answers; failures are cached briefly so an outage is not re-probed on every rerun
+HEALTH_TTL = 30
+CATALOG_TTL = 300
+FAILURE_TTL = 15
+
+
+class RVMDiscovery:
+    """
+    Discovery layer for the RVM cloud database API (json_receiver_project_v2).
+
+    Health, database lists, table lookups and table schemas are cached with
+    TTLs. Requests go to the last base URL that answered; when there is none
+    (or it fails) every base URL whose circuit breaker allows it is probed in
+    parallel and the first success wins. Dead endpoints are skipped by their
+    circuit breakers, so an outage costs milliseconds per page view.
+    """
+
+    def __init__(self, base_urls=(CLOUD_API_BASE, LOCAL_API_BASE)):
+        self.base_urls = list(base_urls)
+        self.preferred = None
+        self._cache = {}
+        self._lock = threading.Lock()
+        # Separate pools: table lookups fan out to probes, so they must not share workers
+        self._probe_executor = ThreadPoolExecutor(max_workers=len(self.base_urls) * len(RVM_TABLES))
+        self._lookup_executor = ThreadPoolExecutor(max_workers=len(RVM_TABLES))
+
+    def _request(self, base_url, endpoint, method, data, timeout_key):
+        breaker = backend_client.get_breaker(base_url)
+        if not breaker.allow():
+            raise backend_client.CircuitOpenError(f"Circuit open for {base_url}")
+        try:
+            response = backend_client.request(
+                method, f"{base_url}{endpoint}", endpoint=timeout_key, retries=0,
+                json=data if method == "POST" else None
+            )
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError(f"{response.status_code} from {base_url}{endpoint}")
+        return response.json()
+
+    def call(self, endpoint, method="GET", data=None, timeout_key="rvm"):
+        """Returns {"success", "data", "source"} or {"success": False, "error"}."""
+        preferred = self.preferred
+        if preferred is not None and backend_client.get_breaker(preferred).state == "closed":
+            try:
+                return {"success": True, "data": self._request(preferred, endpoint, method, data, timeout_key), "source": preferred}
+            except (requests.exceptions.RequestException, ValueError):
+                pass
+
+        candidates = [url for url in self.base_urls if url != preferred or backend_client.get_breaker(url).state != "closed"]
+        futures = {
+            self._probe_executor.submit(self._request, base_url, endpoint, method, data, timeout_key): base_url
+            for base_url in candidates
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except (requests.exceptions.RequestException, ValueError):
+                continue
+            self.preferred = futures[future]
+            return {"success": True, "data": result, "source": futures[future]}
+
+        return {"success": False, "error": "Could not connect to cloud database API"}
+
+    def _cached(self, key, ttl, fetch):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and now < entry[0]:
+                return entry[1]
+        result = fetch()
+        expires = now + (ttl if result["success"] else min(ttl, FAILURE_TTL))
+        with self._lock:
+            self._cache[key] = (expires, result)
+        return result
+
+    def health(self):
+        return self._cached("health", HEALTH_TTL, lambda: self.call("/health", timeout_key="rvm_discovery"))
+
+    def databases(self):
+        return self._cached("databases", CATALOG_TTL, lambda: self.call("/gcs_databases", timeout_key="rvm_discovery"))
+
+    def find_table(self, table):
+        return self._cached(
+            ("find_table", table), CATALOG_TTL,
+            lambda: self.call(f"/find_table?table={table}", timeout_key="rvm_discovery")
+        )
+
+    def tables(self, db_path):
+        return self._cached(("tables", db_path), CATALOG_TTL, lambda: self.call(f"/tables?db_path={db_path}"))
+
+    def find_rvm_table(self):
+        """Looks up all candidate RVM tables in parallel and returns the first hit in priority order."""
+        def fetch():
+            results = list(self._lookup_executor.map(self.find_table, RVM_TABLES))
+            for result in results:
+                if result["success"]:
+                    return result
+            return {"success": False, "error": "No RVM tables found"}
+        return self._cached("find_rvm_table", CATALOG_TTL, fetch)
+
+    def query(self, data):
+        return self.call("/query", method="POST", data=data)
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_default_discovery = None
+_default_lock = threading.Lock()
+
+
+def get_rvm_discovery():
+    """Process-wide discovery service shared across reruns and sessions."""
+    global _default_discovery
+    with _default_lock:
+        if _default_discovery is None:
+            _default_discovery = RVMDiscovery()
+        return _default_discovery
@@ -0,0 +1,264 @@
+# sharded_index.py
+
+import os
+import json
+import zlib
+import heapq
+import argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from embedding_store import open_embeddings, embedding_norms
+from index_registry import native_dimensions, index_paths
+
+DEFAULT_SHARD_DIR = './openai_large_embeddings/shards'
+MANIFEST_FILE = 'manifest.json'
+
+# Indexes with at least this many rows are served from their shard directory
+SHARDED_INDEX_MIN_ROWS = int(os.getenv("SHARDED_INDEX_MIN_ROWS", "1000000"))
+
+# With a feedback prior, each shard first returns this many times top_k candidates
+PRIOR_OVERSAMPLE = 4
+
+# Per-process cache of opened shards: {shard_dir: (embeddings, ids, norms)}
+_open_shards = {}
+
+
+def sentence_tag(sentence):
+    """
+    Returns the first tag of a corpus line, e.g. '#credit_report'.
+    Lines are formatted as "title #doc_name|doc_id|#tag1 #tag2|sentence_number|content".
+    """
+    parts = sentence.split('|')
+    if len(parts) < 3:
+        return '#untagged'
+    tags = parts[2].split()
+    return tags[0] if tags else '#untagged'
+
+
+def sentence_doc_id(sentence):
+    """Returns the document id of a corpus line, falling back to the line itself."""
+    parts = sentence.split('|')
+    return parts[1] if len(parts) > 1 else sentence
+
+
+def assign_shards(sentences, num_shards=4, by="hash"):
+    """
+    Maps every sentence row to a shard key.
+    by="hash" keeps each document on one shard (stable crc32 of the doc id);
+    by="tag" creates one shard per leading tag so queries can be routed by tag.
+    """
+    if by == "tag":
+        return [sentence_tag(s) for s in sentences]
+    if by == "hash":
+        return [f"hash_{zlib.crc32(sentence_doc_id(s).encode('utf-8')) % num_shards:03d}" for s in sentences]
+    raise ValueError(f"Unknown shard strategy: {by}")
+
+
+def build_shards(embeddings_file, sentences_file, shard_dir=DEFAULT_SHARD_DIR, num_shards=4, by="hash"):
+    """
+    Splits the sentence index into shard directories, each holding its own
+    embeddings.npy and the global row ids of those embeddings.
+    """
+    embeddings = open_embeddings(embeddings_file)
+    with open(sentences_file, 'r', encoding='utf-8') as f:
+        sentences = [line.strip() for line in f]
+
+    if len(embeddings) != len(sentences):
+        raise ValueError("Number of embeddings and sentences do not match.")
+
+    keys = np.array(assign_shards(sentences, num_shards, by))
+    os.makedirs(shard_dir, exist_ok=True)
+
+    shards = []
+    for key in sorted(set(keys)):
+        ids = np.flatnonzero(keys == key).astype(np.int64)
+        name = key.lstrip('#')
+        path = os.path.join(shard_dir, name)
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'embeddings.npy'), np.ascontiguousarray(embeddings[ids]))
+        np.save(os.path.join(path, 'ids.npy'), ids)
+        shards.append({"name": name, "key": key, "rows": int(len(ids))})
+
+    manifest = {
+        "by": by,
+        "num_rows": int(len(sentences)),
+        "dimensions": int(embeddings.shape[1]),
+        "sentences_file": os.path.abspath(sentences_file),
+        "shards": shards,
+    }
+    with open(os.path.join(shard_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Built {len(shards)} shards ({by}) for {len(sentences)} sentences in {shard_dir}")
+    return manifest
+
+
+def _load_shard(path):
+    """Memory-maps a shard once per worker process and caches its row norms."""
+    if path not in _open_shards:
+        embeddings = open_embeddings(os.path.join(path, 'embeddings.npy'))
+        ids = np.load(os.path.join(path, 'ids.npy'), mmap_mode='r')
+        norms = embedding_norms(os.path.join(path, 'embeddings.npy'))
+        _open_shards[path] = (embeddings, ids, norms)
+    return _open_shards[path]
+
+
+def _open_worker_shards(paths):
+    """Pool initializer: memory-maps the shards pinned to this worker before the first query."""
+    for path in paths:
+        _load_shard(path)
+
+
+def search_shard(path, query_embedding, top_k):
+    """
+    Returns the shard's partial top-k as a list of (score, global_row_id),
+    sorted by descending cosine similarity.
+    """
+    embeddings, ids, norms = _load_shard(path)
+    if len(ids) == 0:
+        return []
+
+    query = np.asarray(query_embedding, dtype=embeddings.dtype)
+    similarities = np.dot(embeddings, query) / (norms * np.linalg.norm(query))
+
+    k = min(top_k, len(similarities))
+    top = np.argpartition(similarities, -k)[-k:]
+    top = top[np.argsort(similarities[top])[::-1]]
+    return [(float(similarities[i]), int(ids[i])) for i in top]
+
+
+class ShardedIndex:
+    """
+    Scatter-gather retrieval over a shard directory built by build_shards().
+    Shards are pinned round-robin to single-process workers that memory-map
+    them at startup, so a shard is only ever searched by the process that
+    holds it; the partial top-k lists are merged with a heap.
+    """
+
+    def __init__(self, shard_dir=DEFAULT_SHARD_DIR, sentences_file=None, max_workers=None):
+        with open(os.path.join(shard_dir, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+
+        self.shard_dir = shard_dir
+        self.shards = {
+            shard["key"]: os.path.abspath(os.path.join(shard_dir, shard["name"]))
+            for shard in self.manifest["shards"]
+        }
+
+        sentences_file = sentences_file or self.manifest["sentences_file"]
+        with open(sentences_file, 'r', encoding='utf-8') as f:
+            self.sentences = [line.strip() for line in f]
+
+        if len(self.sentences) != self.manifest["num_rows"]:
+            raise ValueError("Sentences file does not match the shard manifest.")
+
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        num_workers = max(1, min(max_workers, len(self.shards)))
+        pinned = [list(self.shards.values())[i::num_workers] for i in range(num_workers)]
+        self.executors = [
+            ProcessPoolExecutor(max_workers=1, initializer=_open_worker_shards, initargs=(paths,))
+            for paths in pinned
+        ]
+        self.owners = {
+            path: executor for executor, paths in zip(self.executors, pinned) for path in paths
+        }
+
+    def search(self, query_embedding, top_k=10, tags=None, prior=None):
+        """
+        Returns [(row_id, score)] for the top_k rows across all shards.
+        With a tag-sharded index, `tags` restricts the fan-out to those shards.
+
+        `prior` is an optional per-row offset aligned with the sentences (see
+        FeedbackStore.prior_vector) added to each similarity before ranking.
+        Shards are then asked for more candidates than top_k; a shard is
+        asked again with a larger k while a row it cut off could still
+        outrank the blended top_k, so the result is exact.
+        """
+        paths = [
+            path for key, path in self.shards.items()
+            if not tags or key in tags
+        ]
+        query = np.asarray(query_embedding, dtype=np.float32)
+
+        if prior is None:
+            partials = self._scatter(paths, query, top_k)
+            merged = heapq.merge(*partials, key=lambda item: -item[0])
+            return [(row_id, score) for score, row_id in islice(merged, top_k)]
+
+        max_boost = float(np.max(prior)) if len(prior) else 0.0
+        k = top_k * PRIOR_OVERSAMPLE
+        while True:
+            partials = self._scatter(paths, query, k)
+            best = heapq.nlargest(top_k, (
+                (score + float(prior[row_id]), row_id) for partial in partials for score, row_id in partial
+            ))
+            threshold = best[-1][0] if len(best) == top_k else -np.inf
+            # Rows a shard cut off score at most its last returned score, plus the largest prior
+            if not any(len(partial) == k and partial[-1][0] + max_boost > threshold for partial in partials):
+                return [(row_id, score) for score, row_id in best]
+            k *= PRIOR_OVERSAMPLE
+
+    def _scatter(self, paths, query, k):
+        futures = [self.owners[path].submit(search_shard, path, query, k) for path in paths]
+        return [future.result() for future in futures]
+
+    def query(self, query_embedding, top_k=10, tags=None, prior=None):
+        """Same as search() but returns [(sentence, score)] like QAEngine.query_embeddings."""
+        return [(self.sentences[row_id], score) for row_id, score in self.search(query_embedding, top_k, tags, prior)]
+
+    def close(self):
+        for executor in self.executors:
+            executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def shard_dir_for(model):
+    """The shard directory next to a model's index in index_registry."""
+    return os.path.join(os.path.dirname(index_paths(model)[0]), 'shards')
+
+
+def load_sharded_index(model, min_rows=SHARDED_INDEX_MIN_ROWS, max_workers=None):
+    """
+    Returns a ShardedIndex for the model when its shard directory holds at
+    least min_rows rows of the registered index, else None so callers keep
+    the single-matrix search.
+    """
+    shard_dir = shard_dir_for(model)
+    manifest_path = os.path.join(shard_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest["num_rows"] < min_rows:
+        return None
+    if manifest["dimensions"] != native_dimensions(model):
+        print(f"Warning: shards in {shard_dir} have {manifest['dimensions']} dimensions, "
+              f"{model} produces {native_dimensions(model)}. Using the unsharded index.")
+        return None
+    try:
+        return ShardedIndex(shard_dir, sentences_file=index_paths(model)[1], max_workers=max_workers)
+    except (OSError, ValueError) as e:
+        print(f"Warning: could not open shards in {shard_dir}: {e}. Using the unsharded index.")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a sharded sentence index for scatter-gather retrieval.")
+    parser.add_argument("--embeddings", default='./openai_large_embeddings/openai_large_combined_embeddings.npy')
+    parser.add_argument("--sentences", default='./openai_large_embeddings/openai_large_combined_sentences.txt')
+    parser.add_argument("--out", default=DEFAULT_SHARD_DIR)
+    parser.add_argument("--shards", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--by", choices=["hash", "tag"], default="hash")
+    args = parser.parse_args()
+    build_shards(args.embeddings, args.sentences, args.out, args.shards, args.by)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# snapshot_store.py
+
+import os
+import re
+import json
+import time
+import bisect
+import threading
+from collections import OrderedDict
+import pandas as pd
+from backend_client import pa
+from holdings_schema import holdings_version
+
+DEFAULT_SNAPSHOT_DIR = './.snapshots'
+INDEX_FILE = 'index.json'
+
+# Partition for captures that name no source table
+DEFAULT_SOURCE = "default"
+
+# Snapshots are immutable, so decoded frames can be kept by path
+MAX_CACHED_FRAMES = 128
+
+
+def fund_slug(fund_name):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(fund_name)).strip('_') or "fund"
+
+
+def source_slug(source):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(source)).strip('_') if source else DEFAULT_SOURCE
+
+
+def series_key(fund_name, source=None):
+    """Index key of one fund's snapshots from one source; also its partition directory."""
+    return f"fund={fund_slug(fund_name)}/source={source_slug(source)}"
+
+
+def snapshot_date(df, fallback=None):
+    """The as-of date of a holdings frame: its latest bpdate, else `fallback` (today by default)."""
+    if 'bpdate' in df.columns:
+        dates = pd.to_datetime(df['bpdate'], errors='coerce').dropna()
+        if len(dates):
+            return dates.max().strftime('%Y-%m-%d')
+    return fallback or time.strftime('%Y-%m-%d')
+
+
+class SnapshotStore:
+    """
+    Append-only history of fund holdings as Parquet files partitioned by
+    fund, source table and date:
+    <root>/fund=<slug>/source=<table>/date=<YYYY-MM-DD>/part-<ms>.parquet.
+
+    Sources (e.g. the Latest and Month End tables) are separate histories:
+    a capture is compared only with the same fund and source's latest
+    snapshot for that date, and adds a new part when its content differs;
+    nothing is rewritten. index.json maps each fund/source partition to its
+    (date, captured_at, path, ...) entries sorted by date, so as-of and
+    range lookups are a bisect over the dates followed by reading only the
+    matching files (and only the requested columns). Every lookup takes
+    the source it reads from; captures without one use DEFAULT_SOURCE.
+
+    `summaries` maps a name to a `fn(frame) -> dict` that is evaluated at
+    capture time and kept in the index entry, so series(fund, name) reads
+    a year of history without opening any Parquet file.
+
+    Needs pyarrow for Parquet; without it captures are skipped.
+    """
+
+    def __init__(self, root=DEFAULT_SNAPSHOT_DIR, summaries=None):
+        self.root = root
+        self.summaries = dict(summaries or {})
+        self.enabled = pa is not None
+        self._index = {}
+        self._dates = {}
+        self._frames = OrderedDict()
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(root, exist_ok=True)
+            self.load_index()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.root, INDEX_FILE)
+
+    def load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = self.scan()
+        except Exception as e:
+            print(f"Warning: could not read snapshot index {self.index_path}, rebuilding it: {e}")
+            index = self.scan()
+        if any(not key.startswith("fund=") for key in index):
+            index = self._split_sources(index)
+        with self._lock:
+            self._index = index
+            self._dates = {fund: [entry["date"] for entry in entries] for fund, entries in index.items()}
+
+    @staticmethod
+    def _split_sources(index):
+        # Indexes written before sources were partitioned are keyed by fund slug alone
+        split = {}
+        for key, entries in index.items():
+            for entry in entries:
+                new_key = key if key.startswith("fund=") else f"fund={key}/source={source_slug(entry.get('source'))}"
+                split.setdefault(new_key, []).append(entry)
+        for entries in split.values():
+            entries.sort(key=lambda entry: (entry["date"], entry["captured_at"]))
+        return split
+
+    def scan(self):
+        """Rebuilds the index from the partition directories."""
+        index = {}
+        for fund_dir in sorted(os.listdir(self.root)):
+            if not fund_dir.startswith("fund="):
+                continue
+            for source_dir in sorted(os.listdir(os.path.join(self.root, fund_dir))):
+                # Captures from before source partitions sit directly under the fund
+                date_dirs = [source_dir] if source_dir.startswith("date=") else \
+                    [os.path.join(source_dir, date_dir)
+                     for date_dir in sorted(os.listdir(os.path.join(self.root, fund_dir, source_dir)))]
+                key = f"{fund_dir}/{source_dir if source_dir.startswith('source=') else 'source=' + DEFAULT_SOURCE}"
+                for date_dir in date_dirs:
+                    for part in sorted(os.listdir(os.path.join(self.root, fund_dir, date_dir))):
+                        if not part.endswith(".parquet"):
+                            continue
+                        index.setdefault(key, []).append({
+                            "date": os.path.basename(date_dir)[len("date="):],
+                            "captured_at": int(part[len("part-"):-len(".parquet")]) / 1000,
+                            "path": os.path.join(fund_dir, date_dir, part),
+                            "version": None,
+                            "source": None,
+                        })
+        return self._split_sources(index)
+
+    def _save_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def capture(self, fund_name, df, source=None, date=None):
+        """
+        Stores a holdings frame as the fund's snapshot from `source` for its
+        as-of date. Returns the new entry, or None when nothing was written
+        (no change, empty frame or Parquet unavailable).
+        """
+        if not self.enabled or df is None or df.empty:
+            return None
+        key = series_key(fund_name, source)
+        date = date or snapshot_date(df)
+        version = holdings_version(df)
+
+        with self._lock:
+            entries = self._index.get(key, [])
+            position = bisect.bisect_right(self._dates.get(key, []), date)
+            if position and entries[position - 1]["date"] == date and entries[position - 1]["version"] == version:
+                return None
+
+        captured_at = time.time()
+        path = os.path.join(*key.split("/"), f"date={date}", f"part-{int(captured_at * 1000)}.parquet")
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        df.to_parquet(full_path, index=False)
+
+        entry = {"date": date, "captured_at": captured_at, "path": path, "version": version,
+                 "source": source, "rows": len(df), "summaries": {}}
+        for name, summarize in self.summaries.items():
+            try:
+                entry["summaries"][name] = summarize(df)
+            except Exception as e:
+                print(f"Warning: snapshot summary '{name}' failed for {fund_name}: {e}")
+        with self._lock:
+            entries = self._index.setdefault(key, [])
+            dates = self._dates.setdefault(key, [])
+            position = bisect.bisect_right(dates, date)
+            entries.insert(position, entry)
+            dates.insert(position, date)
+            self._save_index()
+        return entry
+
+    def _read(self, entry, columns=None):
+        key = (entry["path"], tuple(columns) if columns else None)
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+                return frame
+        frame = pd.read_parquet(os.path.join(self.root, entry["path"]), columns=columns)
+        frame.attrs["data_version"] = entry.get("version") or entry["path"]
+        with self._lock:
+            self._frames[key] = frame
+            while len(self._frames) > MAX_CACHED_FRAMES:
+                self._frames.popitem(last=False)
+        return frame
+
+    def entries(self, fund_name, start=None, end=None, source=None):
+        """The newest snapshot entry from `source` of each date in [start, end], oldest first."""
+        key = series_key(fund_name, source)
+        with self._lock:
+            entries = self._index.get(key, [])
+            dates = self._dates.get(key, [])
+            low = bisect.bisect_left(dates, start) if start else 0
+            high = bisect.bisect_right(dates, end) if end else len(dates)
+            selected = entries[low:high]
+        # Entries are ordered by (date, capture), so the last one per date wins
+        latest = {}
+        for entry in selected:
+            latest[entry["date"]] = entry
+        return list(latest.values())
+
+    def as_of(self, fund_name, date, columns=None, source=None):
+        """
+        The fund's holdings from `source` as they stood on `date` (latest
+        snapshot on or before it), or None. The frame is shared and must not
+        be mutated.
+        """
+        key = series_key(fund_name, source)
+        with self._lock:
+            position = bisect.bisect_right(self._dates.get(key, []), date)
+            entry = self._index[key][position - 1] if position else None
+        if entry is None:
+            return None
+        return self._read(entry, columns)
+
+    def range(self, fund_name, start=None, end=None, columns=None, source=None):
+        """All snapshots from `source` dated in [start, end] stacked with a snapshot_date column."""
+        entries = self.entries(fund_name, start, end, source)
+        if not entries:
+            return pd.DataFrame()
+        frames = [self._read(entry, columns).assign(snapshot_date=entry["date"]) for entry in entries]
+        history = pd.concat(frames, ignore_index=True)
+        history["snapshot_date"] = pd.to_datetime(history["snapshot_date"])
+        return history
+
+    def series(self, fund_name, metric, start=None, end=None, columns=None, source=None):
+        """
+        One row per snapshot date from `source` in [start, end] with the
+        values of `metric`: either the name of a capture-time summary, read
+        straight from the index, or a `fn(frame) -> dict` applied to each
+        snapshot. Snapshots never change, so computed values are cached per
+        file.
+        """
+        rows = []
+        for entry in self.entries(fund_name, start, end, source):
+            values = entry.get("summaries", {}).get(metric) if isinstance(metric, str) else None
+            if values is not None:
+                rows.append({"date": pd.Timestamp(entry["date"]), **values})
+                continue
+            # Snapshots captured before a summary was registered are computed on read
+            function = self.summaries[metric] if isinstance(metric, str) else metric
+            key = (entry["path"], metric, tuple(columns) if columns else None)
+            with self._lock:
+                values = self._series.get(key)
+            if values is None:
+                values = function(self._read(entry, columns))
+                with self._lock:
+                    self._series[key] = values
+                    while len(self._series) > MAX_CACHED_FRAMES * 8:
+                        self._series.popitem(last=False)
+            rows.append({"date": pd.Timestamp(entry["date"]), **values})
+        return pd.DataFrame(rows)
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Process-wide snapshot store, recording the headline risk figures of every capture."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            from portfolio_analytics import risk_summary
+            _default_store = SnapshotStore(summaries={"risk": risk_summary})
+        return _default_store
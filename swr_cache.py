@@ -0,0 +1,113 @@
+# swr_cache.py
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SWRCache:
+    """
+    In-process stale-while-revalidate cache.
+
+    Fresh entries (younger than ttl) are returned directly. Stale entries
+    (older than ttl but younger than max_stale) are returned immediately
+    while a background thread reloads them. Only missing or too-stale
+    entries make the caller wait for the loader.
+
+    Keys registered with register() are also refreshed proactively by a
+    scheduler thread once they reach refresh_ahead * ttl, so users of those
+    keys never see a cold fetch.
+    """
+
+    def __init__(self, ttl=3600, max_stale=24 * 3600, refresh_ahead=0.8, max_workers=2):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.refresh_ahead = refresh_ahead
+        self._entries = {}
+        self._loaders = {}
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="swr-refresh")
+        self._scheduler = None
+        self._stop = threading.Event()
+
+    def _store(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+
+    def _revalidate(self, key, loader):
+        try:
+            self._store(key, loader())
+        except Exception as e:
+            print(f"Warning: background refresh failed for {key}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(key)
+
+    def revalidate_async(self, key, loader=None):
+        """Schedules a background reload of key unless one is already running."""
+        loader = loader or self._loaders.get(key)
+        if loader is None:
+            return
+        with self._lock:
+            if key in self._inflight:
+                return
+            self._inflight.add(key)
+        self._executor.submit(self._revalidate, key, loader)
+
+    def get(self, key, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None:
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                return entry[1]
+            if age < self.max_stale:
+                self.revalidate_async(key, loader)
+                return entry[1]
+
+        value = loader()
+        self._store(key, value)
+        return value
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def register(self, key, loader):
+        """Adds key to the set the scheduler keeps warm."""
+        with self._lock:
+            self._loaders[key] = loader
+
+    def refresh_due(self):
+        """Starts a background reload for every registered key that is missing or near expiry."""
+        now = time.time()
+        with self._lock:
+            due = [
+                key for key in self._loaders
+                if key not in self._entries or now - self._entries[key][0] >= self.ttl * self.refresh_ahead
+            ]
+        for key in due:
+            self.revalidate_async(key)
+
+    def start_scheduler(self, interval=60):
+        """Starts the proactive refresh thread; calling it again is a no-op."""
+        with self._lock:
+            if self._scheduler is not None:
+                return
+            self._scheduler = threading.Thread(
+                target=self._run_scheduler, args=(interval,), name="swr-scheduler", daemon=True
+            )
+        self._scheduler.start()
+
+    def _run_scheduler(self, interval):
+        while not self._stop.is_set():
+            self.refresh_due()
+            self._stop.wait(interval)
+
+    def stop(self):
+        self._stop.set()
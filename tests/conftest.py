@@ -0,0 +1,7 @@
+# conftest.py
+
+import os
+import sys
+
+# The app is a set of top-level modules; make them importable from tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,29 @@
+# test_backend_client.py
+
+import backend_client
+from backend_client import iter_process_json_pages
+
+
+def fake_pages(total_rows, ignore_page=False):
+    def fetch(db_path, table, filters, fields, page, page_size, url):
+        start = 0 if ignore_page else (page - 1) * page_size
+        return [{"record_number": i} for i in range(start, min(start + page_size, total_rows))]
+    return fetch
+
+
+def read_all(monkeypatch, total_rows, page_size, ignore_page=False):
+    monkeypatch.setattr(backend_client, "process_json_query", fake_pages(total_rows, ignore_page))
+    pages = dict(iter_process_json_pages("db", "table", page_size=page_size, max_workers=4))
+    return [row["record_number"] for page in sorted(pages) for row in pages[page]]
+
+
+def test_reads_past_a_thousand_pages(monkeypatch):
+    assert read_all(monkeypatch, 2503, page_size=2) == list(range(2503))
+
+
+def test_exact_multiple_of_page_size_stops_at_the_empty_page(monkeypatch):
+    assert read_all(monkeypatch, 40, page_size=10) == list(range(40))
+
+
+def test_server_ignoring_the_page_number_is_read_once(monkeypatch):
+    assert read_all(monkeypatch, 10, page_size=10, ignore_page=True) == list(range(10))
@@ -0,0 +1,68 @@
+# test_compliance_rules.py
+
+import numpy as np
+import pandas as pd
+import pytest
+import compliance_rules
+from compliance_rules import ComplianceEngine, evaluate_rules, SHARE, MAX_GROUP
+
+CASH_MAX_10 = {"id": "cash_max_10", "type": SHARE, "where": {"cash": [True]}, "max": 0.10}
+ISSUER_MAX_35 = {"id": "issuer_max_35", "type": MAX_GROUP, "group_by": "issuer",
+                 "where": {"cash": [False]}, "max": 0.35}
+
+
+def holdings(weights, cash_weight):
+    return pd.DataFrame({
+        "name": [f"ISSUER {i} 5.0 01/01/2030" for i in range(len(weights))] + ["CASH"],
+        "weighting": list(weights) + [cash_weight],
+        "market_value": [w * 1e6 for w in weights] + [np.nan],
+    })
+
+
+def result(results, rule_id):
+    return results[results["rule_id"] == rule_id].iloc[0]
+
+
+def test_limit_met_up_to_float_rounding():
+    # 0.1 / (0.3 + 0.3 + 0.3 + 0.1) lands just above 0.1 in floating point
+    cash = result(evaluate_rules([CASH_MAX_10], {"fund": holdings([0.3, 0.3, 0.3], 0.1)}), "cash_max_10")
+    assert cash["headroom"] < 0
+    assert not cash["breach"]
+
+
+def test_real_breach_is_flagged():
+    cash = result(evaluate_rules([CASH_MAX_10], {"fund": holdings([0.3, 0.3, 0.3], 0.11)}), "cash_max_10")
+    assert cash["breach"]
+
+
+def test_max_group_reports_the_largest_issuer():
+    issuer = result(evaluate_rules([ISSUER_MAX_35], {"fund": holdings([0.4, 0.3, 0.2], 0.1)}), "issuer_max_35")
+    assert issuer["breach"] and issuer["worst_group"] == "ISSUER 0"
+    assert issuer["value"] == pytest.approx(0.4)
+
+
+def test_engine_re_evaluates_only_changed_funds(monkeypatch):
+    calls = []
+    original = compliance_rules.evaluate_rules
+    monkeypatch.setattr(compliance_rules, "evaluate_rules",
+                        lambda rules, funds: calls.append(sorted(funds)) or original(rules, funds))
+    engine = ComplianceEngine([CASH_MAX_10])
+    fund_a, fund_b = holdings([0.3, 0.3, 0.3], 0.1), holdings([0.5, 0.3, 0.1], 0.1)
+
+    engine.evaluate({"a": fund_a, "b": fund_b})
+    engine.evaluate({"a": fund_a, "b": fund_b})
+    assert calls == [["a", "b"]]
+
+    # A new data version for one fund re-checks that fund alone
+    breached = holdings([0.3, 0.3, 0.2], 0.2)
+    results = engine.evaluate({"a": breached, "b": fund_b})
+    assert calls == [["a", "b"], ["a"]]
+    assert results.set_index("fund").loc["a", "breach"]
+
+
+def test_set_rules_invalidates_every_fund():
+    engine = ComplianceEngine([CASH_MAX_10])
+    fund = holdings([0.3, 0.3, 0.3], 0.1)
+    assert engine.breaches({"fund": fund}).empty
+    engine.set_rules([dict(CASH_MAX_10, max=0.05)])
+    assert list(engine.breaches({"fund": fund})["rule_id"]) == ["cash_max_10"]
@@ -0,0 +1,71 @@
+# test_exact_search.py
+
+import numpy as np
+import pytest
+from exact_search import exact_top_k
+
+
+def brute_force_top_k(embeddings, query, top_k):
+    similarities = embeddings.astype(np.float64) @ query / (
+        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+    )
+    order = np.argsort(-similarities, kind='stable')[:top_k]
+    return order, similarities[order]
+
+
+@pytest.fixture
+def embeddings_path(tmp_path):
+    rng = np.random.default_rng(7)
+    embeddings = rng.standard_normal((1000, 32)).astype(np.float32)
+    path = tmp_path / "embeddings.npy"
+    np.save(path, embeddings)
+    return str(path), embeddings
+
+
+@pytest.mark.parametrize("block_rows", [64, 333, 1000, 4096])
+def test_matches_brute_force_for_any_block_size(embeddings_path, block_rows):
+    path, embeddings = embeddings_path
+    queries = np.random.default_rng(1).standard_normal((3, 32))
+
+    results = exact_top_k(path, queries, top_k=10, block_rows=block_rows, max_workers=2)
+
+    assert len(results) == 3
+    for query, result in zip(queries, results):
+        expected_ids, expected_scores = brute_force_top_k(embeddings, query, 10)
+        assert [row_id for row_id, _ in result] == expected_ids.tolist()
+        np.testing.assert_allclose([score for _, score in result], expected_scores, rtol=1e-6)
+
+
+def test_single_query_and_top_k_larger_than_block(embeddings_path):
+    path, embeddings = embeddings_path
+    query = np.random.default_rng(2).standard_normal(32)
+
+    (result,) = exact_top_k(path, query.tolist(), top_k=50, block_rows=16, max_workers=3)
+
+    expected_ids, _ = brute_force_top_k(embeddings, query, 50)
+    assert [row_id for row_id, _ in result] == expected_ids.tolist()
+
+
+def test_top_k_larger_than_corpus_returns_every_row(tmp_path):
+    embeddings = np.eye(4, dtype=np.float32)
+    path = tmp_path / "small.npy"
+    np.save(path, embeddings)
+
+    (result,) = exact_top_k(str(path), [1.0, 0.5, 0.25, -0.1], top_k=10, block_rows=3)
+
+    assert [row_id for row_id, _ in result] == [0, 1, 2, 3]
+    assert result[0][1] == pytest.approx(1 / np.sqrt(1 + 0.25 + 0.0625 + 0.01))
+
+
+def test_prior_is_added_before_ranking(embeddings_path):
+    path, embeddings = embeddings_path
+    query = np.random.default_rng(3).standard_normal(32)
+    prior = np.random.default_rng(4).uniform(-0.05, 0.05, len(embeddings)).astype(np.float32)
+
+    (result,) = exact_top_k(path, query, top_k=10, block_rows=100, max_workers=2, prior=prior)
+
+    similarities = embeddings.astype(np.float64) @ query / (
+        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query)
+    )
+    expected = np.argsort(-(similarities + prior), kind='stable')[:10]
+    assert [row_id for row_id, _ in result] == expected.tolist()
@@ -0,0 +1,44 @@
+# test_feedback_store.py
+
+import json
+import os
+from feedback_store import FeedbackStore
+
+SENTENCES = [
+    "Mexico #mexico_report|mexico|#country|1|Mexico grew 3%.",
+    "Mexico #mexico_report|mexico|#country|2|Inflation eased.",
+    "Chile #chile_report|chile|#country|1|Copper exports rose.",
+]
+
+
+def test_votes_from_two_processes_are_merged(tmp_path):
+    path = str(tmp_path / "votes.json")
+    first, second = FeedbackStore(path), FeedbackStore(path)
+    first.record([SENTENCES[0]], 1)
+    second.record([SENTENCES[2]], -1)
+    with open(path, encoding='utf-8') as f:
+        votes = json.load(f)
+    assert votes["sentences"] == {"mexico#1": 1, "chile#1": -1}
+    assert votes["docs"] == {"mexico": 1, "chile": -1}
+
+
+def test_other_process_votes_change_the_prior(tmp_path):
+    path = str(tmp_path / "votes.json")
+    reader, writer = FeedbackStore(path), FeedbackStore(path)
+    before = reader.prior_vector(SENTENCES).copy()
+    assert not before.any()
+    writer.record([SENTENCES[0]], 1)
+    after = reader.prior_vector(SENTENCES)
+    assert after[0] > after[1] > 0 and after[2] == 0
+
+
+def test_unchanged_file_keeps_the_cached_prior(tmp_path):
+    store = FeedbackStore(str(tmp_path / "votes.json"))
+    store.record([SENTENCES[0]], 1)
+    assert store.prior_vector(SENTENCES) is store.prior_vector(SENTENCES)
+
+
+def test_save_leaves_no_temp_file(tmp_path):
+    store = FeedbackStore(str(tmp_path / "votes.json"))
+    store.record([SENTENCES[0]], 1)
+    assert sorted(os.listdir(tmp_path)) == ["votes.json", "votes.json.lock"]
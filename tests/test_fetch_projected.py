@@ -0,0 +1,49 @@
+# test_fetch_projected.py
+
+import pandas as pd
+import pytest
+import requests
+import fetch_data
+from view_fields import view_columns
+
+
+class FakeReplica:
+    """Rejects any projection with a 400, like a backend missing one of the view's columns."""
+
+    def __init__(self, status=400):
+        self.status = status
+        self.calls = []
+
+    def get(self, db_path, table, filters=None, fields="*"):
+        self.calls.append(fields)
+        if fields != "*":
+            response = requests.Response()
+            response.status_code = self.status
+            raise requests.exceptions.HTTPError(f"{self.status} Client Error", response=response)
+        return pd.DataFrame({column: [1] for column in view_columns("fund_report") + ["extra"]})
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    monkeypatch.setattr(fetch_data, "_unsupported_projections", set())
+    def install(status=400):
+        fake = FakeReplica(status)
+        monkeypatch.setattr(fetch_data, "get_replica", lambda: fake)
+        return fake
+    return install
+
+
+def test_rejected_projection_falls_back_once(replica):
+    fake = replica()
+    first = fetch_data.fetch_projected("consolidated.db", "fund_holdings_latest", {}, "fund_report")
+    second = fetch_data.fetch_projected("consolidated.db", "fund_holdings_latest", {}, "fund_report")
+    assert list(first.columns) == view_columns("fund_report")
+    assert second.equals(first)
+    assert fake.calls.count("*") == 2 and len(fake.calls) == 3
+
+
+def test_server_error_is_not_remembered(replica):
+    fake = replica(status=503)
+    fetch_data.fetch_projected("consolidated.db", "fund_holdings_latest", {}, "fund_report")
+    fetch_data.fetch_projected("consolidated.db", "fund_holdings_latest", {}, "fund_report")
+    assert len(fake.calls) == 4
@@ -0,0 +1,70 @@
+# test_filter_engine.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from filter_engine import FilterEngine, ColumnMeta
+
+
+@pytest.fixture
+def holdings():
+    return pd.DataFrame({
+        "isin": ["A", "B", "C", "D", "E", "F"],
+        "country": ["Mexico", "Chile", None, "Mexico", "Peru", "Chile"],
+        "duration": [5.0, np.nan, 2.5, 7.0, 2.5, 10.0],
+        "rating": ["7", 7, "BBB", "AA", None, "BBB"],
+        "cash": [False, False, True, False, False, True],
+    })
+
+
+def brute_force(df, predicates):
+    mask = np.ones(len(df), dtype=bool)
+    for column, predicate in predicates.items():
+        values = df[column]
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            mask &= ((values >= predicate[0]) & (values <= predicate[1])).to_numpy()
+        else:
+            labels = {str(value) for value in predicate}
+            mask &= np.array([value is not None and str(value) in labels for value in values])
+    return df[mask]
+
+
+@pytest.mark.parametrize("predicates", [
+    {"duration": (2.5, 7.0)},
+    {"duration": (3.0, 4.0)},
+    {"duration": (-np.inf, np.inf)},
+    {"country": ["Mexico", "Chile"]},
+    {"country": ["Brazil"]},
+    {"rating": ["7"]},
+    {"cash": [True]},
+    {"country": ["Mexico", "Peru"], "duration": (2.5, 5.0)},
+])
+def test_mask_matches_brute_force(holdings, predicates):
+    result = FilterEngine(holdings).apply(predicates)
+    assert result["isin"].tolist() == brute_force(holdings, predicates)["isin"].tolist()
+
+
+def test_range_bounds_are_inclusive_and_exclude_missing(holdings):
+    result = FilterEngine(holdings).apply({"duration": (2.5, 10.0)})
+    assert result["isin"].tolist() == ["A", "C", "D", "E", "F"]
+
+
+def test_missing_values_never_match_a_value_set(holdings):
+    assert FilterEngine(holdings).apply({"country": ["None", "nan"]}).empty
+
+
+def test_values_sharing_a_label_share_an_option(holdings):
+    meta = ColumnMeta(holdings["rating"])
+    assert meta.options == ["7", "AA", "BBB"]
+    assert FilterEngine(holdings).apply({"rating": [7]})["isin"].tolist() == ["A", "B"]
+
+
+def test_numeric_meta_has_finite_bounds(holdings):
+    meta = ColumnMeta(holdings["duration"])
+    assert meta.numeric and (meta.min, meta.max) == (2.5, 10.0)
+
+
+def test_no_predicates_returns_every_row(holdings):
+    engine = FilterEngine(holdings)
+    assert engine.mask({}) is None
+    assert len(engine.apply({})) == len(holdings)
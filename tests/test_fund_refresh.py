@@ -0,0 +1,39 @@
+# test_fund_refresh.py
+
+import pandas as pd
+import pytest
+import fetch_data
+from exposure_cube import ExposureCube
+from snapshot_store import SnapshotStore
+
+FUND = "Demo Bond Fund"
+
+
+@pytest.fixture
+def stores(tmp_path, monkeypatch):
+    store, cube = SnapshotStore(str(tmp_path)), ExposureCube()
+    holdings = pd.DataFrame({
+        "isin": ["XS1", "XS2"], "name": ["ISSUER A 5.0 01/01/2030", "ISSUER B 4.0 01/01/2031"],
+        "weighting": [60.0, 40.0], "market_value": [6e5, 4e5], "country": ["Mexico", "Chile"],
+        "bpdate": ["2025-06-30"] * 2,
+    })
+    monkeypatch.setattr(fetch_data, "fetch_projected", lambda db_path, table, filters, view: holdings)
+    monkeypatch.setattr(fetch_data, "get_snapshot_store", lambda: store)
+    monkeypatch.setattr(fetch_data, "get_exposure_cube", lambda time_selection: cube)
+    return store, cube
+
+
+def test_reading_fund_data_writes_nothing(stores):
+    store, cube = stores
+    fetch_data.fetch_fund_data(FUND, "Latest")
+    assert store.entries(FUND, source="fund_holdings_latest") == []
+    assert cube.funds() == []
+
+
+def test_refresh_records_snapshot_and_cube(stores):
+    store, cube = stores
+    fund_data = fetch_data.fetch_fund_data(FUND, "Latest")
+    fetch_data.record_fund_refresh(FUND, "Latest", fund_data)
+    fetch_data.record_fund_refresh(FUND, "Latest", fund_data)
+    assert len(store.entries(FUND, source="fund_holdings_latest")) == 1
+    assert cube.funds() == [FUND]
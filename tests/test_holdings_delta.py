@@ -0,0 +1,71 @@
+# test_holdings_delta.py
+
+import pandas as pd
+import pytest
+from holdings_delta import compute_holdings_delta, get_holdings_delta, clear_cache, \
+    ADDED, REMOVED, RESIZED, UNCHANGED
+
+
+def holdings(rows):
+    return pd.DataFrame(rows, columns=["isin", "name", "face_amount", "weighting", "duration", "spread"])
+
+
+@pytest.fixture
+def snapshots():
+    before = holdings([
+        ("KEEP", "Kept bond", 100.0, 25.0, 5.0, 100.0),
+        ("GROW", "Grown bond", 100.0, 25.0, 3.0, 200.0),
+        ("EXIT", "Sold bond", 100.0, 50.0, 8.0, 300.0),
+    ])
+    after = holdings([
+        ("KEEP", "Kept bond", 100.3, 25.0, 5.0, 100.0),
+        ("GROW", "Grown bond", 150.0, 50.0, 3.0, 200.0),
+        ("NEW", "New bond", 80.0, 25.0, 2.0, 50.0),
+    ])
+    return before, after
+
+
+def classification(delta):
+    changes = delta["changes"]
+    return dict(zip(changes["isin"], changes["change"].astype(str)))
+
+
+def test_add_exit_resize_and_unchanged(snapshots):
+    delta = compute_holdings_delta(*snapshots)
+    assert classification(delta) == {"KEEP": UNCHANGED, "GROW": RESIZED, "EXIT": REMOVED, "NEW": ADDED}
+    summary = delta["summary"]
+    assert (summary["added"], summary["removed"], summary["resized"], summary["unchanged"]) == (1, 1, 1, 1)
+
+
+def test_face_tolerance_controls_resize(snapshots):
+    delta = compute_holdings_delta(*snapshots, face_tolerance=0.1)
+    assert classification(delta)["KEEP"] == RESIZED
+
+
+def test_exits_and_adds_carry_zero_on_the_missing_side(snapshots):
+    changes = compute_holdings_delta(*snapshots)["changes"].set_index("isin")
+    assert changes.loc["EXIT", "face_after"] == 0.0 and changes.loc["EXIT", "weight_before"] == 0.5
+    assert changes.loc["NEW", "face_before"] == 0.0 and changes.loc["NEW", "name"] == "New bond"
+
+
+def test_contribution_changes_sum_to_fund_change(snapshots):
+    before, after = snapshots
+    summary = compute_holdings_delta(before, after)["summary"]
+    fund_duration = lambda df: (df["weighting"] * df["duration"]).sum() / df["weighting"].sum()
+    assert summary["duration_change"] == pytest.approx(fund_duration(after) - fund_duration(before))
+    assert summary["turnover"] == pytest.approx(0.5)
+
+
+def test_lines_sharing_an_isin_are_summed():
+    before = holdings([("CASH", "Cash", 10.0, 5.0, None, None), ("CASH", "Cash", 10.0, 5.0, None, None),
+                       ("BOND", "Bond", 90.0, 90.0, 4.0, 100.0)])
+    after = holdings([("CASH", "Cash", 20.0, 10.0, None, None), ("BOND", "Bond", 90.0, 90.0, 4.0, 100.0)])
+    assert classification(compute_holdings_delta(before, after)) == {"CASH": UNCHANGED, "BOND": UNCHANGED}
+
+
+def test_cached_delta_is_reused_until_data_changes(snapshots):
+    clear_cache()
+    before, after = snapshots
+    first = get_holdings_delta(before, after)
+    assert get_holdings_delta(before, after) is first
+    assert get_holdings_delta(before, after.iloc[:2]) is not first
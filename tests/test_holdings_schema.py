@@ -0,0 +1,42 @@
+# test_holdings_schema.py
+
+import numpy as np
+import pandas as pd
+from holdings_schema import normalize_holdings, HOLDINGS_SCHEMA
+
+
+def raw_holdings():
+    # As JSON parsing delivers them: numbers as strings, letter ratings, extra columns
+    return pd.DataFrame({
+        "isin": ["XS1", "XS2", "CASH"],
+        "weighting": ["4.5", "3.25", "1"],
+        "msci_esg_rating": ["AA", "BBB", None],
+        "msci": ["A", None, "CCC"],
+        "nfa": [7, "2", None],
+        "record_number": ["1", "2", "3"],
+        "bpdate": ["2025-06-30"] * 3,
+        "analyst_note": ["Upgrade watch", "Stable", "n/a"],
+    })
+
+
+def test_letter_ratings_survive():
+    typed = normalize_holdings(raw_holdings())
+    assert typed["msci_esg_rating"].astype(object).tolist()[:2] == ["AA", "BBB"]
+    assert typed["msci_esg_rating"].isna().tolist() == [False, False, True]
+    assert typed["msci"].astype(object).tolist()[::2] == ["A", "CCC"]
+
+
+def test_unlisted_non_numeric_column_is_left_alone():
+    raw = raw_holdings()
+    typed = normalize_holdings(raw)
+    assert "analyst_note" not in HOLDINGS_SCHEMA
+    assert typed["analyst_note"].tolist() == ["Upgrade watch", "Stable", "n/a"]
+    assert typed["analyst_note"].dtype == raw["analyst_note"].dtype
+
+
+def test_declared_columns_are_typed():
+    typed = normalize_holdings(raw_holdings())
+    assert typed["weighting"].dtype == np.float32
+    assert typed["record_number"].dtype == "Int64"
+    assert pd.api.types.is_datetime64_any_dtype(typed["bpdate"])
+    assert typed["nfa"].astype(object).tolist() == ["7", "2", "Cash"]
@@ -0,0 +1,131 @@
+# test_local_replica.py
+
+import sqlite3
+import time
+import pandas as pd
+import pytest
+import requests
+import backend_client
+from local_backend import LocalBackend, FaultInjector, serve_in_thread
+from local_replica import LocalReplica, query_key
+
+DB = "bonds.db"
+ROWS = backend_client.PAGE_SIZE + 20
+
+
+def holdings(rows=ROWS):
+    return pd.DataFrame({
+        "record_number": range(1, rows + 1),
+        "bpdate": ["2025-06-30"] * rows,
+        "isin": [f"XS{i:010d}" for i in range(rows)],
+        "weighting": [1.0] * rows,
+    })
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = LocalBackend(str(tmp_path / "data"))
+    faults = FaultInjector()
+    server, base_url = serve_in_thread(backend, faults=faults)
+    yield backend, f"{base_url}/process_json", faults
+    server.shutdown()
+
+
+@pytest.fixture
+def replica(tmp_path, backend):
+    return LocalReplica(str(tmp_path / "replica.db"), max_age=0, url=backend[1])
+
+
+def refresh(replica, table):
+    return replica.refresh(DB, table)
+
+
+def test_first_read_pulls_every_page(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings())
+    assert len(replica.get(DB, "holdings")) == ROWS
+
+
+def test_unchanged_table_is_only_touched(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings())
+    assert refresh(replica, "holdings")
+    assert not refresh(replica, "holdings")
+
+
+def test_appended_rows_past_page_one_are_replicated(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings())
+    refresh(replica, "holdings")
+    backend[0].add_table(DB, "holdings", holdings(ROWS + 3))
+    assert refresh(replica, "holdings")
+    assert len(replica.get(DB, "holdings")) == ROWS + 3
+
+
+def test_new_date_on_page_two_is_replicated(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings())
+    refresh(replica, "holdings")
+    changed = holdings()
+    changed.loc[ROWS - 1, "bpdate"] = "2025-07-01"
+    backend[0].add_table(DB, "holdings", changed)
+    assert refresh(replica, "holdings")
+    assert replica.get(DB, "holdings")["bpdate"].max() == "2025-07-01"
+
+
+def test_table_without_keys_falls_back_to_content_hash(backend, replica):
+    frame = pd.DataFrame({"country": ["Mexico", "Chile"], "score": [1.0, 2.0]})
+    backend[0].add_table(DB, "countries", frame)
+    assert refresh(replica, "countries")
+    assert not refresh(replica, "countries")
+    backend[0].add_table(DB, "countries", frame.assign(score=[1.0, 3.0]))
+    assert refresh(replica, "countries")
+    assert replica.get(DB, "countries")["score"].tolist() == [1.0, 3.0]
+
+
+def test_fresh_copy_is_served_without_asking_the_backend(tmp_path, backend):
+    backend[0].add_table(DB, "holdings", holdings(10))
+    replica = LocalReplica(str(tmp_path / "replica.db"), max_age=3600, url=backend[1])
+    replica.get(DB, "holdings")
+    backend[0].add_table(DB, "holdings", holdings(12))
+    assert len(replica.get(DB, "holdings")) == 10
+
+
+def test_stale_copy_is_refreshed(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings(10))
+    replica.get(DB, "holdings")
+    backend[0].add_table(DB, "holdings", holdings(12))
+    assert len(replica.get(DB, "holdings")) == 12
+
+
+def test_stale_copy_is_served_when_the_backend_fails(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings(10))
+    replica.get(DB, "holdings")
+    backend[2].update(failure_rate=1.0, failure_status=404)
+    assert len(replica.get(DB, "holdings")) == 10
+
+
+def test_missing_copy_raises_when_the_backend_fails(backend, replica):
+    backend[2].update(failure_rate=1.0, failure_status=404)
+    with pytest.raises(requests.exceptions.HTTPError):
+        replica.get(DB, "holdings")
+
+
+def test_get_returns_typed_columns_and_get_rows_dicts(backend, replica):
+    backend[0].add_table(DB, "holdings", holdings(3))
+    frame = replica.get(DB, "holdings")
+    assert frame["record_number"].dtype == "int64" and frame["weighting"].dtype == "float64"
+    assert replica.get_rows(DB, "holdings")[0] == {
+        "record_number": 1, "bpdate": "2025-06-30", "isin": "XS0000000000", "weighting": 1.0,
+    }
+
+
+def test_row_json_replica_is_refetched(tmp_path, backend):
+    path = tmp_path / "replica.db"
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE replica_rows (query_key TEXT, row_key TEXT, position INTEGER, row_json TEXT);
+            CREATE TABLE replica_sync (query_key TEXT PRIMARY KEY, refreshed_at REAL NOT NULL,
+                content_hash TEXT, max_bpdate TEXT, max_record_number INTEGER, row_count INTEGER);
+        """)
+        conn.execute("INSERT INTO replica_sync VALUES (?, ?, 'old', NULL, NULL, 0)",
+                     (query_key(DB, "holdings"), time.time()))
+    backend[0].add_table(DB, "holdings", holdings(5))
+    replica = LocalReplica(str(path), max_age=3600, url=backend[1])
+    assert len(replica.get(DB, "holdings")) == 5
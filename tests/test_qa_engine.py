@@ -0,0 +1,44 @@
+# test_qa_engine.py
+
+import os
+import numpy as np
+import pytest
+import index_registry
+import qa_engine5
+from qa_engine5 import QAEngine
+
+
+@pytest.fixture
+def index_root(tmp_path, monkeypatch):
+    for model, rows in [("text-embedding-3-small", 4), ("text-embedding-3-large", 6)]:
+        embeddings_path, sentences_path, _ = index_registry.index_paths(model)
+        directory = tmp_path / os.path.basename(os.path.dirname(embeddings_path))
+        directory.mkdir()
+        np.save(directory / os.path.basename(embeddings_path),
+                np.ones((rows, index_registry.native_dimensions(model)), dtype=np.float32))
+        (directory / os.path.basename(sentences_path)).write_text(
+            "".join(f"{model} sentence {i}\n" for i in range(rows)), encoding="utf-8")
+    monkeypatch.setattr(index_registry, "INDEX_ROOT", str(tmp_path))
+    index_registry.clear_cache()
+    yield tmp_path
+    index_registry.clear_cache()
+
+
+def test_engine_uses_the_index_of_the_selected_model(index_root, monkeypatch):
+    monkeypatch.setattr(qa_engine5, "current_embedding_model", lambda: "text-embedding-3-small")
+    engine = QAEngine()
+    assert engine.model == "text-embedding-3-small"
+    assert engine.embeddings.shape == (4, 1536)
+    assert engine.sentences[0] == "text-embedding-3-small sentence 0"
+    assert engine.embeddings_file == index_registry.index_paths("text-embedding-3-small")[0]
+
+
+def test_engines_for_different_models_do_not_share_an_index(index_root):
+    small, large = QAEngine(model="text-embedding-3-small"), QAEngine(model="text-embedding-3-large")
+    assert len(small.sentences) == 4 and len(large.sentences) == 6
+
+
+def test_missing_index_disables_search(index_root):
+    engine = QAEngine(model="text-embedding-ada-002")
+    assert engine.embeddings is None
+    assert engine.find_relevant_sentences("anything") == []
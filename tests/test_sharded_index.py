@@ -0,0 +1,102 @@
+# test_sharded_index.py
+
+import os
+import numpy as np
+import pytest
+import index_registry
+from sharded_index import build_shards, ShardedIndex, load_sharded_index, shard_dir_for
+
+
+@pytest.fixture
+def index(tmp_path):
+    rng = np.random.default_rng(3)
+    embeddings = rng.standard_normal((600, 16)).astype(np.float32)
+    sentences = [f"Doc {i} #doc|doc{i % 40}|#tag{i % 3}|{i}|sentence {i}" for i in range(len(embeddings))]
+    np.save(tmp_path / "embeddings.npy", embeddings)
+    (tmp_path / "sentences.txt").write_text("\n".join(sentences) + "\n", encoding="utf-8")
+    build_shards(str(tmp_path / "embeddings.npy"), str(tmp_path / "sentences.txt"), str(tmp_path / "shards"), 4)
+    with ShardedIndex(str(tmp_path / "shards"), max_workers=2) as index:
+        yield index, embeddings
+
+
+def blended_ranking(embeddings, query, prior, top_k):
+    similarities = embeddings @ query.astype(np.float32) / (
+        np.linalg.norm(embeddings, axis=1) * np.linalg.norm(query.astype(np.float32))
+    )
+    scores = similarities + prior
+    return np.argsort(-scores, kind='stable')[:top_k].tolist()
+
+
+def test_search_without_prior_is_raw_cosine(index):
+    index, embeddings = index
+    query = np.random.default_rng(4).standard_normal(16)
+
+    results = index.search(query, top_k=10)
+
+    assert [row_id for row_id, _ in results] == blended_ranking(embeddings, query, 0.0, 10)
+
+
+@pytest.mark.parametrize("weight", [0.01, 0.2, 2.0])
+def test_search_with_prior_matches_brute_force(index, weight):
+    index, embeddings = index
+    rng = np.random.default_rng(5)
+    query = rng.standard_normal(16)
+    # Large priors push rows from far outside the raw top-k into the result
+    prior = (weight * rng.random(len(embeddings))).astype(np.float32)
+
+    results = index.search(query, top_k=10, prior=prior)
+
+    assert [row_id for row_id, _ in results] == blended_ranking(embeddings, query, prior, 10)
+
+
+def test_query_returns_sentences_with_blended_scores(index):
+    index, embeddings = index
+    prior = np.zeros(len(embeddings), dtype=np.float32)
+    prior[123] = 5.0
+
+    (sentence, score), *_ = index.query(np.ones(16), top_k=3, prior=prior)
+
+    assert sentence.endswith("sentence 123")
+    assert score > 4.0
+
+
+def test_each_shard_is_pinned_to_one_worker(index):
+    index, _ = index
+    pids = [executor.submit(os.getpid).result() for executor in index.executors]
+
+    assert len(index.executors) == 2 and len(set(pids)) == 2
+    assert set(index.owners) == set(index.shards.values())
+    assert sorted(list(index.owners.values()).count(executor) for executor in index.executors) == [2, 2]
+
+
+@pytest.fixture
+def registered(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_registry, "INDEX_ROOT", str(tmp_path))
+    model = "text-embedding-3-small"
+    embeddings_path, sentences_path, _ = index_registry.index_paths(model)
+    os.makedirs(os.path.dirname(embeddings_path))
+    rng = np.random.default_rng(6)
+    np.save(embeddings_path, rng.standard_normal((40, 1536)).astype(np.float32))
+    with open(sentences_path, "w", encoding="utf-8") as f:
+        f.write("".join(f"Doc #doc|doc{i}|#tag|{i}|sentence {i}\n" for i in range(40)))
+    return model, embeddings_path, sentences_path
+
+
+def test_small_index_stays_unsharded(registered):
+    model, embeddings_path, sentences_path = registered
+    build_shards(embeddings_path, sentences_path, shard_dir_for(model), 2)
+
+    assert load_sharded_index(model, min_rows=41) is None
+
+
+def test_large_index_is_served_from_its_shards(registered):
+    model, embeddings_path, sentences_path = registered
+    assert load_sharded_index(model, min_rows=1) is None
+    build_shards(embeddings_path, sentences_path, shard_dir_for(model), 2)
+
+    index = load_sharded_index(model, min_rows=40, max_workers=2)
+    try:
+        (sentence, _), = index.query(np.load(embeddings_path)[7], top_k=1)
+        assert sentence.endswith("sentence 7")
+    finally:
+        index.close()
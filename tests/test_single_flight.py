@@ -0,0 +1,56 @@
+# test_single_flight.py
+
+import threading
+import time
+import pytest
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"rows": [1, 2]}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("q", slow)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flights.do("q", slow))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    while flights.shared < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert flights.executed == 1 and flights.shared == 4
+    assert all(result is results[0] for result in results)
+
+
+def test_exception_reaches_every_waiter_and_key_is_released():
+    flights = SingleFlight()
+
+    def fail():
+        raise ValueError("backend down")
+
+    with pytest.raises(ValueError):
+        flights.do("q", fail)
+    # A finished call is forgotten, so the next one runs again
+    assert flights.do("q", lambda: 42) == 42
+    assert flights.executed == 2
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+    assert flights.executed == 2 and flights.shared == 0
@@ -0,0 +1,70 @@
+# test_snapshot_store.py
+
+import json
+import os
+import pandas as pd
+from snapshot_store import SnapshotStore, series_key
+
+FUND = "Demo Bond Fund"
+
+
+def holdings(weight, bpdate="2025-06-30"):
+    return pd.DataFrame({"isin": ["A", "B"], "weighting": [weight, 100 - weight], "bpdate": [bpdate] * 2})
+
+
+def test_sources_sharing_a_date_are_kept_apart(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    latest = store.capture(FUND, holdings(40), source="fund_holdings_latest")
+    month_end = store.capture(FUND, holdings(60), source="fund_holdings_me")
+    assert latest["path"].startswith(os.path.join("fund=Demo_Bond_Fund", "source=fund_holdings_latest"))
+    assert month_end["path"].startswith(os.path.join("fund=Demo_Bond_Fund", "source=fund_holdings_me"))
+    assert store.as_of(FUND, "2025-06-30", source="fund_holdings_latest")["weighting"].tolist() == [40, 60]
+    assert store.as_of(FUND, "2025-06-30", source="fund_holdings_me")["weighting"].tolist() == [60, 40]
+
+
+def test_alternating_sources_do_not_rewrite(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    assert store.capture(FUND, holdings(40), source="fund_holdings_latest") is not None
+    assert store.capture(FUND, holdings(60), source="fund_holdings_me") is not None
+    assert store.capture(FUND, holdings(40), source="fund_holdings_latest") is None
+    assert store.capture(FUND, holdings(60), source="fund_holdings_me") is None
+    assert len(store.entries(FUND, source="fund_holdings_latest")) == 1
+
+
+def test_index_survives_a_restart(tmp_path):
+    store = SnapshotStore(str(tmp_path), summaries={"rows": lambda df: {"rows": len(df)}})
+    store.capture(FUND, holdings(40), source="fund_holdings_latest")
+    store.capture(FUND, holdings(45, "2025-07-01"), source="fund_holdings_latest")
+    reopened = SnapshotStore(str(tmp_path))
+    assert [entry["date"] for entry in reopened.entries(FUND, source="fund_holdings_latest")] == \
+        ["2025-06-30", "2025-07-01"]
+    assert reopened.series(FUND, "rows", source="fund_holdings_latest")["rows"].tolist() == [2, 2]
+    assert reopened.entries(FUND, source="fund_holdings_me") == []
+
+
+def test_legacy_index_is_split_by_source(tmp_path):
+    legacy_dir = tmp_path / "fund=Demo_Bond_Fund" / "date=2025-06-30"
+    legacy_dir.mkdir(parents=True)
+    holdings(40).to_parquet(legacy_dir / "part-1000.parquet", index=False)
+    holdings(60).to_parquet(legacy_dir / "part-2000.parquet", index=False)
+    entry = lambda part, source: {"date": "2025-06-30", "captured_at": int(part) / 1000, "version": part,
+                                  "path": os.path.join("fund=Demo_Bond_Fund", "date=2025-06-30", f"part-{part}.parquet"),
+                                  "source": source}
+    (tmp_path / "index.json").write_text(json.dumps({"Demo_Bond_Fund": [
+        entry("1000", "fund_holdings_latest"), entry("2000", "fund_holdings_me"),
+    ]}))
+
+    store = SnapshotStore(str(tmp_path))
+    assert store.as_of(FUND, "2025-06-30", source="fund_holdings_latest")["weighting"].tolist() == [40, 60]
+    assert store.as_of(FUND, "2025-06-30", source="fund_holdings_me")["weighting"].tolist() == [60, 40]
+
+
+def test_scan_reads_both_partition_layouts(tmp_path):
+    legacy_dir = tmp_path / "fund=Demo_Bond_Fund" / "date=2025-06-30"
+    legacy_dir.mkdir(parents=True)
+    holdings(40).to_parquet(legacy_dir / "part-1000.parquet", index=False)
+    store = SnapshotStore(str(tmp_path))
+    store.capture(FUND, holdings(60, "2025-07-01"), source="fund_holdings_me")
+
+    index = SnapshotStore(str(tmp_path)).scan()
+    assert sorted(index) == [series_key(FUND), series_key(FUND, "fund_holdings_me")]
@@ -0,0 +1,44 @@
+# view_fields.py
+
+# Columns each page renders from the holdings tables. Requesting only these
+# instead of "fields": "*" shrinks the /process_json payload, JSON parse time
+# and DataFrame memory. record_number and bpdate are kept for replica keys.
+VIEW_FIELDS = {
+    "fund_pie_charts": [
+        "weighting", "nfa_star_rating", "nfa", "esg", "esg_country_star_rating", "region",
+    ],
+    "fund_holdings_table": [
+        "isin", "name", "country", "region", "currency", "face_amount", "market_value",
+        "weighting", "yield", "duration", "spread", "nfa_star_rating", "esg_country_star_rating",
+    ],
+    "bond_information": [
+        "isin", "name", "fund_name", "face_amount", "closing_price", "yield", "duration", "spread",
+        "market_value", "accrued_interest", "currency", "total_cost", "trade_date", "price",
+        "country", "region", "msci_esg_rating", "nfa_star_rating", "esg_country_star_rating",
+        "emdm", "nfa", "esg",
+    ],
+    "exposure_cube": [
+        "isin", "name", "country", "region", "emdm", "currency", "face_amount", "market_value",
+        "weighting", "duration", "spread", "nfa_star_rating", "esg",
+    ],
+}
+
+# The fund report draws the pie charts, the holdings table and its exposure cube cells from one fetch
+VIEW_FIELDS["fund_report"] = list(dict.fromkeys(
+    VIEW_FIELDS["fund_pie_charts"] + VIEW_FIELDS["fund_holdings_table"] + VIEW_FIELDS["exposure_cube"]
+))
+
+KEY_FIELDS = ["record_number", "bpdate"]
+
+
+def view_columns(view):
+    """Returns the column list for a view, or None when the view needs every column."""
+    if view is None or view not in VIEW_FIELDS:
+        return None
+    return list(dict.fromkeys(VIEW_FIELDS[view] + KEY_FIELDS))
+
+
+def view_fields(view):
+    """The /process_json "fields" value for a view: a comma-separated column list, or "*"."""
+    columns = view_columns(view)
+    return ",".join(columns) if columns else "*"
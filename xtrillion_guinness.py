@@ -30,11 +30,13 @@ from credit_reports import create_country_report_tab
 from report_utils import create_fund_report_tab
 from user_guide import display_user_guide
 from bond_information import create_bond_information_tab, get_bond_options
-from qa_engine5 import QAEngine, detect_intent
+from qa_engine5 import QAEngine, detect_intent, current_embedding_model
+from feedback_store import get_feedback_store
+from sharded_index import load_sharded_index
 from welcome_page_guinness import display_welcome_page  # Import the new welcome page
 from streamlit_deep_dive_radio_wrapped import deep_dive_radio_page, get_sorted_media_files, get_last_modified_date, load_processed_files
 import sidebar_guinness as sidebar_demo  # Use Guinness-branded sidebar
-from report_utils import fetch_fund_data_with_cache  # Import the new function
+from report_utils import fetch_fund_data_with_cache, start_report_refresher  # Import the new function
 import chatbot_demo
 
 # Import RVM Grid corrected layout
@@ -396,10 +398,16 @@ def handle_user_input(chatbot):
         chatbot.render_thumb_icons(ai_message_id, len(st.session_state.chat_history) - 1)
 
 
+@st.cache_resource
+def _load_engine(model):
+    # One engine per embedding model, resolved through index_registry; thumbs votes
+    # from every session land in the shared feedback store and re-rank its results.
+    # Indexes past SHARDED_INDEX_MIN_ROWS with a built shard directory are searched
+    # by shard-pinned worker processes instead of one in-process matrix
+    return QAEngine(model=model, feedback=get_feedback_store(), index=load_sharded_index(model))
+
 def load_engine():
-    sentences_file = './openai_large_embeddings/openai_large_combined_sentences.txt'
-    embeddings_file = './openai_large_embeddings/openai_large_combined_embeddings.npy'
-    return QAEngine(sentences_file, embeddings_file)
+    return _load_engine(current_embedding_model())
 
 def render_welcome_page():
     st.markdown("<h1 style='text-align: center;'>👋 Welcome to Xtrillion3 Dashboard</h1>", unsafe_allow_html=True)
@@ -454,6 +462,9 @@ def main():
     # Initialize app state first
     initialize_app_state()
 
+    # Keep fund and country report data warm in the background
+    start_report_refresher()
+
     if "selected_report" not in st.session_state:
         st.session_state.selected_report = st.session_state.state["current_report"]
 